@@ -1 +1,24 @@
 MCP_SERVER_PORT = 8081
+
+WORKERS = 8
+CALL_TIMEOUT = 30.0
+
+INDEX_PATH = "cache/chembl_index.sqlite"
+
+RESOLVE_CHUNK_SIZE = 50
+RESOLVE_RETRIES = 20
+
+SIMILARITY_PATH = "cache/chembl_fingerprints"
+FINGERPRINT_BITS = 2048
+FINGERPRINT_PATH_LENGTH = 5
+
+PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 1000
+
+RATE_LIMIT = 5.0
+RATE_BURST = 10
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 30.0
@@ -0,0 +1,455 @@
+"""
+Hashed path fingerprints of ChEMBL molecules and a Tanimoto similarity index.
+
+    python -m chembl_mcp.fingerprints cache/chembl_fingerprints
+
+SMILES are read into a molecular graph and every linear path of up to
+`CHEMBL_FINGERPRINT_PATH` bonds is hashed into a fixed size bit vector, in
+the spirit of Daylight fingerprints. The index is a directory holding the
+packed bit vectors as one flat file of fixed size rows, opened memory-mapped,
+and a SQLite table mapping row numbers to ChEMBL ids and SMILES. New
+molecules are appended, so the index grows as lookups return structures.
+"""
+import os
+import re
+import sys
+import zlib
+import sqlite3
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from chembl_mcp import offline_index
+from chembl_mcp.constants import FINGERPRINT_BITS, FINGERPRINT_PATH_LENGTH, INDEX_PATH, SIMILARITY_PATH
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_TOKEN = re.compile(r"\[[^\]]+\]|Br|Cl|[BCNOPSFI]|[bcnops]|\*|[-=#$:/\\.]|[()]|%\d\d|\d")
+_BRACKET = re.compile(r"\[\d*([A-Z][a-z]?|[a-z][a-z]?|\*)[^\]+-]*([+-]*)\d*[^\]]*\]")
+_BONDS = {"-": "-", "/": "-", "\\": "-", "=": "=", "#": "#", "$": "$", ":": ":"}
+# atoms giving a lone pair to an aromatic ring, as in furan, thiophene and pyrrole
+_LONE_PAIR = {"O", "S", "Se", "N", "P"}
+# partners of a double bond out of a ring that still leave the ring aromatic, as in pyridone
+_EXOCYCLIC = {"O", "S", "N"}
+# bumped when the same SMILES would hash differently, so stored indexes are rebuilt
+_FINGERPRINT_VERSION = 2
+
+# rows scored per step of a search, bounding the temporary arrays
+_SEARCH_CHUNK = 1 << 16
+_INSERT_CHUNK = 900
+
+
+def _atom(token: str) -> Tuple[str, bool]:
+    """Label of an atom token and whether it is aromatic."""
+    if token[0] != "[":
+        return token, token.islower()
+    match = _BRACKET.fullmatch(token)
+    if match is None:
+        raise ValueError(f"Invalid atom {token}")
+    element, charge = match.groups()
+    return element + charge[:1], element.islower()
+
+
+def parse_smiles(smiles: str) -> Tuple[List[str], List[List[Tuple[int, str]]]]:
+    """Atom labels and adjacency lists `(neighbour, bond)` of a SMILES string.
+
+    Charges, aromaticity and bond orders are kept; isotopes, hydrogens and
+    stereo marks are dropped. Rings written in Kekulé form are read as the
+    aromatic rings they are, so both ways of writing a molecule agree.
+    """
+    smiles = smiles.strip()
+    tokens = _TOKEN.findall(smiles)
+    if not tokens or "".join(tokens) != smiles:
+        raise ValueError(f"Invalid SMILES {smiles!r}")
+
+    labels: List[str] = []
+    aromatic: List[bool] = []
+    bonds: List[List[Tuple[int, str]]] = []
+    rings: Dict[str, Tuple[int, Optional[str]]] = {}
+    branches: List[int] = []
+    previous: Optional[int] = None
+    bond: Optional[str] = None
+
+    def connect(a: int, b: int, order: Optional[str]):
+        if order is None:
+            order = ":" if aromatic[a] and aromatic[b] else "-"
+        bonds[a].append((b, order))
+        bonds[b].append((a, order))
+
+    for token in tokens:
+        if token in _BONDS:
+            bond = _BONDS[token]
+        elif token == ".":
+            previous, bond = None, None
+        elif token == "(":
+            if previous is None:
+                raise ValueError(f"Invalid SMILES {smiles!r}")
+            branches.append(previous)
+        elif token == ")":
+            if not branches:
+                raise ValueError(f"Invalid SMILES {smiles!r}")
+            previous, bond = branches.pop(), None
+        elif token[0].isdigit() or token[0] == "%":
+            if previous is None:
+                raise ValueError(f"Invalid SMILES {smiles!r}")
+            if token in rings:
+                other, opening = rings.pop(token)
+                connect(other, previous, bond or opening)
+            else:
+                rings[token] = (previous, bond)
+            bond = None
+        else:
+            label, is_aromatic = _atom(token)
+            labels.append(label)
+            aromatic.append(is_aromatic)
+            bonds.append([])
+            if previous is not None:
+                connect(previous, len(labels) - 1, bond)
+            previous, bond = len(labels) - 1, None
+    if rings or branches:
+        raise ValueError(f"Invalid SMILES {smiles!r}")
+    _perceive_aromaticity(labels, aromatic, bonds)
+    return labels, bonds
+
+
+def _rings(bonds: List[List[Tuple[int, str]]], sizes: Tuple[int, ...] = (5, 6)) -> List[List[int]]:
+    """Atoms of every ring of `sizes` atoms, in ring order."""
+    found: Dict[frozenset, List[int]] = {}
+
+    def walk(path: List[int]):
+        for neighbour, _ in bonds[path[-1]]:
+            if neighbour == path[0] and len(path) in sizes:
+                found.setdefault(frozenset(path), list(path))
+            elif neighbour > path[0] and neighbour not in path and len(path) < max(sizes):
+                path.append(neighbour)
+                walk(path)
+                path.pop()
+
+    for start in range(len(bonds)):
+        walk([start])
+    return list(found.values())
+
+
+def _in_cycle(bonds: List[List[Tuple[int, str]]], a: int, b: int) -> bool:
+    """Whether `b` is reachable from `a` without the bond between them."""
+    seen, stack = {a}, [a]
+    while stack:
+        atom = stack.pop()
+        for neighbour, _ in bonds[atom]:
+            if atom == a and neighbour == b:
+                continue
+            if neighbour == b:
+                return True
+            if neighbour not in seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+    return False
+
+
+def _set_bond(bonds: List[List[Tuple[int, str]]], a: int, b: int, order: str):
+    bonds[a] = [(n, order if n == b else o) for n, o in bonds[a]]
+    bonds[b] = [(n, order if n == a else o) for n, o in bonds[b]]
+
+
+def _pi_electrons(labels: List[str], aromatic: List[bool], bonds: List[List[Tuple[int, str]]],
+                  ring: List[int], atom: int) -> Optional[int]:
+    """Electrons `atom` gives to the pi system of `ring`, None when it breaks it."""
+    if aromatic[atom]:
+        return 1
+    doubles = [neighbour for neighbour, order in bonds[atom] if order == "="]
+    if not doubles:
+        return 2 if labels[atom] in _LONE_PAIR else None
+    if len(doubles) > 1:
+        return None
+    if doubles[0] in ring:
+        return 1
+    # a carbonyl or imine outside the ring leaves the atom's p orbital empty
+    return 0 if labels[doubles[0]] in _EXOCYCLIC else None
+
+
+def _perceive_aromaticity(labels: List[str], aromatic: List[bool], bonds: List[List[Tuple[int, str]]]):
+    """Mark five and six membered rings of 4n + 2 pi electrons aromatic, in place.
+
+    Atoms count as RDKit counts them when writing aromatic SMILES: one for a
+    double bond within the ring, none for a C=O or C=N outside it and two for
+    a lone pair. Marking one ring can complete another fused to it. Bonds
+    between aromatic atoms of different rings are single.
+    """
+    rings = _rings(bonds)
+    changed = True
+    while changed:
+        changed = False
+        for ring in rings:
+            if all(aromatic[atom] for atom in ring):
+                continue
+            edges = list(zip(ring, ring[1:] + ring[:1]))
+            if any(dict(bonds[a])[b] not in "-=:" for a, b in edges):
+                continue
+            electrons = [_pi_electrons(labels, aromatic, bonds, ring, atom) for atom in ring]
+            if None in electrons or sum(electrons) % 4 != 2:
+                continue
+            for atom in ring:
+                aromatic[atom] = True
+                labels[atom] = labels[atom].lower()
+            for a, b in edges:
+                _set_bond(bonds, a, b, ":")
+            changed = True
+    for a, neighbours in enumerate(bonds):
+        for b, order in neighbours:
+            if order == ":" and a < b and not _in_cycle(bonds, a, b):
+                _set_bond(bonds, a, b, "-")
+
+
+def _paths(labels: List[str], bonds: List[List[Tuple[int, str]]], max_length: int) -> Iterator[str]:
+    """Every linear path of up to `max_length` bonds, written the same way from either end."""
+    def walk(path: List[int], text: List[str]):
+        forward = "".join(text)
+        backward = "".join(reversed(text))
+        yield min(forward, backward)
+        if len(path) > max_length:
+            return
+        for neighbour, order in bonds[path[-1]]:
+            if neighbour not in path:
+                path.append(neighbour)
+                text += [order, labels[neighbour]]
+                yield from walk(path, text)
+                del text[-2:]
+                path.pop()
+
+    for atom, label in enumerate(labels):
+        yield from walk([atom], [label])
+
+
+def fingerprint(
+    smiles: str, bits: int = FINGERPRINT_BITS, max_length: int = FINGERPRINT_PATH_LENGTH
+) -> np.ndarray:
+    """Path fingerprint of a molecule packed into `bits // 8` bytes."""
+    labels, bonds = parse_smiles(smiles)
+    on = np.zeros(bits, dtype=bool)
+    for path in set(_paths(labels, bonds, max_length)):
+        on[zlib.crc32(path.encode()) % bits] = True
+    return np.packbits(on)
+
+
+def _popcount(rows: np.ndarray) -> np.ndarray:
+    return np.bitwise_count(rows).sum(axis=-1, dtype=np.int32)
+
+
+def tanimoto(a: np.ndarray, b: np.ndarray) -> float:
+    union = _popcount(a | b)
+    return float(_popcount(a & b) / union) if union else 0.0
+
+
+class FingerprintIndex:
+    """Packed fingerprints of molecules, searched for Tanimoto neighbours."""
+
+    def __init__(
+        self, path: Path | str, bits: int = FINGERPRINT_BITS, max_length: int = FINGERPRINT_PATH_LENGTH
+    ):
+        if bits % 64:
+            raise ValueError(f"Fingerprint size must be a multiple of 64 bits, got {bits}")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.bits = bits
+        self.max_length = max_length
+        self.row_size = bits // 8
+        self._bits_path = self.path / "fingerprints.bin"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path / "molecules.sqlite", check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS molecules (row INTEGER PRIMARY KEY, chembl_id TEXT UNIQUE, smiles TEXT);
+            """
+        )
+        settings = f"{bits}/{max_length}/v{_FINGERPRINT_VERSION}"
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row is not None and row[0] != settings:
+            logger.info(f"Fingerprint index at {self.path} was built with {row[0]}, rebuilding with {settings}")
+            self._db.execute("DELETE FROM molecules")
+            self._bits_path.unlink(missing_ok=True)
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (settings,))
+        self._db.commit()
+
+        self._rows = self._db.execute("SELECT COUNT(*) FROM molecules").fetchone()[0]
+        # rows appended by a writer that died before committing their ids are dropped
+        with open(self._bits_path, "ab") as f:
+            f.truncate(self._rows * self.row_size)
+        self._matrix: Optional[np.ndarray] = None
+        self._counts = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, chembl_id: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM molecules WHERE chembl_id = ?", (chembl_id.upper(),)
+            ).fetchone() is not None
+
+    def add(self, molecules: Iterable[Tuple[str, str]]) -> int:
+        """Index `(chembl_id, smiles)` pairs not indexed yet, returning how many were added.
+
+        Molecules whose SMILES cannot be read are skipped.
+        """
+        molecules = list(dict((chembl_id.upper(), smiles) for chembl_id, smiles in molecules if smiles).items())
+        with self._lock:
+            known = set()
+            for start in range(0, len(molecules), _INSERT_CHUNK):
+                chunk = [chembl_id for chembl_id, _ in molecules[start:start + _INSERT_CHUNK]]
+                known.update(row[0] for row in self._db.execute(
+                    f"SELECT chembl_id FROM molecules WHERE chembl_id IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            rows, fingerprints = [], []
+            for chembl_id, smiles in molecules:
+                if chembl_id in known:
+                    continue
+                try:
+                    fingerprints.append(fingerprint(smiles, self.bits, self.max_length))
+                except ValueError as e:
+                    logger.debug(f"Not indexing {chembl_id}: {e}")
+                    continue
+                rows.append((self._rows + len(rows), chembl_id, smiles))
+            if not rows:
+                return 0
+            # fingerprints first: ids are only visible once their rows are on disk
+            with open(self._bits_path, "ab") as f:
+                f.write(np.stack(fingerprints).tobytes())
+            with self._db:
+                self._db.executemany("INSERT INTO molecules VALUES (?, ?, ?)", rows)
+            self._rows += len(rows)
+        return len(rows)
+
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Memory-mapped rows and their popcounts, remapped when the index grew."""
+        with self._lock:
+            if self._matrix is None or len(self._matrix) != self._rows:
+                if self._rows:
+                    matrix = np.memmap(
+                        self._bits_path, dtype=np.uint64, mode="r", shape=(self._rows, self.bits // 64)
+                    )
+                else:
+                    matrix = np.zeros((0, self.bits // 64), dtype=np.uint64)
+                known = len(self._counts)
+                self._counts = np.concatenate([self._counts[:len(matrix)], _popcount(matrix[known:])])
+                self._matrix = matrix
+            return self._matrix, self._counts
+
+    def search(self, smiles: str, limit: int = 10, threshold: float = 0.0) -> List[dict]:
+        """Indexed molecules most similar to `smiles`, by Tanimoto similarity of their fingerprints."""
+        query = fingerprint(smiles, self.bits, self.max_length).view(np.uint64)
+        query_count = _popcount(query)
+        matrix, counts = self._snapshot()
+
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, len(matrix), _SEARCH_CHUNK):
+            common = _popcount(matrix[start:start + _SEARCH_CHUNK] & query)
+            union = counts[start:start + len(common)] + query_count - common
+            scores = np.divide(common, union, out=np.zeros(len(common), dtype=np.float32), where=union > 0)
+            keep = np.flatnonzero(scores >= threshold) if threshold > 0 else np.arange(len(scores))
+            if len(keep) > limit:
+                keep = keep[np.argpartition(scores[keep], -limit)[-limit:]]
+            best_rows = np.concatenate([best_rows, keep + start])
+            best_scores = np.concatenate([best_scores, scores[keep]])
+            if len(best_rows) > limit:
+                top = np.argpartition(best_scores, -limit)[-limit:]
+                best_rows, best_scores = best_rows[top], best_scores[top]
+        order = np.lexsort((best_rows, -best_scores))
+
+        rows = [int(row) for row in best_rows[order]]
+        with self._lock:
+            found = {
+                row: (chembl_id, smiles)
+                for row, chembl_id, smiles in self._db.execute(
+                    f"SELECT row, chembl_id, smiles FROM molecules WHERE row IN ({','.join('?' * len(rows))})", rows
+                )
+            }
+        return [
+            {
+                "molecule_chembl_id": found[row][0],
+                "canonical_smiles": found[row][1],
+                "similarity": round(float(score), 3),
+            }
+            for row, score in zip(rows, best_scores[order])
+        ]
+
+    def close(self):
+        with self._lock:
+            self._matrix = None
+            self._db.close()
+
+
+def _structures(molecules: Iterable[dict]) -> Iterator[Tuple[str, str]]:
+    for molecule in molecules:
+        smiles = (molecule.get("molecule_structures") or {}).get("canonical_smiles")
+        if molecule.get("molecule_chembl_id") and smiles:
+            yield molecule["molecule_chembl_id"], smiles
+
+
+_index: Optional[FingerprintIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> FingerprintIndex:
+    """The index at `CHEMBL_SIMILARITY_PATH`, created empty on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FingerprintIndex(
+                os.environ.get("CHEMBL_SIMILARITY_PATH", SIMILARITY_PATH),
+                int(os.environ.get("CHEMBL_FINGERPRINT_BITS", FINGERPRINT_BITS)),
+                int(os.environ.get("CHEMBL_FINGERPRINT_PATH", FINGERPRINT_PATH_LENGTH)),
+            )
+        return _index
+
+
+def remember(molecules: Iterable[dict]):
+    """Add the structures of fetched molecule records to the index, never failing the lookup."""
+    try:
+        get_index().add(_structures(molecules))
+    except Exception as e:
+        logger.warning(f"Could not index fetched structures: {e}")
+
+
+def import_offline(index: FingerprintIndex, source: offline_index.OfflineIndex, batch: int = 10000) -> int:
+    added, pending = 0, []
+    for structure in source.structures():
+        pending.append(structure)
+        if len(pending) == batch:
+            added += index.add(pending)
+            pending = []
+    added += index.add(pending)
+    logger.info(f"Added {added} molecules to {index.path}, {len(index)} indexed")
+    return added
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        description="Add the structures of the offline ChEMBL index to the fingerprint index."
+    )
+    arg_parser.add_argument(
+        "index", nargs="?", default=os.environ.get("CHEMBL_SIMILARITY_PATH", SIMILARITY_PATH),
+        help="fingerprint index directory",
+    )
+    arg_parser.add_argument(
+        "--offline-index", default=os.environ.get("CHEMBL_INDEX_PATH", INDEX_PATH),
+        help="offline index built by chembl_mcp.offline_index",
+    )
+    args = arg_parser.parse_args(argv)
+    index = FingerprintIndex(
+        args.index,
+        int(os.environ.get("CHEMBL_FINGERPRINT_BITS", FINGERPRINT_BITS)),
+        int(os.environ.get("CHEMBL_FINGERPRINT_PATH", FINGERPRINT_PATH_LENGTH)),
+    )
+    import_offline(index, offline_index.OfflineIndex(args.offline_index))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
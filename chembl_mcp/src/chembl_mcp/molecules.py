@@ -1,61 +1,140 @@
-import json
 from mcp import types
-from typing import List, Optional
+from itertools import islice
+from typing import List, Optional, Tuple
 from chembl_webresource_client.new_client import new_client
+from chembl_mcp.constants import MAX_PAGE_LIMIT
+from chembl_mcp.single_flight import coalesce
+from chembl_mcp.rate_limit import rate_limited
+from chembl_mcp.projection import top_level_fields
+from chembl_mcp.pagination import page_window, serialize_page
+from chembl_mcp import fingerprints, offline_index
 
 CLIENT = new_client.molecule
 
 
+@coalesce
+@rate_limited
+def _filter(
+    fields: Optional[List[str]] = None, offset: int = 0, limit: int = MAX_PAGE_LIMIT, **filters
+) -> Tuple[List[dict], Optional[int]]:
+    """One window of matching molecules and the total number of matches.
+
+    Iteration stops at `limit`, so only the pages covering the window are
+    requested from the web service.
+    """
+    molecules = CLIENT.filter(**filters)
+    if fields:
+        molecules = molecules.only(top_level_fields(fields))
+    window = molecules[offset:offset + limit]
+    # the client pages 20 records at a time, ask for the whole window in one request instead
+    window.query.limit = min(limit, MAX_PAGE_LIMIT)
+    items = list(islice(window, limit))
+    fingerprints.remember(items)
+    total = getattr(window.query, "api_total_count", None)
+    return items, total if total is not None else offset + len(items)
+
+
+def filter_by(
+    lookup: str, value: str | List[str], fields: Optional[List[str]] = None, limit: int = MAX_PAGE_LIMIT
+) -> List[dict]:
+    """Molecules matching one upstream `lookup`, e.g. `pref_name__iexact` or `molecule_chembl_id__in`."""
+    items, _ = _filter(fields, 0, limit, **{lookup: value})
+    return items
+
+
+def _offline(fields: Optional[List[str]]) -> Tuple[Optional[offline_index.OfflineIndex], Optional[List[str]]]:
+    """The offline index, if built and able to answer `fields`, and the fields to answer.
+
+    Without `fields` the index answers its `DEFAULT_FIELDS`, and so does the web service on a miss.
+    """
+    fields = offline_index.default_fields(fields)
+    index = offline_index.get_index() if offline_index.covers(fields) else None
+    return index, fields
+
+
+def _lookup(
+    offline: List[dict], lookup: str, value: str, fields: Optional[List[str]],
+    limit: Optional[int], offset: int, cursor: Optional[str],
+) -> Tuple[List[dict], Optional[int], int]:
+    offset, limit = page_window(limit, offset, cursor)
+    if offline:
+        return offline[offset:offset + limit], len(offline), offset
+    items, total = _filter(fields, offset, limit, **{lookup: value})
+    return items, total, offset
+
+
 def get_molecule_pref_name(
     prefix_name: str,
     fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
 ) -> types.TextContent:
-    global CLIENT
-    molecules = CLIENT.filter(pref_name__iexact=prefix_name)
-    if fields:
-        molecules = molecules.only(fields)
+    index, fields = _offline(fields)
+    offline = index.by_pref_name(prefix_name) if index else []
+    molecules, total, offset = _lookup(
+        offline, "pref_name__iexact", prefix_name, fields, limit, offset, cursor
+    )
 
-    return json.dumps(molecules, indent=2)
+    return serialize_page(molecules, total, offset, fields, compact)
 
 
 def get_molecule_synonyms(
     synonym: str,
     fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
 ) -> types.TextContent:
-    global CLIENT
-    molecules = CLIENT.filter(
-        molecule_synonyms__molecule_synonym_iexact=synonym)
-    if fields:
-        molecules = molecules.only(fields)
+    index, fields = _offline(fields)
+    offline = index.by_synonym(synonym) if index else []
+    molecules, total, offset = _lookup(
+        offline, "molecule_synonyms__molecule_synonym_iexact", synonym, fields, limit, offset, cursor
+    )
 
-    return json.dumps(molecules, indent=2)
+    return serialize_page(molecules, total, offset, fields, compact)
 
 
 def get_molecule_chembl_id(
     chembl_id: str | List[str],
     fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
 ) -> types.TextContent:
-    global CLIENT
+    """Pages run over the requested ids, so each page sends a bounded `__in` list."""
     if isinstance(chembl_id, str):
         chembl_id = [chembl_id]
+    chembl_ids = list(dict.fromkeys(id_.strip().upper() for id_ in chembl_id))
+    offset, limit = page_window(limit, offset, cursor)
+    page_ids = chembl_ids[offset:offset + limit]
 
-    molecule = CLIENT.filter(molecule_chembl_id__in=chembl_id)
+    index, fields = _offline(fields)
+    molecules = index.by_chembl_ids(page_ids) if index and page_ids else []
+    found = {molecule["molecule_chembl_id"] for molecule in molecules}
+    missing = [id_ for id_ in page_ids if id_ not in found]
+    if missing:
+        molecules += filter_by("molecule_chembl_id__in", missing, fields, len(missing))
 
-    if fields:
-        molecule = molecule.only(fields)
-
-    return json.dumps(molecule, indent=2)
+    # total and cursor count ids, a page holds fewer molecules than ids when some do not exist
+    return serialize_page(molecules, len(chembl_ids), offset, fields, compact, consumed=len(page_ids))
 
 
 def get_molecule_standard_inchi_key(
     standard_inchi_key: str,
     fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
 ) -> types.TextContent:
-    global CLIENT
-    molecule = CLIENT.filter(
-        molecule_structures__standard_inchi_key=standard_inchi_key)
-
-    if fields:
-        molecule = molecule.only(fields)
+    index, fields = _offline(fields)
+    offline = index.by_inchi_key(standard_inchi_key) if index else []
+    molecules, total, offset = _lookup(
+        offline, "molecule_structures__standard_inchi_key", standard_inchi_key, fields, limit, offset, cursor
+    )
 
-    return json.dumps(molecule, indent=2)
+    return serialize_page(molecules, total, offset, fields, compact)
@@ -0,0 +1,275 @@
+"""
+Local index of ChEMBL identifiers built from a ChEMBL SQLite dump.
+
+    python -m chembl_mcp.offline_index chembl_34.db cache/chembl_index.sqlite
+
+Names and synonyms are stored case-folded next to the original text, so
+case-insensitive lookups are plain index seeks. Only the identifier fields
+are kept; lookups asking for anything else go to the web service.
+"""
+import os
+import sys
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from chembl_mcp.constants import INDEX_PATH
+from chembl_mcp.projection import split_path
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# fields of a web service molecule record that the index can answer
+FIELDS = {
+    "molecule_chembl_id": None,
+    "pref_name": None,
+    "max_phase": None,
+    "molecule_type": None,
+    "molecule_structures": {"canonical_smiles", "standard_inchi", "standard_inchi_key"},
+    "molecule_synonyms": {"molecule_synonym", "syn_type"},
+}
+
+# what lookups without `fields` return while an index exists, from it or from the web service on a miss
+DEFAULT_FIELDS = [
+    "molecule_chembl_id",
+    "pref_name",
+    "max_phase",
+    "molecule_type",
+    "molecule_structures.canonical_smiles",
+    "molecule_structures.standard_inchi",
+    "molecule_structures.standard_inchi_key",
+    "molecule_synonyms.molecule_synonym",
+    "molecule_synonyms.syn_type",
+]
+
+SCHEMA = """
+CREATE TABLE molecules (
+    molregno INTEGER PRIMARY KEY,
+    chembl_id TEXT,
+    pref_name TEXT,
+    pref_name_fold TEXT,
+    max_phase TEXT,
+    molecule_type TEXT,
+    canonical_smiles TEXT,
+    standard_inchi TEXT,
+    standard_inchi_key TEXT
+);
+CREATE TABLE synonyms (molregno INTEGER, synonym TEXT, synonym_fold TEXT, syn_type TEXT);
+"""
+
+INDEXES = """
+CREATE UNIQUE INDEX molecules_chembl_id ON molecules (chembl_id);
+CREATE INDEX molecules_pref_name ON molecules (pref_name_fold);
+CREATE INDEX molecules_inchi_key ON molecules (standard_inchi_key);
+CREATE INDEX synonyms_fold ON synonyms (synonym_fold);
+CREATE INDEX synonyms_molregno ON synonyms (molregno);
+"""
+
+# SQLite's default limit on bound parameters is 999 in older builds
+_CHUNK = 900
+
+
+def fold(text: Optional[str]) -> Optional[str]:
+    return text.casefold() if text is not None else None
+
+
+def build_index(dump_path: Path | str, index_path: Path | str) -> Dict[str, int]:
+    """Build the index from a ChEMBL SQLite dump, replacing `index_path` atomically.
+
+    The dump needs the `molecule_dictionary`, `compound_structures` and
+    `molecule_synonyms` tables of the official ChEMBL schema.
+    """
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f"{index_path.name}.", suffix=".tmp", dir=index_path.parent)
+    os.close(fd)
+    try:
+        db = sqlite3.connect(f"file:{tmp_name}", uri=True)
+        db.create_function("fold", 1, fold, deterministic=True)
+        db.executescript(SCHEMA)
+        db.execute("ATTACH DATABASE ? AS dump", (f"file:{Path(dump_path).absolute()}?mode=ro",))
+        with db:
+            db.execute(
+                """
+                INSERT INTO molecules
+                SELECT md.molregno, md.chembl_id, md.pref_name, fold(md.pref_name), CAST(md.max_phase AS TEXT),
+                       md.molecule_type, cs.canonical_smiles, cs.standard_inchi, cs.standard_inchi_key
+                FROM dump.molecule_dictionary md
+                LEFT JOIN dump.compound_structures cs ON cs.molregno = md.molregno
+                """
+            )
+            db.execute(
+                """
+                INSERT INTO synonyms
+                SELECT molregno, synonyms, fold(synonyms), syn_type
+                FROM dump.molecule_synonyms WHERE synonyms IS NOT NULL
+                """
+            )
+        db.executescript(INDEXES)
+        counts = {
+            "molecules": db.execute("SELECT COUNT(*) FROM molecules").fetchone()[0],
+            "synonyms": db.execute("SELECT COUNT(*) FROM synonyms").fetchone()[0],
+        }
+        db.execute("DETACH DATABASE dump")
+        db.close()
+        os.replace(tmp_name, index_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    logger.info(f"Indexed {counts['molecules']} molecules and {counts['synonyms']} synonyms into {index_path}")
+    return counts
+
+
+def covers(fields: Optional[List[str]]) -> bool:
+    """Whether every requested field path can be answered from the index.
+
+    Without `fields` the whole web service record is asked for, which the
+    index does not hold; see `default_fields`.
+    """
+    if not fields:
+        return False
+    for field in fields:
+        path = split_path(field)
+        if not path:
+            continue
+        if path[0] not in FIELDS:
+            return False
+        children = FIELDS[path[0]]
+        if len(path) > 1 and (children is None or path[1] not in children):
+            return False
+    return True
+
+
+def default_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """`fields`, or `DEFAULT_FIELDS` when none are asked for and an index exists to answer them."""
+    if fields or get_index() is None:
+        return fields
+    return DEFAULT_FIELDS
+
+
+class OfflineIndex:
+    """Read-only lookups against an index built by `build_index`."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._db = sqlite3.connect(f"file:{self.path.absolute()}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def _molregnos(self, sql: str, params: Iterable) -> List[int]:
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql, tuple(params))]
+
+    def _records(self, molregnos: List[int]) -> List[dict]:
+        molregnos = list(dict.fromkeys(molregnos))
+        if not molregnos:
+            return []
+        molecules: Dict[int, dict] = {}
+        synonyms: Dict[int, List[dict]] = {}
+        with self._lock:
+            for start in range(0, len(molregnos), _CHUNK):
+                chunk = molregnos[start:start + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                for row in self._db.execute(f"SELECT * FROM molecules WHERE molregno IN ({marks})", chunk):
+                    (molregno, chembl_id, pref_name, _, max_phase, molecule_type,
+                     canonical_smiles, standard_inchi, standard_inchi_key) = row
+                    molecules[molregno] = {
+                        "molecule_chembl_id": chembl_id,
+                        "pref_name": pref_name,
+                        "max_phase": max_phase,
+                        "molecule_type": molecule_type,
+                        "molecule_structures": {
+                            "canonical_smiles": canonical_smiles,
+                            "standard_inchi": standard_inchi,
+                            "standard_inchi_key": standard_inchi_key,
+                        } if standard_inchi_key else None,
+                    }
+                for molregno, synonym, syn_type in self._db.execute(
+                    f"SELECT molregno, synonym, syn_type FROM synonyms WHERE molregno IN ({marks})", chunk
+                ):
+                    synonyms.setdefault(molregno, []).append({"molecule_synonym": synonym, "syn_type": syn_type})
+        records = []
+        for molregno in molregnos:
+            if molregno in molecules:
+                records.append({**molecules[molregno], "molecule_synonyms": synonyms.get(molregno, [])})
+        return records
+
+    def by_pref_name(self, pref_name: str) -> List[dict]:
+        return self._records(self._molregnos(
+            "SELECT molregno FROM molecules WHERE pref_name_fold = ? ORDER BY molregno", [fold(pref_name)]
+        ))
+
+    def by_synonym(self, synonym: str) -> List[dict]:
+        return self._records(self._molregnos(
+            "SELECT molregno FROM synonyms WHERE synonym_fold = ? ORDER BY molregno", [fold(synonym)]
+        ))
+
+    def by_inchi_key(self, standard_inchi_key: str) -> List[dict]:
+        return self._records(self._molregnos(
+            "SELECT molregno FROM molecules WHERE standard_inchi_key = ? ORDER BY molregno",
+            [standard_inchi_key.strip().upper()],
+        ))
+
+    def by_chembl_ids(self, chembl_ids: List[str]) -> List[dict]:
+        chembl_ids = [chembl_id.strip().upper() for chembl_id in chembl_ids]
+        molregnos = []
+        for start in range(0, len(chembl_ids), _CHUNK):
+            chunk = chembl_ids[start:start + _CHUNK]
+            molregnos.extend(self._molregnos(
+                f"SELECT molregno FROM molecules WHERE chembl_id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        records = {record["molecule_chembl_id"]: record for record in self._records(molregnos)}
+        return [records[chembl_id] for chembl_id in dict.fromkeys(chembl_ids) if chembl_id in records]
+
+    def structures(self, batch: int = 10000) -> Iterator[Tuple[str, str]]:
+        """`(chembl_id, canonical_smiles)` of every molecule with a structure."""
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT molregno, chembl_id, canonical_smiles FROM molecules"
+                    " WHERE molregno > ? AND canonical_smiles IS NOT NULL ORDER BY molregno LIMIT ?",
+                    (last, batch),
+                ).fetchall()
+            if not rows:
+                return
+            for _, chembl_id, smiles in rows:
+                yield chembl_id, smiles
+            last = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_index: Optional[OfflineIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> Optional[OfflineIndex]:
+    """The index at `CHEMBL_INDEX_PATH`, or None when it has not been built."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = Path(os.environ.get("CHEMBL_INDEX_PATH", INDEX_PATH))
+            if path.is_file():
+                _index = OfflineIndex(path)
+        return _index
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Build the offline ChEMBL identifier index.")
+    arg_parser.add_argument("dump", help="ChEMBL SQLite dump, e.g. chembl_34/chembl_34_sqlite/chembl_34.db")
+    arg_parser.add_argument(
+        "index", nargs="?", default=os.environ.get("CHEMBL_INDEX_PATH", INDEX_PATH), help="index to write"
+    )
+    args = arg_parser.parse_args(argv)
+    build_index(args.dump, args.index)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
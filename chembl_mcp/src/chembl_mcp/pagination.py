@@ -0,0 +1,76 @@
+import json
+import base64
+import binascii
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from chembl_mcp.constants import PAGE_LIMIT, MAX_PAGE_LIMIT
+from chembl_mcp.projection import drop_empty, project
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded))["offset"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return offset
+
+
+def page_window(limit: Optional[int] = None, offset: int = 0, cursor: Optional[str] = None) -> Tuple[int, int]:
+    """`(offset, limit)` to fetch, a cursor taking precedence over `offset` and `limit` capped."""
+    if cursor:
+        offset = decode_cursor(cursor)
+    limit = PAGE_LIMIT if limit is None else limit
+    return max(offset, 0), min(max(limit, 1), MAX_PAGE_LIMIT)
+
+
+def next_cursor(offset: int, count: int, total: Optional[int]) -> Optional[str]:
+    if total is None or offset + count >= total:
+        return None
+    return encode_cursor(offset + count)
+
+
+def _encode_items(items: Iterable, fields: Optional[List[str]], compact: bool) -> Iterator[str]:
+    for item in items:
+        item = project(item, fields)
+        if compact:
+            yield json.dumps(drop_empty(item), separators=(",", ":"))
+        else:
+            yield "\n".join("    " + line for line in json.dumps(item, indent=2).splitlines())
+
+
+def serialize_page(
+    items: Iterable,
+    total: Optional[int],
+    offset: int,
+    fields: Optional[List[str]] = None,
+    compact: bool = False,
+    consumed: Optional[int] = None,
+) -> str:
+    """Serialize one page of records with its total count and the cursor of the next page.
+
+    Records are projected and encoded one at a time as `items` yields them, so
+    a lazy source is only consumed as far as the page goes and no projected
+    copy of the whole page is built. `consumed` is how far the page advances
+    through the source when that differs from the number of records.
+    """
+    encoded = list(_encode_items(items, fields, compact))
+    meta = {
+        "total": total,
+        "offset": offset,
+        "count": len(encoded),
+        "next_cursor": next_cursor(offset, len(encoded) if consumed is None else consumed, total),
+    }
+    if compact:
+        meta = {key: value for key, value in meta.items() if value is not None}
+        return json.dumps(meta, separators=(",", ":"))[:-1] + ',"molecules":[' + ",".join(encoded) + "]}"
+    header = json.dumps(meta, indent=2)[:-2]
+    if not encoded:
+        return header + ',\n  "molecules": []\n}'
+    return header + ',\n  "molecules": [\n' + ",\n".join(encoded) + "\n  ]\n}"
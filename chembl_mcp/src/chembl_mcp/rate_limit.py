@@ -0,0 +1,168 @@
+import os
+import time
+import random
+import logging
+import functools
+import threading
+from typing import Callable, Optional
+
+from requests.exceptions import ConnectionError, Timeout
+from chembl_webresource_client.http_errors import (
+    HttpTooManyRequests,
+    HttpApplicationError,
+    HttpBadGateway,
+    HttpServiceUnavailable,
+    HttpGatewayTimeout,
+)
+
+from chembl_mcp.constants import (
+    RATE_LIMIT,
+    RATE_BURST,
+    MAX_RETRIES,
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    BREAKER_THRESHOLD,
+    BREAKER_RESET,
+)
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_SERVER_ERRORS = (HttpApplicationError, HttpBadGateway, HttpServiceUnavailable, HttpGatewayTimeout)
+_NETWORK_ERRORS = (ConnectionError, Timeout)
+
+
+class UpstreamError(Exception):
+    """ChEMBL kept failing after all retries."""
+
+
+class CircuitOpenError(UpstreamError):
+    """ChEMBL is marked unhealthy and calls fail fast."""
+
+
+class TokenBucket:
+    """Thread safe token bucket, halved on a 429 and recovered additively on success."""
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """Open after `threshold` consecutive failures, allow calls again after `reset_timeout`."""
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def open(self) -> bool:
+        opened_at = self.opened_at
+        return opened_at is not None and time.monotonic() - opened_at < self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class Limiter:
+    """Rate limit, retries and circuit breaker of every ChEMBL call, shared by the worker threads.
+
+    A synchronous counterpart of the per host limiter of protein_data_bank_mcp,
+    which wraps aiohttp requests and can read their status and headers.
+    """
+
+    def __init__(self):
+        self.bucket = TokenBucket(
+            float(os.environ.get("CHEMBL_RATE_LIMIT", RATE_LIMIT)),
+            int(os.environ.get("CHEMBL_RATE_BURST", RATE_BURST)),
+        )
+        self.breaker = CircuitBreaker(
+            int(os.environ.get("CHEMBL_BREAKER_THRESHOLD", BREAKER_THRESHOLD)),
+            float(os.environ.get("CHEMBL_BREAKER_RESET", BREAKER_RESET)),
+        )
+        self.max_retries = int(os.environ.get("CHEMBL_MAX_RETRIES", MAX_RETRIES))
+        self.backoff_base = float(os.environ.get("CHEMBL_BACKOFF_BASE", BACKOFF_BASE))
+        self.backoff_max = float(os.environ.get("CHEMBL_BACKOFF_MAX", BACKOFF_MAX))
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run `fn` under the rate limit, retrying throttled, failed and 5xx calls.
+
+        The ChEMBL client raises typed exceptions without response headers, so
+        `Retry-After` cannot be honoured here and jittered backoff is used.
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if self.breaker.open:
+                raise CircuitOpenError("ChEMBL is unavailable, not retrying until the circuit closes")
+            self.bucket.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except HttpTooManyRequests as e:
+                self.bucket.throttle()
+                error = e
+            except _SERVER_ERRORS + _NETWORK_ERRORS as e:
+                self.breaker.record_failure()
+                error = e
+            else:
+                self.breaker.record_success()
+                self.bucket.recover()
+                return result
+
+            if attempt < self.max_retries:
+                delay = self.backoff(attempt)
+                logger.warning(f"ChEMBL call failed ({type(error).__name__}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+        raise UpstreamError(f"ChEMBL call failed after {self.max_retries + 1} attempts: {error}") from error
+
+
+limiter = Limiter()
+
+
+def rate_limited(fn: Callable) -> Callable:
+    """Run `fn` through the shared ChEMBL limiter."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return limiter.call(fn, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,217 @@
+import os
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mcp import types
+
+from chembl_mcp import molecules, offline_index
+from chembl_mcp.constants import PAGE_LIMIT, RESOLVE_CHUNK_SIZE, RESOLVE_RETRIES
+from chembl_mcp.projection import project, serialize, top_level_fields
+from chembl_mcp.tools import error, ok, run_blocking
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def _upper(identifier: str) -> str:
+    return identifier.strip().upper()
+
+
+def _fold(identifier: str) -> str:
+    return identifier.strip().casefold()
+
+
+def _synonyms(molecule: dict) -> List[str]:
+    return [synonym["molecule_synonym"] for synonym in molecule.get("molecule_synonyms") or []]
+
+
+def _inchi_key(molecule: dict) -> List[str]:
+    return [(molecule.get("molecule_structures") or {}).get("standard_inchi_key")]
+
+
+class Kind:
+    """How one kind of identifier is normalized, queried and matched."""
+
+    def __init__(
+        self,
+        lookup: str,
+        field: str,
+        normalize: Callable[[str], str],
+        keys: Callable[[dict], List[Optional[str]]],
+        offline: Callable[[offline_index.OfflineIndex, str], List[dict]],
+        iexact: Optional[str] = None,
+        upper_only: bool = False,
+    ):
+        self.lookup = lookup
+        self.field = field
+        self.normalize = normalize
+        self.keys = keys
+        self.offline = offline
+        self.iexact = iexact
+        self.upper_only = upper_only
+
+    def query_values(self, identifier: str) -> List[str]:
+        """Values to send upstream, where `__in` matches exactly and case matters."""
+        identifier = identifier.strip()
+        if self.upper_only:
+            return [identifier.upper()]
+        # names are upper case in ChEMBL, synonyms usually as typed
+        return list(dict.fromkeys([identifier, identifier.upper()]))
+
+
+KINDS = {
+    "chembl_id": Kind(
+        "molecule_chembl_id", "molecule_chembl_id", _upper,
+        lambda m: [m.get("molecule_chembl_id")],
+        lambda index, id_: index.by_chembl_ids([id_]),
+        upper_only=True,
+    ),
+    "pref_name": Kind(
+        "pref_name", "pref_name", _upper,
+        lambda m: [m.get("pref_name")],
+        lambda index, id_: index.by_pref_name(id_),
+        upper_only=True,
+    ),
+    "synonym": Kind(
+        "molecule_synonyms__molecule_synonym", "molecule_synonyms", _fold,
+        _synonyms,
+        lambda index, id_: index.by_synonym(id_),
+        iexact="molecule_synonyms__molecule_synonym_iexact",
+    ),
+    "inchi_key": Kind(
+        "molecule_structures__standard_inchi_key", "molecule_structures", _upper,
+        _inchi_key,
+        lambda index, id_: index.by_inchi_key(id_),
+        upper_only=True,
+    ),
+}
+
+
+def _chunks(values: List[str], size: int) -> List[List[str]]:
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
+def _match(kind: Kind, found: List[dict], wanted: Dict[str, List[dict]]):
+    """File each molecule under every wanted key it carries, once per molecule."""
+    for molecule in found:
+        for key in {kind.normalize(key) for key in kind.keys(molecule) if key}:
+            if key in wanted and molecule not in wanted[key]:
+                wanted[key].append(molecule)
+
+
+def _lookup_offline(kind: Kind, identifiers: List[str]) -> List[dict]:
+    """Molecules the offline index holds for `identifiers`, none when there is no index."""
+    index = offline_index.get_index()
+    if index is None:
+        return []
+    return [molecule for identifier in identifiers for molecule in kind.offline(index, identifier)]
+
+
+async def resolve(
+    identifiers: List[str], kind: str = "pref_name", fields: Optional[List[str]] = None
+) -> Tuple[Dict[str, Any], int]:
+    """Map each identifier to its matching molecules, and count upstream calls.
+
+    A miss maps to None, an identifier whose upstream query failed to an
+    `error` entry. Identifiers are deduplicated after normalization. The
+    offline index is tried first, answering its `DEFAULT_FIELDS` when
+    `fields` is left out, the rest is sent upstream as concurrent
+    `__in` queries of `CHEMBL_RESOLVE_CHUNK` values. Names are upper case in
+    ChEMBL and matched as such, synonyms `__in` missed because of their case
+    are retried one by one with `iexact`, at most `CHEMBL_RESOLVE_RETRIES`
+    of them; the others stay misses.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {', '.join(KINDS)}, got {kind!r}")
+    spec = KINDS[kind]
+    originals: Dict[str, str] = {}
+    for identifier in identifiers:
+        if identifier.strip():
+            originals.setdefault(spec.normalize(identifier), identifier)
+    matches: Dict[str, List[dict]] = {key: [] for key in originals}
+    errors: Dict[str, str] = {}
+
+    fields = offline_index.default_fields(fields)
+    if originals and offline_index.covers(fields):
+        # SQLite reads block, so the whole batch is looked up in one worker
+        try:
+            _match(spec, await run_blocking(_lookup_offline, spec, list(originals.values())), matches)
+        except Exception as e:
+            logger.warning(f"Offline lookup failed, asking upstream: {e}")
+
+    # the matching field is needed even if `fields` leaves it out
+    upstream_fields = top_level_fields(fields) + [spec.field] if fields else None
+    pending = [key for key, found in matches.items() if not found]
+    values = list(dict.fromkeys(value for key in pending for value in spec.query_values(originals[key])))
+    chunk_size = int(os.environ.get("CHEMBL_RESOLVE_CHUNK", RESOLVE_CHUNK_SIZE))
+    chunks = _chunks(values, chunk_size)
+    results = await asyncio.gather(
+        *[run_blocking(molecules.filter_by, f"{spec.lookup}__in", chunk, upstream_fields) for chunk in chunks],
+        return_exceptions=True,
+    )
+    for chunk, found in zip(chunks, results):
+        if isinstance(found, Exception):
+            logger.warning(f"Resolving {len(chunk)} identifiers failed: {found}")
+            failed = {spec.normalize(value) for value in chunk}
+            errors.update((key, str(found) or type(found).__name__) for key in failed if key in matches)
+        else:
+            _match(spec, found, matches)
+    calls = len(chunks)
+
+    if spec.iexact:
+        pending = [key for key, found in matches.items() if not found and key not in errors]
+        retries = int(os.environ.get("CHEMBL_RESOLVE_RETRIES", RESOLVE_RETRIES))
+        if len(pending) > retries:
+            logger.info(f"Not retrying {len(pending) - retries} of {len(pending)} missed identifiers")
+            pending = pending[:retries]
+        # the retries queue behind each other, only the upstream call is timed
+        results = await asyncio.gather(
+            *[
+                run_blocking(
+                    molecules.filter_by, spec.iexact, originals[key], upstream_fields, PAGE_LIMIT, queued=False
+                )
+                for key in pending
+            ],
+            return_exceptions=True,
+        )
+        for key, found in zip(pending, results):
+            if isinstance(found, Exception):
+                errors[key] = str(found) or type(found).__name__
+            else:
+                matches[key].extend(found)
+        calls += len(pending)
+    logger.info(f"Resolved {len(matches)} identifiers with {calls} upstream calls")
+
+    resolved: Dict[str, Any] = {}
+    for key, found in matches.items():
+        if found:
+            resolved[originals[key]] = [project(molecule, fields) for molecule in found]
+        elif key in errors:
+            resolved[originals[key]] = {"error": errors[key]}
+        else:
+            resolved[originals[key]] = None
+    return resolved, calls
+
+
+async def resolve_molecules(
+    identifiers: List[str],
+    kind: str = "pref_name",
+    fields: Optional[List[str]] = None,
+    compact: bool = False,
+) -> types.TextContent:
+    """Resolve many identifiers at once, mapping each one to its molecules, null, or an error.
+
+    `kind` is `pref_name`, `synonym`, `inchi_key` or `chembl_id`. Use this
+    instead of one lookup per compound when triaging lists of compounds.
+    Without `fields`, molecules hold at least their ids, names, phase, type,
+    structures and synonyms, which the offline index answers; name other
+    fields, e.g. molecule_properties.full_mwt, to get them.
+    """
+    try:
+        resolved, _ = await resolve(identifiers, kind, fields)
+    except Exception as e:
+        logger.warning(f"resolve_molecules failed: {e}")
+        return error(e)
+    missing = [identifier for identifier, found in resolved.items() if found is None]
+    return ok(serialize({"resolved": resolved, "missing": missing}, compact=compact))
@@ -4,6 +4,15 @@ from dotenv import load_dotenv, find_dotenv
 
 from mcp.server import FastMCP
 
+from chembl_mcp.tools import (
+    molecule_by_pref_name,
+    molecule_by_synonym,
+    molecule_by_chembl_id,
+    molecule_by_inchi_key,
+)
+from chembl_mcp.resolve import resolve_molecules
+from chembl_mcp.similarity import similar_molecules
+
 load_dotenv(find_dotenv())
 
 logger = logging.getLogger(__name__)
@@ -13,6 +22,12 @@ mcp_server = FastMCP(os.environ["CHEMBL_MCP_HOST"],
                      port=os.environ["CHEMBL_MCP_PORT"])
 
 tools = [
+    molecule_by_pref_name,
+    molecule_by_synonym,
+    molecule_by_chembl_id,
+    molecule_by_inchi_key,
+    resolve_molecules,
+    similar_molecules,
 ]
 
 for tool in tools:
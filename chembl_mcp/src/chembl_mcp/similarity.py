@@ -0,0 +1,33 @@
+import logging
+
+from mcp import types
+
+from chembl_mcp import fingerprints
+from chembl_mcp.constants import MAX_PAGE_LIMIT
+from chembl_mcp.projection import serialize
+from chembl_mcp.tools import error, ok, run_blocking
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def _search(smiles: str, limit: int, threshold: float) -> dict:
+    index = fingerprints.get_index()
+    return {"indexed": len(index), "hits": index.search(smiles, limit, threshold)}
+
+
+async def similar_molecules(
+    smiles: str, limit: int = 10, threshold: float = 0.0, compact: bool = False
+) -> types.TextContent:
+    """Molecules most similar to a SMILES structure, by Tanimoto similarity (0 to 1) of path fingerprints.
+
+    Only searches molecules indexed locally: the offline index import and
+    every molecule returned by earlier lookups. `threshold` drops hits below
+    that similarity.
+    """
+    try:
+        found = await run_blocking(_search, smiles, min(max(limit, 1), MAX_PAGE_LIMIT), threshold)
+    except Exception as e:
+        logger.warning(f"similar_molecules failed: {e}")
+        return error(e)
+    return ok(serialize(found, compact=compact))
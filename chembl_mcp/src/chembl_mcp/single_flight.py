@@ -0,0 +1,62 @@
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesce calls from worker threads sharing a key into one in-flight call.
+
+    The ChEMBL client blocks, so unlike the asyncio version in
+    protein_data_bank_mcp the first thread to call with a key runs the
+    function itself, and threads calling with it meanwhile block on its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+_group = SingleFlight()
+
+
+def coalesce(fn: Callable) -> Callable:
+    """Share one call between concurrent callers passing the same arguments."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__qualname__, _freeze(args), _freeze(kwargs))
+        return _group.do(key, lambda: fn(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,162 @@
+import os
+import json
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from mcp import types
+
+from chembl_mcp import molecules
+from chembl_mcp.constants import WORKERS, CALL_TIMEOUT
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """Worker threads running the blocking ChEMBL client, shared by all tools."""
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=int(os.environ.get("CHEMBL_WORKERS", WORKERS)), thread_name_prefix="chembl"
+        )
+    return _pool
+
+
+def ok(body: str) -> types.TextContent:
+    """Wrap an already serialized JSON result without decoding it again."""
+    return types.TextContent(type="text", text=f'{{"status":"ok","result":{body}}}')
+
+
+def error(e: BaseException) -> types.TextContent:
+    message = str(e) or type(e).__name__
+    return types.TextContent(
+        type="text", text=json.dumps({"status": "error", "error": {"type": type(e).__name__, "message": message}})
+    )
+
+
+async def run_blocking(fn: Callable, *args, timeout: Optional[float] = None, queued: bool = True, **kwargs):
+    """Run a blocking call in the worker pool, giving up after `timeout` seconds.
+
+    Time spent queued for a worker counts towards the timeout unless `queued`
+    is False, for batches that are expected to wait their turn. A call that
+    times out or is cancelled before a worker picks it up never runs; one
+    that already started finishes in the background and its result is dropped.
+    """
+    if timeout is None:
+        timeout = float(os.environ.get("CHEMBL_CALL_TIMEOUT", CALL_TIMEOUT))
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    if queued:
+        return await asyncio.wait_for(loop.run_in_executor(get_pool(), call), timeout)
+
+    started = asyncio.Event()
+
+    def run():
+        loop.call_soon_threadsafe(started.set)
+        return call()
+
+    future = loop.run_in_executor(get_pool(), run)
+    waiter = asyncio.ensure_future(started.wait())
+    try:
+        await asyncio.wait([future, waiter], return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    finally:
+        waiter.cancel()
+    return await asyncio.wait_for(future, timeout)
+
+
+async def call_tool(fn: Callable, *args, **kwargs) -> types.TextContent:
+    """Run a molecule lookup and wrap its outcome in the common envelope."""
+    try:
+        return ok(await run_blocking(fn, *args, **kwargs))
+    except asyncio.TimeoutError:
+        logger.warning(f"{fn.__name__} timed out")
+        return error(TimeoutError(f"{fn.__name__} did not finish in time"))
+    except Exception as e:
+        logger.warning(f"{fn.__name__} failed: {e}")
+        return error(e)
+
+
+async def molecule_by_pref_name(
+    pref_name: str,
+    fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> types.TextContent:
+    """Molecules whose preferred name matches, case-insensitively (e.g. ASPIRIN).
+
+    Pages of `limit` molecules (default 20, at most 1000) start at `offset`
+    or at the `next_cursor` of the previous page. Without `fields`, molecules
+    hold at least their ids, names, phase, type, structures and synonyms,
+    which the offline index answers; name other fields, e.g.
+    molecule_properties.full_mwt, to get them.
+    """
+    return await call_tool(molecules.get_molecule_pref_name, pref_name, fields, compact, limit, offset, cursor)
+
+
+async def molecule_by_synonym(
+    synonym: str,
+    fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> types.TextContent:
+    """Molecules with a matching synonym, case-insensitively (e.g. acetylsalicylic acid).
+
+    Pages of `limit` molecules (default 20, at most 1000) start at `offset`
+    or at the `next_cursor` of the previous page. Without `fields`, molecules
+    hold at least their ids, names, phase, type, structures and synonyms,
+    which the offline index answers; name other fields, e.g.
+    molecule_properties.full_mwt, to get them.
+    """
+    return await call_tool(molecules.get_molecule_synonyms, synonym, fields, compact, limit, offset, cursor)
+
+
+async def molecule_by_chembl_id(
+    chembl_ids: List[str],
+    fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> types.TextContent:
+    """Molecules for a list of ChEMBL ids (e.g. CHEMBL25).
+
+    Pages of `limit` molecules (default 20, at most 1000) start at `offset`
+    or at the `next_cursor` of the previous page. Without `fields`, molecules
+    hold at least their ids, names, phase, type, structures and synonyms,
+    which the offline index answers; name other fields, e.g.
+    molecule_properties.full_mwt, to get them.
+    """
+    return await call_tool(molecules.get_molecule_chembl_id, list(chembl_ids), fields, compact, limit, offset, cursor)
+
+
+async def molecule_by_inchi_key(
+    standard_inchi_key: str,
+    fields: Optional[List[str]] = None,
+    compact: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> types.TextContent:
+    """Molecules with a given standard InChIKey.
+
+    Pages of `limit` molecules (default 20, at most 1000) start at `offset`
+    or at the `next_cursor` of the previous page. Without `fields`, molecules
+    hold at least their ids, names, phase, type, structures and synonyms,
+    which the offline index answers; name other fields, e.g.
+    molecule_properties.full_mwt, to get them.
+    """
+    return await call_tool(
+        molecules.get_molecule_standard_inchi_key, standard_inchi_key, fields, compact, limit, offset, cursor
+    )
@@ -0,0 +1,34 @@
+import sys
+import types
+import importlib
+
+import pytest
+
+import chembl_mcp
+
+
+@pytest.fixture
+def molecules(monkeypatch):
+    """An empty stand-in for `chembl_mcp.molecules`, whose ChEMBL client reaches the network when imported.
+
+    Tests set the lookups they need on it. The modules importing it are imported again against it.
+    """
+    stub = types.ModuleType("chembl_mcp.molecules")
+    monkeypatch.setitem(sys.modules, "chembl_mcp.molecules", stub)
+    monkeypatch.setattr(chembl_mcp, "molecules", stub, raising=False)
+    for name in ("chembl_mcp.tools", "chembl_mcp.resolve"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return stub
+
+
+@pytest.fixture
+def tools(molecules):
+    module = importlib.import_module("chembl_mcp.tools")
+    yield module
+    if module._pool is not None:
+        module._pool.shutdown(wait=False, cancel_futures=True)
+
+
+@pytest.fixture
+def resolve(tools):
+    return importlib.import_module("chembl_mcp.resolve")
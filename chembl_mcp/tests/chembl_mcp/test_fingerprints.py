@@ -0,0 +1,80 @@
+import pytest
+
+from chembl_mcp.fingerprints import FingerprintIndex, fingerprint, parse_smiles, tanimoto
+
+ASPIRIN = "CC(=O)Oc1ccccc1C(=O)O"
+MOLECULES = [
+    ("CHEMBL25", ASPIRIN),
+    ("CHEMBL2", "CC(=O)Oc1ccccc1C(=O)OC"),
+    ("CHEMBL545", "CCO"),
+    ("CHEMBL14688", "CCCO"),
+    ("CHEMBL277500", "c1ccccc1"),
+]
+
+
+def test_parse_smiles():
+    labels, bonds = parse_smiles("C1CC[NH+]1.[Na+]")
+    assert labels == ["C", "C", "C", "N+", "Na+"]
+    assert sorted(neighbour for neighbour, _ in bonds[0]) == [1, 3]
+    assert bonds[4] == []
+
+
+@pytest.mark.parametrize("smiles", ["C1CC", "CC)C", "C(", "CCX", ""])
+def test_invalid_smiles(smiles):
+    with pytest.raises(ValueError):
+        parse_smiles(smiles)
+
+
+def test_fingerprint_ignores_atom_order():
+    assert (fingerprint("OCC") == fingerprint("CCO")).all()
+    assert tanimoto(fingerprint(ASPIRIN), fingerprint("OC(=O)c1ccccc1OC(C)=O")) == 1.0
+    assert tanimoto(fingerprint(ASPIRIN), fingerprint("CCO")) < 0.5
+
+
+@pytest.mark.parametrize("aromatic, kekule", [
+    ("c1ccccc1", "C1=CC=CC=C1"),
+    (ASPIRIN, "CC(=O)OC1=CC=CC=C1C(=O)O"),
+    ("c1ccc2ccccc2c1", "C1=CC=C2C=CC=CC2=C1"),
+    ("c1cc[nH]c1", "C1=CNC=C1"),
+    ("c1ccc(-c2ccccc2)cc1", "C1=CC=C(C=C1)C1=CC=CC=C1"),
+    ("Cn1cnc2c1c(=O)n(C)c(=O)n2C", "CN1C=NC2=C1C(=O)N(C)C(=O)N2C"),
+])
+def test_fingerprint_reads_kekule_rings_as_aromatic(aromatic, kekule):
+    assert (fingerprint(aromatic) == fingerprint(kekule)).all()
+
+
+def test_non_aromatic_rings_stay_kekule():
+    for smiles in ["C1=CCC=C1", "C1=CCCCC1", "O=C1C=CC(=O)C=C1"]:
+        labels, _ = parse_smiles(smiles)
+        assert all(label.isupper() for label in labels)
+
+
+def test_index_search(tmp_path):
+    index = FingerprintIndex(tmp_path / "fingerprints", bits=512)
+    assert index.search("CCO") == []
+    assert index.add(MOLECULES[:3]) == 3
+    assert index.add(MOLECULES) == 2
+    assert index.add([("CHEMBL1", "not a smiles")]) == 0
+    assert len(index) == 5
+
+    hits = index.search(ASPIRIN, limit=2)
+    assert [hit["molecule_chembl_id"] for hit in hits] == ["CHEMBL25", "CHEMBL2"]
+    assert hits[0]["similarity"] == 1.0
+    assert [hit["molecule_chembl_id"] for hit in index.search("CCCCO", threshold=0.3)] == ["CHEMBL14688", "CHEMBL545"]
+
+
+def test_index_reopens(tmp_path):
+    index = FingerprintIndex(tmp_path / "fingerprints", bits=512)
+    index.add(MOLECULES)
+    index.close()
+    # a fingerprint written without its id is dropped when reopening
+    with open(tmp_path / "fingerprints" / "fingerprints.bin", "ab") as f:
+        f.write(bytes(64))
+
+    index = FingerprintIndex(tmp_path / "fingerprints", bits=512)
+    assert len(index) == 5
+    assert index.search("c1ccccc1", limit=1)[0]["molecule_chembl_id"] == "CHEMBL277500"
+    assert index.add([("CHEMBL6", "CC(C)O")]) == 1
+    assert index.search("CC(C)O", limit=1)[0]["molecule_chembl_id"] == "CHEMBL6"
+
+    assert len(FingerprintIndex(tmp_path / "fingerprints", bits=1024)) == 0
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+
+from chembl_mcp import offline_index
+from chembl_mcp.offline_index import DEFAULT_FIELDS, OfflineIndex, build_index, covers, default_fields
+
+ASPIRIN_KEY = "BSYNRYMUTXBXSQ-UHFFFAOYSA-N"
+
+
+@pytest.fixture
+def dump(tmp_path):
+    """A tiny dump with the tables and columns of the official ChEMBL SQLite schema used by the importer."""
+    path = tmp_path / "chembl_fixture.db"
+    db = sqlite3.connect(path)
+    db.executescript(
+        """
+        CREATE TABLE molecule_dictionary (
+            molregno INTEGER PRIMARY KEY, pref_name TEXT, chembl_id TEXT, max_phase NUMERIC, molecule_type TEXT
+        );
+        CREATE TABLE compound_structures (
+            molregno INTEGER PRIMARY KEY, molfile TEXT, standard_inchi TEXT, standard_inchi_key TEXT,
+            canonical_smiles TEXT
+        );
+        CREATE TABLE molecule_synonyms (
+            molregno INTEGER, syn_type TEXT, molsyn_id INTEGER PRIMARY KEY, res_stem_id INTEGER, synonyms TEXT
+        );
+        INSERT INTO molecule_dictionary VALUES
+            (1280, 'ASPIRIN', 'CHEMBL25', 4.0, 'Small molecule'),
+            (2, 'ÉTHANOL', 'CHEMBL545', 4.0, 'Small molecule'),
+            (3, NULL, 'CHEMBL999', NULL, 'Protein');
+        INSERT INTO compound_structures VALUES
+            (1280, '', 'InChI=1S/C9H8O4/c1-6(10)13-8-5-3-2-4-7(8)9(11)12/h2-5H,1H3,(H,11,12)',
+             'BSYNRYMUTXBXSQ-UHFFFAOYSA-N', 'CC(=O)Oc1ccccc1C(=O)O'),
+            (2, '', 'InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3', 'LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'CCO');
+        INSERT INTO molecule_synonyms VALUES
+            (1280, 'TRADE_NAME', 1, NULL, 'Aspirin'),
+            (1280, 'OTHER', 2, NULL, 'Acetylsalicylic Acid'),
+            (2, 'OTHER', 3, NULL, 'Alcohol');
+        """
+    )
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest.fixture
+def index(dump, tmp_path):
+    counts = build_index(dump, tmp_path / "index" / "chembl_index.sqlite")
+    assert counts == {"molecules": 3, "synonyms": 3}
+    index = OfflineIndex(tmp_path / "index" / "chembl_index.sqlite")
+    yield index
+    index.close()
+
+
+def test_lookups_are_case_insensitive(index: OfflineIndex):
+    assert [m["molecule_chembl_id"] for m in index.by_pref_name("aspirin")] == ["CHEMBL25"]
+    assert [m["molecule_chembl_id"] for m in index.by_pref_name("éthanol")] == ["CHEMBL545"]
+    assert [m["molecule_chembl_id"] for m in index.by_synonym("ACETYLSALICYLIC acid")] == ["CHEMBL25"]
+    assert index.by_synonym("caffeine") == []
+
+
+def test_record_shape_matches_web_service(index: OfflineIndex):
+    (aspirin,) = index.by_inchi_key(ASPIRIN_KEY.lower())
+    assert aspirin["molecule_structures"]["canonical_smiles"] == "CC(=O)Oc1ccccc1C(=O)O"
+    assert {s["molecule_synonym"] for s in aspirin["molecule_synonyms"]} == {"Aspirin", "Acetylsalicylic Acid"}
+    assert index.by_chembl_ids(["CHEMBL999"])[0]["molecule_structures"] is None
+
+
+def test_chembl_ids_keep_input_order(index: OfflineIndex):
+    found = index.by_chembl_ids(["chembl545", "CHEMBL404", "CHEMBL25", "CHEMBL545"])
+    assert [m["molecule_chembl_id"] for m in found] == ["CHEMBL545", "CHEMBL25"]
+
+
+def test_covers():
+    assert not covers(None)
+    assert not covers([])
+    assert covers(["molecule_chembl_id", "molecule_structures.canonical_smiles"])
+    assert not covers(["molecule_properties.full_mwt"])
+    assert not covers(["molecule_structures.molfile"])
+
+
+def test_default_fields(index: OfflineIndex, monkeypatch):
+    assert covers(DEFAULT_FIELDS)
+    monkeypatch.setattr(offline_index, "get_index", lambda: index)
+    assert default_fields(None) == DEFAULT_FIELDS
+    assert default_fields(["pref_name"]) == ["pref_name"]
+    monkeypatch.setattr(offline_index, "get_index", lambda: None)
+    assert default_fields(None) is None
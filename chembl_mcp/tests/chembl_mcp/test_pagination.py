@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from chembl_mcp.pagination import decode_cursor, encode_cursor, page_window, serialize_page
+
+MOLECULES = [
+    {"molecule_chembl_id": f"CHEMBL{i}", "pref_name": None, "molecule_structures": {"standard_inchi_key": "KEY"}}
+    for i in range(3)
+]
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(40)) == 40
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(-1), "eyJwYWdlIjogMX0"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_page_window():
+    assert page_window() == (0, 20)
+    assert page_window(limit=5000, offset=10) == (10, 1000)
+    assert page_window(limit=5, offset=10, cursor=encode_cursor(30)) == (30, 5)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_serialize_page(compact):
+    page = json.loads(serialize_page(iter(MOLECULES), 10, 4, ["molecule_chembl_id"], compact))
+    assert page["total"] == 10
+    assert page["offset"] == 4
+    assert page["count"] == 3
+    assert decode_cursor(page["next_cursor"]) == 7
+    assert page["molecules"] == [{"molecule_chembl_id": f"CHEMBL{i}"} for i in range(3)]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_serialize_last_page(compact):
+    page = json.loads(serialize_page([], 5, 3, compact=compact, consumed=2))
+    assert page["count"] == 0
+    assert page["molecules"] == []
+    assert page.get("next_cursor") is None
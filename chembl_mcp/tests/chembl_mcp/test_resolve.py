@@ -0,0 +1,153 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+from chembl_mcp import offline_index
+
+RECORDS = [
+    {"molecule_chembl_id": "CHEMBL25", "pref_name": "ASPIRIN", "molecule_synonyms": [{"molecule_synonym": "Aspirin"}]},
+    {"molecule_chembl_id": "CHEMBL545", "pref_name": "ETHANOL", "molecule_synonyms": [{"molecule_synonym": "Alcohol"}]},
+    {"molecule_chembl_id": "CHEMBL112", "pref_name": "PARACETAMOL",
+     "molecule_synonyms": [{"molecule_synonym": "Acetaminophen"}]},
+]
+
+
+def _values(record, field):
+    if field.startswith("molecule_synonyms"):
+        return [synonym["molecule_synonym"] for synonym in record["molecule_synonyms"]]
+    return [record[field]]
+
+
+@pytest.fixture
+def upstream(molecules, monkeypatch):
+    """`filter_by` answering from `RECORDS`, recording every call and failing for values in `failing`.
+
+    There is no offline index unless a test provides one.
+    """
+    calls, failing = [], set()
+
+    def filter_by(lookup, value, fields=None, limit=None):
+        calls.append((lookup, value))
+        if failing & set(value if isinstance(value, list) else [value]):
+            raise RuntimeError("upstream down")
+        if lookup.endswith("__in"):
+            field = lookup[:-len("__in")]
+            return [record for record in RECORDS if set(_values(record, field)) & set(value)]
+        field = lookup[:-len("_iexact")].rstrip("_")
+        return [
+            record for record in RECORDS
+            if value.casefold() in {found.casefold() for found in _values(record, field)}
+        ]
+
+    molecules.filter_by = filter_by
+    monkeypatch.setattr(offline_index, "get_index", lambda: None)
+    return calls, failing
+
+
+def test_values_are_sent_in_chunks(resolve, upstream, monkeypatch):
+    calls, _ = upstream
+    monkeypatch.setenv("CHEMBL_RESOLVE_CHUNK", "2")
+    resolved, count = asyncio.run(
+        resolve.resolve(["CHEMBL25", "chembl25 ", "CHEMBL545", "CHEMBL3", "CHEMBL4"], kind="chembl_id")
+    )
+    assert count == 2
+    assert calls == [
+        ("molecule_chembl_id__in", ["CHEMBL25", "CHEMBL545"]),
+        ("molecule_chembl_id__in", ["CHEMBL3", "CHEMBL4"]),
+    ]
+    assert resolved == {
+        "CHEMBL25": [RECORDS[0]],
+        "CHEMBL545": [RECORDS[1]],
+        "CHEMBL3": None,
+        "CHEMBL4": None,
+    }
+
+
+def test_names_are_matched_in_upper_case(resolve, upstream):
+    calls, _ = upstream
+    resolved, count = asyncio.run(resolve.resolve(["aspirin", " ASPIRIN", "Paracetamol", "unknown"]))
+    assert resolved == {"aspirin": [RECORDS[0]], "Paracetamol": [RECORDS[2]], "unknown": None}
+    # names are upper case in ChEMBL, so a single `__in` query settles them
+    assert calls == [("pref_name__in", ["ASPIRIN", "PARACETAMOL", "UNKNOWN"])]
+    assert count == 1
+
+
+def test_synonyms_missed_by_case_are_retried_with_iexact(resolve, upstream, monkeypatch):
+    calls, _ = upstream
+    monkeypatch.setenv("CHEMBL_RESOLVE_RETRIES", "2")
+    resolved, count = asyncio.run(
+        resolve.resolve(["Aspirin", "acetaminophen", "ALCOHOL", "unknown"], kind="synonym")
+    )
+    assert resolved == {
+        "Aspirin": [RECORDS[0]], "acetaminophen": [RECORDS[2]], "ALCOHOL": [RECORDS[1]], "unknown": None,
+    }
+    assert calls[0][0] == "molecule_synonyms__molecule_synonym__in"
+    assert sorted(value for _, value in calls[1:]) == ["ALCOHOL", "acetaminophen"]
+    assert count == 3
+
+    # beyond `CHEMBL_RESOLVE_RETRIES`, misses are not retried
+    monkeypatch.setenv("CHEMBL_RESOLVE_RETRIES", "0")
+    calls.clear()
+    resolved, count = asyncio.run(resolve.resolve(["acetaminophen"], kind="synonym"))
+    assert resolved == {"acetaminophen": None}
+    assert count == 1
+
+
+def test_failing_chunk_marks_only_its_identifiers(resolve, upstream, monkeypatch):
+    calls, failing = upstream
+    failing.add("alcohol")
+    monkeypatch.setenv("CHEMBL_RESOLVE_CHUNK", "2")
+    resolved, count = asyncio.run(resolve.resolve(["Aspirin", "alcohol"], kind="synonym"))
+    assert resolved == {"Aspirin": [RECORDS[0]], "alcohol": {"error": "upstream down"}}
+    # identifiers whose query failed are not retried one by one
+    assert count == 2
+    assert all(lookup.endswith("__in") for lookup, _ in calls)
+
+
+def test_offline_lookups_run_in_a_worker(resolve, upstream, monkeypatch):
+    calls, _ = upstream
+    threads = []
+
+    class Index:
+        def by_chembl_ids(self, chembl_ids):
+            threads.append(threading.current_thread())
+            return [record for record in RECORDS if record["molecule_chembl_id"] in chembl_ids]
+
+    monkeypatch.setattr(offline_index, "get_index", Index)
+    resolved, count = asyncio.run(
+        resolve.resolve(["CHEMBL25", "CHEMBL545", "CHEMBL9"], kind="chembl_id", fields=["pref_name"])
+    )
+    assert resolved == {
+        "CHEMBL25": [{"pref_name": "ASPIRIN"}], "CHEMBL545": [{"pref_name": "ETHANOL"}], "CHEMBL9": None,
+    }
+    assert len(threads) == 3 and threading.main_thread() not in threads
+    assert calls == [("molecule_chembl_id__in", ["CHEMBL9"])]
+    assert count == 1
+
+
+def test_lookups_without_fields_use_the_offline_index(resolve, upstream, monkeypatch):
+    calls, _ = upstream
+
+    class Index:
+        def by_chembl_ids(self, chembl_ids):
+            return [record for record in RECORDS if record["molecule_chembl_id"] in chembl_ids]
+
+    monkeypatch.setattr(offline_index, "get_index", Index)
+    resolved, count = asyncio.run(resolve.resolve(["CHEMBL25", "CHEMBL9"], kind="chembl_id"))
+    assert resolved == {"CHEMBL25": [RECORDS[0]], "CHEMBL9": None}
+    # the miss asks the web service for the same default fields
+    assert calls == [("molecule_chembl_id__in", ["CHEMBL9"])]
+    assert count == 1
+
+
+def test_resolve_molecules_envelope(resolve, upstream):
+    result = asyncio.run(resolve.resolve_molecules(["CHEMBL25", "CHEMBL3"], kind="chembl_id", fields=["pref_name"]))
+    assert json.loads(result.text) == {
+        "status": "ok",
+        "result": {"resolved": {"CHEMBL25": [{"pref_name": "ASPIRIN"}], "CHEMBL3": None}, "missing": ["CHEMBL3"]},
+    }
+
+    result = asyncio.run(resolve.resolve_molecules(["CHEMBL25"], kind="formula"))
+    assert json.loads(result.text)["error"]["type"] == "ValueError"
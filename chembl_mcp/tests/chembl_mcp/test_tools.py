@@ -0,0 +1,76 @@
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_ok_wraps_the_body_as_is(tools):
+    def lookup():
+        return '{"molecules": [ 1,2 ]}'
+
+    result = asyncio.run(tools.call_tool(lookup))
+    assert result.text == '{"status":"ok","result":{"molecules": [ 1,2 ]}}'
+
+
+def test_timeout_answers_an_error_envelope(tools, monkeypatch):
+    monkeypatch.setenv("CHEMBL_CALL_TIMEOUT", "0.05")
+    release = threading.Event()
+
+    def lookup():
+        release.wait(5)
+
+    try:
+        result = asyncio.run(tools.call_tool(lookup))
+    finally:
+        release.set()
+    assert json.loads(result.text) == {
+        "status": "error", "error": {"type": "TimeoutError", "message": "lookup did not finish in time"},
+    }
+
+
+def test_errors_answer_an_error_envelope(tools):
+    def lookup():
+        raise KeyError("CHEMBL0")
+
+    result = asyncio.run(tools.call_tool(lookup))
+    assert json.loads(result.text)["error"] == {"type": "KeyError", "message": "'CHEMBL0'"}
+
+
+def test_call_timing_out_in_the_queue_never_runs(tools, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(tools, "_pool", pool)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def busy():
+        started.set()
+        release.wait(5)
+        return "busy"
+
+    async def run():
+        first = asyncio.ensure_future(tools.run_blocking(busy, timeout=5))
+        await asyncio.to_thread(started.wait, 5)
+        queued = await tools.call_tool(lambda: ran.append(True), timeout=0.05)
+        release.set()
+        return await first, queued
+
+    first, queued = asyncio.run(run())
+    pool.shutdown(wait=True)
+    assert first == "busy"
+    assert json.loads(queued.text)["error"]["type"] == "TimeoutError"
+    assert ran == []
+
+
+def test_unqueued_timeout_starts_with_the_call(tools, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(tools, "_pool", pool)
+
+    async def run():
+        busy = asyncio.ensure_future(tools.run_blocking(time.sleep, 0.3, timeout=5))
+        queued = await tools.run_blocking(lambda: "done", timeout=0.1, queued=False)
+        await busy
+        return queued
+
+    assert asyncio.run(run()) == "done"
+    pool.shutdown(wait=True)
@@ -3,7 +3,7 @@ import logging
 
 from dotenv import find_dotenv, load_dotenv
 from hydra import compose, initialize
-from client import OllamaClient, MCPClient
+from client import OllamaClient, MCPClient, build_cache, build_context
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -13,8 +13,22 @@ load_dotenv(find_dotenv())
 initialize(config_path="conf")
 cfg = compose(config_name="config")
 
-llm = OllamaClient(model=cfg.ollama.model, base_url=cfg.ollama.base_url)
-client = MCPClient(llm)
+llm = OllamaClient(
+    model=cfg.ollama.model,
+    base_url=cfg.ollama.base_url,
+    pool_size=cfg.ollama.pool_size,
+    keepalive_timeout=cfg.ollama.keepalive_timeout,
+    num_ctx=cfg.ollama.num_ctx,
+)
+client = MCPClient(
+    llm,
+    tool_timeout=cfg.mcp.tool_timeout,
+    max_concurrency=cfg.mcp.max_concurrency,
+    heartbeat_interval=cfg.mcp.heartbeat_interval,
+    max_depth=cfg.agent.max_depth,
+    cache=build_cache(cfg.cache),
+    context=build_context(cfg),
+)
 
 
 @cl.set_chat_profiles
@@ -76,18 +90,21 @@ def start_chat():
 
 @cl.on_message
 async def main(message: cl.Message):
+    # connects on the first message only, every chat then shares the same sessions
     await client.connect_to_servers(cfg.mcp.servers)
 
     message_history = cl.user_session.get("message_history", [])
     message_history.append({"role": "user", "content": message.content})
     msg = cl.Message(content="")
 
-    max_history_length = 10
-    stream = await client.process_query(message.content, history=message_history[-max_history_length:])
+    # the client evicts the oldest turns that do not fit the context budget
+    stream = await client.process_query(message.content, history=message_history)
 
     async for part in stream:
         if token := part["message"]["content"] or "":
             await msg.stream_token(token)
 
     message_history.append({"role": "assistant", "content": msg.content})
+    # the session keeps no more history than a prompt could hold
+    client.context.fit(message_history, len(message_history))
     await msg.update()
@@ -2,13 +2,14 @@ import json
 import aiohttp
 import asyncio
 import logging
-from contextlib import AsyncExitStack
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 
 from dotenv import find_dotenv, load_dotenv
 from hydra import compose, initialize
-from mcp import ClientSession
-from mcp.client.sse import sse_client
+
+from connections import ConnectionManager
+from context import ContextBuilder, dedupe
+from tool_cache import SharedStore, ToolCache, is_error_body
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -17,31 +18,124 @@ logging.basicConfig(level=logging.INFO)
 load_dotenv(find_dotenv())
 
 
+class NDJSONDecoder:
+    """Incremental decoder for newline delimited JSON arriving in arbitrary chunks."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[dict]:
+        """Objects completed by `chunk`, keeping a trailing partial line for the next one."""
+        self._buffer += chunk
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return []
+        lines = self._buffer[:end].split(b"\n")
+        del self._buffer[:end + 1]
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def close(self) -> List[dict]:
+        """The last object, when the stream does not end with a newline."""
+        rest = bytes(self._buffer).strip()
+        self._buffer.clear()
+        return [json.loads(rest)] if rest else []
+
+
+def _checked(part: dict) -> dict:
+    """`part` unless Ollama reports an error in it, which it can do mid-stream."""
+    if part.get("error"):
+        raise RuntimeError(f"Ollama failed: {part['error']}")
+    return part
+
+
 class OllamaClient:
-    def __init__(self, model: str, base_url: str):
+    def __init__(
+        self,
+        model: str,
+        base_url: str,
+        pool_size: int = 8,
+        keepalive_timeout: float = 300.0,
+        connect_timeout: float = 10.0,
+        read_timeout: Optional[float] = 300.0,
+        num_ctx: Optional[int] = None,
+    ):
         self.model = model
         self.base_url = base_url
+        # context window asked of the model, Ollama silently truncates longer prompts
+        self.num_ctx = num_ctx
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """One pooled session for the life of the client, so requests reuse open connections."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size, keepalive_timeout=self.keepalive_timeout, ttl_dns_cache=300
+            )
+            # no total timeout, a streamed answer can take long but must keep producing tokens
+            timeout = aiohttp.ClientTimeout(
+                total=None, sock_connect=self.connect_timeout, sock_read=self.read_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
 
     async def send_message(
         self, messages: List[str], tools: Optional[list] = None, stream: bool = False
     ):
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "tools": tools,
-                    "stream": stream,
-                },
-            ) as response:
-                if stream:
-                    async for line in response.content:
-                        if line:
-                            yield json.loads(line)
-                else:
-                    result = await response.json()
-                    yield result
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "tools": tools,
+            "stream": stream,
+        }
+        if self.num_ctx:
+            payload["options"] = {"num_ctx": self.num_ctx}
+        async with self._get_session().post(f"{self.base_url}/api/chat", json=payload) as response:
+            if response.status != 200:
+                body = await response.text()
+                try:
+                    body = json.loads(body).get("error") or body
+                except (ValueError, AttributeError):
+                    pass
+                raise RuntimeError(f"Ollama answered {response.status}: {body}")
+            if stream:
+                decoder = NDJSONDecoder()
+                async for chunk in response.content.iter_any():
+                    for part in decoder.feed(chunk):
+                        yield _checked(part)
+                for part in decoder.close():
+                    yield _checked(part)
+            else:
+                result = await response.json()
+                yield _checked(result)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def build_context(cfg) -> ContextBuilder:
+    return ContextBuilder(
+        max_tokens=cfg.ollama.num_ctx,
+        answer_tokens=cfg.context.answer_tokens,
+        tool_result_tokens=cfg.context.tool_result_tokens,
+        min_tool_result_tokens=cfg.context.min_tool_result_tokens,
+        chars_per_token=cfg.context.chars_per_token,
+    )
+
+
+def build_cache(cache_config) -> Optional[ToolCache]:
+    """Tool result cache described by the `cache` config section, None when disabled."""
+    if not cache_config.enabled:
+        return None
+    store = SharedStore(cache_config.store, cache_config.store_max_entries) if cache_config.store else None
+    return ToolCache(
+        max_entries=cache_config.max_entries, ttl=cache_config.ttl, ttls=dict(cache_config.ttls or {}), store=store
+    )
 
 
 def ollama_tool_conversion(tool):
@@ -56,77 +150,130 @@ def ollama_tool_conversion(tool):
 
 
 class MCPClient:
-    def __init__(self, llm: OllamaClient):
+    def __init__(
+        self,
+        llm: OllamaClient,
+        tool_timeout: float = 60.0,
+        max_concurrency: int = 4,
+        heartbeat_interval: float = 30.0,
+        max_depth: int = 3,
+        cache: Optional[ToolCache] = None,
+        context: Optional[ContextBuilder] = None,
+    ):
         self.llm = llm
-        self.exit_stack = AsyncExitStack()
-        self.sessions = {}
-        self.available_tools = []
+        self.context = context or ContextBuilder()
+        self.max_depth = max_depth
+        self.cache = cache
+        self.tool_timeout = tool_timeout
+        self.max_concurrency = max_concurrency
+        self.heartbeat_interval = heartbeat_interval
+        self.connections: Optional[ConnectionManager] = None
+
+    @property
+    def available_tools(self) -> List[dict]:
+        return self.connections.tools if self.connections else []
 
     async def connect_to_servers(self, servers_config: dict):
-        for server_name, config in servers_config.items():
-            host = config["host"]
-            port = config["port"]
-            url = f"http://{host}:{port}/sse"
-
-            sse_transport = await self.exit_stack.enter_async_context(sse_client(url))
-            reader, writer = sse_transport
-            session = await self.exit_stack.enter_async_context(
-                ClientSession(reader, writer)
+        """Connect once per process; the connections then stay open and reconnect by themselves."""
+        if self.connections is None:
+            self.connections = ConnectionManager(
+                servers_config, max_concurrency=self.max_concurrency, heartbeat_interval=self.heartbeat_interval
             )
+        await self.connections.start()
+
+    async def call_tool(self, tool_name: str, tool_args: dict) -> str:
+        """Run one tool call on the server providing it, answering errors as text for the model."""
+        server_name = self.connections.routes.get(tool_name) if self.connections else None
+        if server_name is None:
+            logger.error(f"No server provides tool {tool_name}")
+            return f"Error: unknown tool {tool_name}"
+        if self.cache is None:
+            return (await self._call_tool(server_name, tool_name, tool_args))[0]
+        return await self.cache.get_or_call(
+            tool_name, tool_args, lambda: self._call_tool(server_name, tool_name, tool_args)
+        )
 
-            await session.initialize()
-            self.sessions[server_name] = session
-
-            response = await session.list_tools()
-            server_tools = [
+    async def _call_tool(self, server_name: str, tool_name: str, tool_args: dict) -> Tuple[str, bool]:
+        """Result text of a tool call and whether it succeeded.
+
+        Servers answering errors as a `{"status": "error", ...}` body rather
+        than setting `isError` are failures too, so they are never cached.
+        """
+        connection = self.connections.connections[server_name]
+        logger.info(f"Session: {server_name}, Tool: {tool_name}, Args: {tool_args}")
+        try:
+            async with connection.limit:
+                session = await connection.get_session(self.tool_timeout)
+                result = await asyncio.wait_for(session.call_tool(tool_name, tool_args), self.tool_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Session: {server_name}, Tool: {tool_name} timed out after {self.tool_timeout}s")
+            connection.check()
+            return f"Error: tool {tool_name} timed out", False
+        except Exception as e:
+            logger.error(f"Error calling Session: {server_name}, Tool: {tool_name}, Error: {e}")
+            connection.check()
+            return f"Error: tool {tool_name} failed: {str(e) or type(e).__name__}", False
+        text = result.content[0].text
+        return text, not result.isError and not is_error_body(text)
+
+    async def agent_loop(
+        self, messages: List[Dict[str, str]], history_end: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """Stream the model's answer, running the tools it asks for in up to `max_depth` rounds.
+
+        Each tool call starts as soon as the streamed response contains it, while
+        the model is still generating. Once a round is over its results are added
+        to `messages` in call order and the model is asked again. The last round
+        offers no tools, so the model has to answer with what it has.
+
+        `messages[:history_end]` are earlier turns, evicted oldest first when a
+        round would not fit the context budget; by default everything before
+        the last message.
+        """
+        if history_end is None:
+            history_end = len(messages) - 1
+        tools = [ollama_tool_conversion(tool) for tool in self.available_tools]
+        for depth in range(self.max_depth + 1):
+            last_round = depth == self.max_depth or not tools
+            if last_round and depth:
+                messages.append(
+                    {
+                        "role": "system",
+                        "content": "Using the above content and the user query, now answer the query.",
+                    }
+                )
+            history_end = self.context.fit(messages, history_end)
+            functions, pending, content = [], [], []
+            try:
+                async for part in self.llm.send_message(messages, tools=None if last_round else tools, stream=True):
+                    message = part.get("message") or {}
+                    for tool_call in message.get("tool_calls") or []:
+                        function = tool_call["function"]
+                        functions.append(function)
+                        pending.append(asyncio.create_task(self.call_tool(function["name"], function["arguments"])))
+                    if message.get("content"):
+                        content.append(message["content"])
+                        yield part
+                # the calls of one turn are independent, they run together and keep their order
+                results = await asyncio.gather(*pending)
+            finally:
+                for task in pending:
+                    task.cancel()
+            if not functions:
+                return
+
+            logger.info(f"Round {depth + 1}: called {', '.join(function['name'] for function in functions)}")
+            messages.append(
                 {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "input_schema": tool.inputSchema,
+                    "role": "assistant",
+                    "content": "".join(content),
+                    "tool_calls": [{"function": function} for function in functions],
                 }
-                for tool in response.tools
-            ]
-            self.available_tools.extend(server_tools)
+            )
+            share = self.context.tool_result_share(messages, history_end, len(results))
+            messages.extend({"role": "tool", "content": self.context.compact(result, share)} for result in results)
 
-    async def call_tools(self, messages: List[Dict[str, str]]):
-        tools = [ollama_tool_conversion(tool) for tool in self.available_tools]
-        async for call in self.llm.send_message(messages, tools=tools):
-            response = call
-
-        message = response["message"]
-        if "tool_calls" in message:
-            for tool_call in message["tool_calls"]:
-                function = tool_call["function"]
-                tool_name = function["name"]
-                tool_args = function["arguments"]
-
-                # Try each session until we find one that has the tool
-                for session_name, session in self.sessions.items():
-                    try:
-                        logger.info(
-                            f"Session: {session_name}, Tool: {tool_name}, Args: {tool_args}"
-                        )
-                        result = await session.call_tool(tool_name, tool_args)
-                        messages.extend(
-                            [
-                                {
-                                    "role": "system",
-                                    "content": f"Calling tool {tool_name}, Args: {tool_args}"
-                                },
-                                {
-                                    "role": "system",
-                                    "content": result.content[0].text[:10000],
-                                }
-                            ]
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"Error calling Session: {session_name}, Tool: {tool_name}, Error: {e}"
-                        )
-
-        return messages
-
-    async def process_query(self, query: str, history: List[str] = []) -> str:
+    async def process_query(self, query: str, history: List[str] = []) -> AsyncIterator[dict]:
         messages = [
             {
                 "role": "system",
@@ -145,9 +292,6 @@ class MCPClient:
             messages.append(
                 {"role": message["role"], "content": message["content"]})
 
-        # Remove duplicate original system prompt if present
-        messages = list(set(messages))
-
         messages.extend(
             [
                 {
@@ -157,15 +301,10 @@ class MCPClient:
             ]
         )
 
-        extra_prompt = {
-            "role": "system",
-            "content": "Using the above content and the user query, now answer the query.",
-        }
+        # Remove duplicate original system prompt, and the query if the history already ends with it
+        messages = dedupe(messages)
 
-        tool_responses = await self.call_tools(messages)
-        logger.info(f"Tool responses: {json.dumps(tool_responses + [extra_prompt], indent=2)}")
-        response = self.llm.send_message(tool_responses, stream=True)
-        return response
+        return self.agent_loop(messages, history_end=len(messages) - 1)
 
     async def chat_loop(self):
         while True:
@@ -175,22 +314,42 @@ class MCPClient:
                 if query.lower() == "quit":
                     break
 
-                response = await self.process_query(query)
-                print(response)
+                async for part in await self.process_query(query):
+                    print(part["message"]["content"], end="", flush=True)
+                print()
 
             except Exception as e:
                 print(f"\nAn error occurred: {e}")
 
     async def cleanup(self):
-        await self.exit_stack.aclose()
+        if self.connections is not None:
+            await self.connections.close()
+        if self.cache is not None:
+            logger.info(f"Tool cache: {self.cache.stats()}")
+            self.cache.close()
+        await self.llm.close()
 
 
 async def main():
     initialize(config_path="conf")
     cfg = compose(config_name="config")
 
-    llm = OllamaClient(model=cfg.ollama.model, base_url=cfg.ollama.base_url)
-    client = MCPClient(llm)
+    llm = OllamaClient(
+        model=cfg.ollama.model,
+        base_url=cfg.ollama.base_url,
+        pool_size=cfg.ollama.pool_size,
+        keepalive_timeout=cfg.ollama.keepalive_timeout,
+        num_ctx=cfg.ollama.num_ctx,
+    )
+    client = MCPClient(
+        llm,
+        tool_timeout=cfg.mcp.tool_timeout,
+        max_concurrency=cfg.mcp.max_concurrency,
+        heartbeat_interval=cfg.mcp.heartbeat_interval,
+        max_depth=cfg.agent.max_depth,
+        cache=build_cache(cfg.cache),
+        context=build_context(cfg),
+    )
 
     await client.connect_to_servers(cfg.mcp.servers)
     await client.chat_loop()
@@ -0,0 +1,203 @@
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+async def _wait(event: asyncio.Event, timeout: float) -> bool:
+    """Wait for `event` at most `timeout` seconds, returning whether it was set."""
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+class ServerConnection:
+    """A long-lived SSE session to one MCP server, pinged and reopened when it dies.
+
+    The transport and session are entered and left by a single background task,
+    as anyio requires, so callers only ever borrow `session`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        max_concurrency: int = 4,
+        heartbeat_interval: float = 30.0,
+        heartbeat_timeout: float = 10.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.name = name
+        self.url = url
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limit = asyncio.Semaphore(max_concurrency)
+        self.session: Optional[ClientSession] = None
+        self.tools: List[dict] = []
+        self.catalog_version = 0
+        self._ready = asyncio.Event()
+        self._check = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"mcp-{self.name}")
+
+    async def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                async with sse_client(self.url) as (reader, writer), ClientSession(reader, writer) as session:
+                    await session.initialize()
+                    await self._refresh_tools(session)
+                    self.session = session
+                    self._ready.set()
+                    attempt = 0
+                    logger.info(f"Connected to {self.name} at {self.url}")
+                    await self._heartbeat(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Connection to {self.name} lost: {e}")
+            finally:
+                self._ready.clear()
+                self.session = None
+            if self._stop.is_set():
+                break
+            delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+            attempt += 1
+            logger.info(f"Reconnecting to {self.name} in {delay:.1f}s")
+            await _wait(self._stop, delay)
+
+    async def _heartbeat(self, session: ClientSession):
+        """Ping every `heartbeat_interval` seconds, or sooner when asked, until stopped or a ping fails."""
+        while not self._stop.is_set():
+            waiters = [asyncio.ensure_future(self._stop.wait()), asyncio.ensure_future(self._check.wait())]
+            try:
+                await asyncio.wait(waiters, timeout=self.heartbeat_interval, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+            if self._stop.is_set():
+                return
+            self._check.clear()
+            await asyncio.wait_for(session.send_ping(), self.heartbeat_timeout)
+
+    async def _refresh_tools(self, session: ClientSession):
+        response = await session.list_tools()
+        tools = [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "input_schema": tool.inputSchema,
+            }
+            for tool in response.tools
+        ]
+        if tools != self.tools:
+            self.tools = tools
+            self.catalog_version += 1
+            logger.info(f"{self.name} provides {len(tools)} tools")
+
+    def check(self):
+        """Ping now instead of at the next heartbeat, e.g. after a call failed."""
+        self._check.set()
+
+    async def wait_ready(self, timeout: float) -> bool:
+        return await _wait(self._ready, timeout)
+
+    async def get_session(self, timeout: float) -> ClientSession:
+        if not await self.wait_ready(timeout) or self.session is None:
+            raise ConnectionError(f"Not connected to {self.name}")
+        return self.session
+
+    async def close(self):
+        self._stop.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+
+class ConnectionManager:
+    """One connection per MCP server for the whole process, shared by every chat."""
+
+    def __init__(
+        self,
+        servers_config: dict,
+        max_concurrency: int = 4,
+        heartbeat_interval: float = 30.0,
+        connect_timeout: float = 10.0,
+    ):
+        self.servers_config = servers_config
+        self.max_concurrency = max_concurrency
+        self.heartbeat_interval = heartbeat_interval
+        self.connect_timeout = connect_timeout
+        self.connections: Dict[str, ServerConnection] = {}
+        self._lock = asyncio.Lock()
+        self._catalog_key: Optional[tuple] = None
+        self._tools: List[dict] = []
+        self._routes: Dict[str, str] = {}
+
+    async def start(self):
+        """Open every connection on the first call, later calls return at once."""
+        async with self._lock:
+            if self.connections:
+                return
+            for server_name, config in self.servers_config.items():
+                connection = ServerConnection(
+                    server_name,
+                    f"http://{config['host']}:{config['port']}/sse",
+                    max_concurrency=config.get("max_concurrency", self.max_concurrency),
+                    heartbeat_interval=self.heartbeat_interval,
+                )
+                connection.start()
+                self.connections[server_name] = connection
+            ready = await asyncio.gather(
+                *[connection.wait_ready(self.connect_timeout) for connection in self.connections.values()]
+            )
+            for connection, connected in zip(self.connections.values(), ready):
+                if not connected:
+                    logger.warning(f"{connection.name} is not reachable yet, retrying in the background")
+
+    def _catalog(self):
+        key = tuple(connection.catalog_version for connection in self.connections.values())
+        if key != self._catalog_key:
+            tools, routes = [], {}
+            for server_name, connection in self.connections.items():
+                for tool in connection.tools:
+                    if tool["name"] in routes:
+                        logger.warning(
+                            f"Tool {tool['name']} is provided by {routes[tool['name']]} and {server_name}, "
+                            f"using {routes[tool['name']]}"
+                        )
+                        continue
+                    tools.append(tool)
+                    routes[tool["name"]] = server_name
+            self._catalog_key, self._tools, self._routes = key, tools, routes
+
+    @property
+    def tools(self) -> List[dict]:
+        """Tools of every server, rebuilt only when a server's catalog changed."""
+        self._catalog()
+        return self._tools
+
+    @property
+    def routes(self) -> Dict[str, str]:
+        """Tool name -> name of the server providing it."""
+        self._catalog()
+        return self._routes
+
+    async def close(self):
+        await asyncio.gather(*[connection.close() for connection in self.connections.values()])
+        self.connections = {}
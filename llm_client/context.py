@@ -0,0 +1,174 @@
+import json
+import math
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# tokens a message costs beyond its content: role, separators
+MESSAGE_OVERHEAD = 4
+
+# (items kept per array, characters kept per string), tried in order until a result fits
+SHRINK_LEVELS = [
+    (None, None),
+    (50, 1000),
+    (20, 400),
+    (10, 200),
+    (5, 100),
+    (3, 60),
+    (1, 40),
+]
+
+_EMPTY = (None, "", [], {})
+
+
+def _shrink(data: Any, max_items: Optional[int], max_chars: Optional[int]) -> Any:
+    """Drop empty fields, keep the first `max_items` of arrays and `max_chars` of strings, noting what was cut."""
+    if isinstance(data, dict):
+        shrunk = {key: _shrink(value, max_items, max_chars) for key, value in data.items()}
+        return {key: value for key, value in shrunk.items() if value not in _EMPTY}
+    if isinstance(data, list):
+        kept = data if max_items is None else data[:max_items]
+        shrunk = [item for item in (_shrink(item, max_items, max_chars) for item in kept) if item not in _EMPTY]
+        if len(data) > len(kept):
+            shrunk.append(f"... {len(data) - len(kept)} more of {len(data)}")
+        return shrunk
+    if isinstance(data, str) and max_chars is not None and len(data) > max_chars:
+        return f"{data[:max_chars]}... ({len(data)} chars)"
+    return data
+
+
+class ContextBuilder:
+    """Fits the messages of a turn into the model's context window.
+
+    Tokens are estimated from the text length. The window less the tokens kept
+    for the answer is shared by the system prompt and query, which are always
+    sent, the tool results of the current question, each compacted to its share,
+    and the history, which is evicted from the oldest turn on.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 8192,
+        answer_tokens: int = 1024,
+        tool_result_tokens: int = 2000,
+        min_tool_result_tokens: int = 200,
+        chars_per_token: float = 3.5,
+    ):
+        self.max_tokens = max_tokens
+        self.answer_tokens = answer_tokens
+        self.tool_result_tokens = tool_result_tokens
+        self.min_tool_result_tokens = min(min_tool_result_tokens, tool_result_tokens)
+        self.chars_per_token = chars_per_token
+
+    @property
+    def budget(self) -> int:
+        """Tokens available to the prompt."""
+        return self.max_tokens - self.answer_tokens
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        tokens = MESSAGE_OVERHEAD + self.count(message.get("content") or "")
+        if message.get("tool_calls"):
+            tokens += self.count(json.dumps(message["tool_calls"], separators=(",", ":")))
+        return tokens
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(self.count_message(message) for message in messages)
+
+    def compact(self, text: str, max_tokens: int) -> str:
+        """`text` within `max_tokens`, shrinking JSON structurally before cutting anything mid-string."""
+        if self.count(text) <= max_tokens:
+            return text
+        max_chars = int(max_tokens * self.chars_per_token)
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if isinstance(data, (dict, list)):
+            for max_items, max_string in SHRINK_LEVELS:
+                text = json.dumps(_shrink(data, max_items, max_string), separators=(",", ":"), ensure_ascii=False)
+                if len(text) <= max_chars:
+                    return text
+        marker = f"\n... [cut, {len(text)} chars in total]"
+        cut = text[:max(max_chars - len(marker), 0)]
+        # end on a line or word boundary when one is close
+        boundary = max(cut.rfind("\n"), cut.rfind(" "))
+        if boundary > len(cut) * 0.8:
+            cut = cut[:boundary]
+        return cut + marker
+
+    def tool_result_share(self, messages: List[Dict[str, Any]], history_end: int, results: int) -> int:
+        """Tokens each of `results` new tool results may take, at least `min_tool_result_tokens`.
+
+        History can be evicted to make room, so only the messages from
+        `history_end` on, and the system prompt, count as already spent. When
+        that leaves less than the minimum, the tool results of earlier rounds
+        are halved, in place, until it does not or they are at the minimum too.
+        """
+        if not results:
+            return 0
+        earlier = [message for message in messages[history_end:] if message["role"] == "tool"]
+        while True:
+            spent = self.count_messages(_leading_system(messages)) + self.count_messages(messages[history_end:])
+            share = min(self.tool_result_tokens, (self.budget - spent) // results)
+            if share >= self.min_tool_result_tokens:
+                return share
+            shrinkable = [
+                message for message in earlier if self.count(message["content"]) > self.min_tool_result_tokens
+            ]
+            if not shrinkable:
+                logger.warning(f"No room left for tool results, giving each {self.min_tool_result_tokens} tokens")
+                return self.min_tool_result_tokens
+            for message in shrinkable:
+                target = max(self.count(message["content"]) // 2, self.min_tool_result_tokens)
+                message["content"] = self.compact(message["content"], target)
+
+    def fit(self, messages: List[Dict[str, Any]], history_end: int) -> int:
+        """Evict whole turns from the oldest on until `messages` fit the budget, in place.
+
+        The history is `messages[:history_end]` after the leading system prompt.
+        Returns the new `history_end`.
+        """
+        start = len(_leading_system(messages))
+        total = self.count_messages(messages)
+        evicted = 0
+        while total > self.budget and start < history_end:
+            # a turn runs from one user message to the next
+            end = start + 1
+            while end < history_end and messages[end]["role"] != "user":
+                end += 1
+            total -= self.count_messages(messages[start:end])
+            evicted += end - start
+            del messages[start:end]
+            history_end -= end - start
+        if evicted:
+            logger.info(f"Evicted {evicted} history messages to fit {self.budget} tokens")
+        if total > self.budget:
+            logger.warning(f"Prompt of about {total} tokens exceeds the budget of {self.budget}")
+        return history_end
+
+
+def _leading_system(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    end = 0
+    while end < len(messages) and messages[end]["role"] == "system":
+        end += 1
+    return messages[:end]
+
+
+def dedupe(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop repeated system prompts, and the last message when it repeats the one just before it."""
+    kept: List[Dict[str, Any]] = []
+    system = set()
+    for message in messages:
+        if message["role"] == "system":
+            if message["content"] in system:
+                continue
+            system.add(message["content"])
+        kept.append(message)
+    if len(kept) > 1 and (kept[-1]["role"], kept[-1]["content"]) == (kept[-2]["role"], kept[-2]["content"]):
+        kept.pop()
+    return kept
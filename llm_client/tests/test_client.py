@@ -0,0 +1,118 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from client import MCPClient, NDJSONDecoder, OllamaClient
+from tool_cache import ToolCache
+
+
+class Connection:
+    """A connection whose session answers every tool call with `text`."""
+
+    def __init__(self, text: str, is_error: bool = False):
+        self.limit = asyncio.Semaphore(1)
+        self.calls = 0
+        self.result = SimpleNamespace(content=[SimpleNamespace(text=text)], isError=is_error)
+
+    async def get_session(self, timeout):
+        return self
+
+    async def call_tool(self, tool_name, tool_args):
+        self.calls += 1
+        return self.result
+
+    def check(self):
+        pass
+
+
+def _client(connection: Connection) -> MCPClient:
+    client = MCPClient(llm=None, cache=ToolCache())
+    client.connections = SimpleNamespace(routes={"search": "chembl"}, connections={"chembl": connection})
+    return client
+
+
+def test_error_envelopes_are_not_cached():
+    connection = Connection('{"status": "error", "error": {"type": "TimeoutError", "message": "late"}}')
+    client = _client(connection)
+    for _ in range(2):
+        asyncio.run(client.call_tool("search", {"q": 1}))
+    assert connection.calls == 2
+
+    connection = Connection('{"status":"ok","result":[]}')
+    client = _client(connection)
+    for _ in range(2):
+        asyncio.run(client.call_tool("search", {"q": 1}))
+    assert connection.calls == 1
+
+
+def test_ndjson_lines_split_across_chunks():
+    decoder = NDJSONDecoder()
+    assert decoder.feed(b'{"message": {"con') == []
+    assert decoder.feed(b'tent": "a"}}\n{"done"') == [{"message": {"content": "a"}}]
+    assert decoder.feed(b': true}\n\n') == [{"done": True}]
+    assert decoder.close() == []
+
+
+def test_ndjson_without_a_final_newline():
+    decoder = NDJSONDecoder()
+    assert decoder.feed(b'{"a": 1}\n{"b": 2}') == [{"a": 1}]
+    assert decoder.close() == [{"b": 2}]
+    assert decoder.close() == []
+
+
+class Response:
+    def __init__(self, status: int, body: bytes, chunks: int = 3):
+        self.status = status
+        self.body = body
+        self.content = SimpleNamespace(iter_any=self._iter_any)
+        self.chunks = chunks
+
+    async def _iter_any(self):
+        size = len(self.body) // self.chunks + 1
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    async def text(self):
+        return self.body.decode()
+
+    async def json(self):
+        return json.loads(self.body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+def _stream(response: Response, stream: bool = True):
+    llm = OllamaClient(model="m", base_url="http://ollama")
+    llm._session = SimpleNamespace(closed=False, post=lambda url, json: response)
+
+    async def run():
+        return [part async for part in llm.send_message([], stream=stream)]
+
+    return asyncio.run(run())
+
+
+def test_stream_yields_every_part():
+    body = b'{"message": {"content": "a"}}\n{"message": {"content": "b"}, "done": true}'
+    parts = _stream(Response(200, body))
+    assert [part["message"]["content"] for part in parts] == ["a", "b"]
+
+
+def test_stream_raises_on_an_error_status():
+    with pytest.raises(RuntimeError, match="404.*model \"m\" not found"):
+        _stream(Response(404, b'{"error": "model \\"m\\" not found"}'))
+    with pytest.raises(RuntimeError, match="502: Bad Gateway"):
+        _stream(Response(502, b"Bad Gateway"))
+
+
+def test_stream_raises_on_an_error_part():
+    body = b'{"message": {"content": "a"}}\n{"error": "out of memory"}\n'
+    with pytest.raises(RuntimeError, match="out of memory"):
+        _stream(Response(200, body))
+    with pytest.raises(RuntimeError, match="out of memory"):
+        _stream(Response(200, b'{"error": "out of memory"}'), stream=False)
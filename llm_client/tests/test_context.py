@@ -0,0 +1,80 @@
+import json
+
+from context import ContextBuilder, dedupe
+
+SYSTEM = {"role": "system", "content": "You answer questions."}
+
+
+def _turn(question: str, size: int):
+    return [{"role": "user", "content": question}, {"role": "assistant", "content": "x" * size}]
+
+
+def test_fit_evicts_whole_turns_from_the_oldest():
+    context = ContextBuilder(max_tokens=300, answer_tokens=100, chars_per_token=1)
+    messages = [SYSTEM, *_turn("first", 80), *_turn("second", 80), {"role": "user", "content": "now"}]
+    history_end = context.fit(messages, len(messages) - 1)
+    assert messages == [SYSTEM, *_turn("second", 80), {"role": "user", "content": "now"}]
+    assert history_end == 3
+    assert context.count_messages(messages) <= context.budget
+
+
+def test_fit_keeps_the_system_prompt_and_question_when_nothing_fits():
+    context = ContextBuilder(max_tokens=60, answer_tokens=10, chars_per_token=1)
+    question = {"role": "user", "content": "y" * 100}
+    messages = [SYSTEM, *_turn("first", 10), question]
+    assert context.fit(messages, 3) == 1
+    assert messages == [SYSTEM, question]
+
+
+def test_compacted_json_still_parses():
+    context = ContextBuilder()
+    result = json.dumps({"entries": [{"id": i, "title": "t" * 300, "empty": None} for i in range(100)]})
+    compacted = context.compact(result, 200)
+    assert context.count(compacted) <= 200
+    data = json.loads(compacted)
+    assert data["entries"][0]["id"] == 0
+    assert "empty" not in data["entries"][0]
+    assert data["entries"][-1].endswith("more of 100")
+
+
+def test_compact_cuts_text_with_a_marker():
+    context = ContextBuilder(chars_per_token=1)
+    compacted = context.compact("word " * 100, 100)
+    assert len(compacted) <= 100
+    assert compacted.endswith("[cut, 500 chars in total]")
+    assert context.compact("short", 100) == "short"
+
+
+def test_tool_result_share_shrinks_earlier_results_before_going_below_the_minimum():
+    context = ContextBuilder(max_tokens=1200, answer_tokens=200, tool_result_tokens=500, chars_per_token=1)
+    earlier = {"role": "tool", "content": json.dumps(list(range(300)))}
+    messages = [SYSTEM, {"role": "user", "content": "q"}, earlier]
+    assert context.tool_result_share(messages, 1, 1) == 500
+
+    share = context.tool_result_share(messages, 1, 4)
+    assert share >= context.min_tool_result_tokens
+    assert context.count(earlier["content"]) < 1000
+    json.loads(earlier["content"])
+
+
+def test_dedupe_drops_repeated_system_prompts_and_the_repeated_query():
+    question = {"role": "user", "content": "What is 1HR7?"}
+    messages = [
+        SYSTEM,
+        {"role": "system", "content": "Be brief."},
+        SYSTEM,
+        {"role": "user", "content": "ok"},
+        {"role": "user", "content": "ok"},
+        {"role": "assistant", "content": "Yes"},
+        question,
+        dict(question),
+    ]
+    assert dedupe(messages) == [
+        SYSTEM,
+        {"role": "system", "content": "Be brief."},
+        {"role": "user", "content": "ok"},
+        {"role": "user", "content": "ok"},
+        {"role": "assistant", "content": "Yes"},
+        question,
+    ]
+    assert dedupe([SYSTEM, question]) == [SYSTEM, question]
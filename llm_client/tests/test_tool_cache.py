@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+import tool_cache
+from tool_cache import SharedStore, ToolCache, cache_key, is_error_body
+
+
+class Tool:
+    """A tool call counting its runs, answering `value` after `delay` seconds."""
+
+    def __init__(self, value: str = "result", cacheable: bool = True, delay: float = 0.0):
+        self.value = value
+        self.cacheable = cacheable
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value, self.cacheable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_cache_key_ignores_argument_order_and_unset_arguments():
+    assert cache_key("search", {"a": 1, "b": [1, 2]}) == cache_key(" search", {"b": [1, 2], "a": 1, "c": None})
+    assert cache_key("search", {"a": 1}) != cache_key("search", {"a": 2})
+    assert cache_key("search", None) == cache_key("search", {})
+
+
+def test_is_error_body():
+    assert is_error_body('{"status": "error", "error": {"type": "KeyError", "message": "x"}}')
+    assert is_error_body(' {"status":"error"}')
+    assert not is_error_body('{"status":"ok","result":{"status":"error"}}')
+    assert not is_error_body("Error: tool search failed")
+
+
+def test_results_are_cached_until_they_expire(clock):
+    cache = ToolCache(ttl=60, ttls={"live": 0})
+    tool = Tool()
+
+    async def run():
+        return [await cache.get_or_call(name, {"q": 1}, tool) for name in ("search", "search", "live", "live")]
+
+    assert asyncio.run(run()) == ["result"] * 4
+    # `live` has a time to live of 0 and is never cached
+    assert tool.calls == 3
+
+    clock[0] += 61
+    asyncio.run(cache.get_or_call("search", {"q": 1}, tool))
+    assert tool.calls == 4
+    assert cache.stats()["expired"] == 1
+
+
+def test_failed_results_are_not_cached(clock):
+    cache = ToolCache()
+    tool = Tool("Error: tool search timed out", cacheable=False)
+    for _ in range(2):
+        assert asyncio.run(cache.get_or_call("search", {}, tool)) == "Error: tool search timed out"
+    assert tool.calls == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_results_are_evicted(clock):
+    cache = ToolCache(max_entries=2)
+    tool = Tool()
+
+    async def run():
+        for q in (1, 2, 1, 3, 1, 2):
+            await cache.get_or_call("search", {"q": q}, tool)
+
+    asyncio.run(run())
+    # 2 was evicted by 3, 1 stayed as it was used again
+    assert tool.calls == 4
+    assert cache.stats()["evictions"] == 2
+
+
+def test_identical_calls_in_flight_are_coalesced():
+    cache = ToolCache()
+    tool = Tool(delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_call("search", {"q": 1}, tool) for _ in range(3)])
+
+    assert asyncio.run(run()) == ["result"] * 3
+    assert tool.calls == 1
+    assert cache.stats()["coalesced"] == 2
+
+
+def test_waiters_of_a_cancelled_call_make_one_call_between_them():
+    cache = ToolCache()
+    tool = Tool(delay=0.05)
+
+    async def run():
+        owner = asyncio.create_task(cache.get_or_call("search", {}, tool))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_call("search", {}, tool)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(run()) == ["result"] * 3
+    assert tool.calls == 2
+    assert cache._inflight == {}
+
+
+def test_shared_store_serves_other_caches(tmp_path, clock):
+    store = SharedStore(tmp_path / "cache.sqlite")
+    first, second = ToolCache(ttl=60, store=store), ToolCache(ttl=60, store=store)
+    tool = Tool()
+    try:
+        asyncio.run(first.get_or_call("search", {}, tool))
+        assert asyncio.run(second.get_or_call("search", {}, tool)) == "result"
+        assert tool.calls == 1
+        assert second.stats()["store_hits"] == 1
+
+        clock[0] += 61
+        assert store.get(cache_key("search", {})) is None
+    finally:
+        store.close()
+
+
+def test_shared_store_prunes_to_max_entries(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(tool_cache, "_PRUNE_EVERY", 4)
+    store = SharedStore(tmp_path / "cache.sqlite", max_entries=2)
+    try:
+        for i in range(4):
+            store.put(f"key{i}", "search", "value", 2000.0 + i)
+        # the rows closest to expiring go first
+        assert store.get("key0") is None and store.get("key1") is None
+        assert store.get("key3") == ("value", 2003.0)
+    finally:
+        store.close()
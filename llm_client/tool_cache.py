@@ -0,0 +1,206 @@
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# puts between two sweeps of expired rows from the shared store
+_PRUNE_EVERY = 256
+
+# an error envelope, e.g. {"status": "error", "error": {...}}, answered without setting isError
+_ERROR_BODY = re.compile(r'\s*\{\s*"status"\s*:\s*"error"')
+
+
+def cache_key(tool_name: str, tool_args: Optional[dict]) -> str:
+    """Key of a tool call, the same however the model ordered or spaced its arguments."""
+    args = {name: value for name, value in (tool_args or {}).items() if value is not None}
+    text = json.dumps([tool_name.strip(), args], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def is_error_body(text: str) -> bool:
+    """Whether a tool result is an error envelope, judged from its first field without parsing it all."""
+    return _ERROR_BODY.match(text) is not None
+
+
+class SharedStore:
+    """Tool results in a SQLite file, so every client process on the host shares them."""
+
+    def __init__(self, path: Path | str, max_entries: int = 100000):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, tool TEXT, value TEXT, expires REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires)")
+        self._db.commit()
+        self._puts = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM results WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, tool_name: str, value: str, expires: float):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", (key, tool_name, value, expires))
+            self._puts += 1
+            if self._puts % _PRUNE_EVERY == 0:
+                self._prune()
+
+    def _prune(self):
+        self._db.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+        excess = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+        if excess > 0:
+            # the rows closest to expiring go first
+            self._db.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY expires LIMIT ?)", (excess,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ToolCache:
+    """LRU cache of tool results with a time to live per tool, optionally backed by a `SharedStore`.
+
+    Identical calls made while one is in flight wait for it instead of
+    reaching the server again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 600.0,
+        ttls: Optional[Dict[str, float]] = None,
+        store: Optional[SharedStore] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.store = store
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"hits": 0, "store_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expired": 0}
+
+    def ttl_for(self, tool_name: str) -> float:
+        """Seconds a result of `tool_name` stays valid, 0 to never cache it."""
+        return self.ttls.get(tool_name, self.ttl)
+
+    def _remember(self, key: str, value: str, expires: float):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _recall(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._entries[key]
+            self._stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[0]
+
+    async def _recall_shared(self, key: str) -> Optional[str]:
+        if self.store is None:
+            return None
+        try:
+            found = await asyncio.to_thread(self.store.get, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Tool cache store lookup failed: {e}")
+            return None
+        if found is None:
+            return None
+        self._remember(key, *found)
+        self._stats["store_hits"] += 1
+        return found[0]
+
+    async def get_or_call(
+        self, tool_name: str, tool_args: dict, call: Callable[[], Awaitable[Tuple[str, bool]]]
+    ) -> str:
+        """Cached result of a tool call, or the result of `call()`.
+
+        `call` returns the result text and whether it may be cached, so errors
+        are passed through but never stored.
+        """
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            self._stats["misses"] += 1
+            return (await call())[0]
+        key = cache_key(tool_name, tool_args)
+        cached = self._recall(key)
+        if cached is not None:
+            return cached
+        # a call that was cancelled wakes every waiter at once, and the first
+        # to run takes over, so the others wait on its call in turn
+        while (inflight := self._inflight.get(key)) is not None:
+            await asyncio.wait([inflight])
+            if not inflight.cancelled():
+                self._stats["coalesced"] += 1
+                return inflight.result()
+            cached = self._recall(key)
+            if cached is not None:
+                return cached
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._recall_shared(key)
+            if value is None:
+                self._stats["misses"] += 1
+                value, cacheable = await call()
+                if cacheable:
+                    await self._store(key, tool_name, value, time.time() + ttl)
+            future.set_result(value)
+        finally:
+            # callers waiting on a call that did not finish make their own
+            if not future.done():
+                future.cancel()
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        return value
+
+    async def _store(self, key: str, tool_name: str, value: str, expires: float):
+        self._remember(key, value, expires)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.put, key, tool_name, value, expires)
+            except sqlite3.Error as e:
+                logger.warning(f"Tool cache store write failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self._stats["hits"] + self._stats["store_hits"] + self._stats["coalesced"] + self._stats["misses"]
+        hits = lookups - self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._entries.clear()
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
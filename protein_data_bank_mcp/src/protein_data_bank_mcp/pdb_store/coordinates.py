@@ -0,0 +1,310 @@
+"""
+Columnar coordinate bundles and vectorized geometric queries.
+
+Each structure is converted once into a directory of `.npy` arrays: float32
+coordinates plus index arrays linking atoms to residues and residues to
+chains. Bundles are opened memory-mapped, so repeated queries and several
+worker processes share the same pages instead of reparsing the file.
+"""
+import os
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from protein_data_bank_mcp.pdb_store.sequence import cif_rows, is_mmcif, open_text
+
+WATER = ("HOH", "WAT", "DOD")
+
+# atom level arrays
+COORDS = "coords"
+ATOM_RESIDUE = "atom_residue"
+ATOM_CHAIN = "atom_chain"
+ATOM_NAME = "atom_name"
+ELEMENT = "element"
+# residue level arrays
+RESIDUE_CHAIN = "residue_chain"
+RESIDUE_NAME = "residue_name"
+RESIDUE_NUMBER = "residue_number"
+RESIDUE_HETERO = "residue_hetero"
+
+ARRAYS = (
+    COORDS, ATOM_RESIDUE, ATOM_CHAIN, ATOM_NAME, ELEMENT,
+    RESIDUE_CHAIN, RESIDUE_NAME, RESIDUE_NUMBER, RESIDUE_HETERO,
+)
+
+# (chain, residue name, residue number with insertion code, hetero, atom name, element, x, y, z)
+Atom = Tuple[str, str, str, bool, str, str, float, float, float]
+
+
+def _pdb_atoms(lines: Iterable[str]) -> Iterator[Atom]:
+    for line in lines:
+        record = line[:6]
+        if record == "ENDMDL":
+            break
+        if record != "ATOM  " and record != "HETATM":
+            continue
+        if line[16] not in " A1":
+            # keep the first alternate location only
+            continue
+        yield (
+            line[21:22].strip(),
+            line[17:20].strip(),
+            (line[22:26].strip() + line[26:27].strip()),
+            record == "HETATM",
+            line[12:16].strip(),
+            line[76:78].strip(),
+            float(line[30:38]),
+            float(line[38:46]),
+            float(line[46:54]),
+        )
+
+
+def _mmcif_atoms(lines: Iterable[str]) -> Iterator[Atom]:
+    first_model = None
+    for row in cif_rows(lines, "atom_site"):
+        model = row.get("pdbx_PDB_model_num")
+        if first_model is None:
+            first_model = model
+        elif model != first_model:
+            break
+        if row.get("label_alt_id", ".") not in ".?A1":
+            continue
+        icode = row.get("pdbx_PDB_ins_code", "?")
+        yield (
+            row.get("auth_asym_id") or row.get("label_asym_id"),
+            row.get("auth_comp_id") or row.get("label_comp_id"),
+            (row.get("auth_seq_id") or row.get("label_seq_id")) + ("" if icode in "?." else icode),
+            row.get("group_PDB") == "HETATM",
+            row.get("auth_atom_id") or row.get("label_atom_id"),
+            row.get("type_symbol", ""),
+            float(row["Cartn_x"]),
+            float(row["Cartn_y"]),
+            float(row["Cartn_z"]),
+        )
+
+
+def read_atoms(path: Path | str) -> Dict[str, np.ndarray]:
+    """Columnar arrays for the first model of a PDB or mmCIF file."""
+    chains: Dict[str, int] = {}
+    residues: Dict[Tuple[str, str, str], int] = {}
+    residue_chain, residue_name, residue_number, residue_hetero = [], [], [], []
+    atom_residue, atom_name, element, coords = [], [], [], []
+
+    with open_text(path) as lines:
+        atoms = _mmcif_atoms(lines) if is_mmcif(path) else _pdb_atoms(lines)
+        for chain_id, resname, number, hetero, name, symbol, x, y, z in atoms:
+            chain = chains.setdefault(chain_id, len(chains))
+            key = (chain_id, number, resname)
+            residue = residues.get(key)
+            if residue is None:
+                residue = residues[key] = len(residues)
+                residue_chain.append(chain)
+                residue_name.append(resname)
+                residue_number.append(number)
+                residue_hetero.append(hetero)
+            atom_residue.append(residue)
+            atom_name.append(name)
+            element.append(symbol)
+            coords.append((x, y, z))
+
+    residue_chain = np.array(residue_chain, dtype=np.int32)
+    atom_residue = np.array(atom_residue, dtype=np.int32)
+    return {
+        COORDS: np.array(coords, dtype=np.float32).reshape(-1, 3),
+        ATOM_RESIDUE: atom_residue,
+        ATOM_CHAIN: residue_chain[atom_residue],
+        ATOM_NAME: np.array(atom_name, dtype="U4"),
+        ELEMENT: np.array(element, dtype="U2"),
+        RESIDUE_CHAIN: residue_chain,
+        RESIDUE_NAME: np.array(residue_name, dtype="U5"),
+        RESIDUE_NUMBER: np.array(residue_number, dtype="U8"),
+        RESIDUE_HETERO: np.array(residue_hetero, dtype=bool),
+        "chains": list(chains),
+    }
+
+
+def build_bundle(structure_path: Path | str, bundle_path: Path | str) -> Path:
+    """Convert a structure file into a coordinate bundle directory, atomically."""
+    bundle_path = Path(bundle_path)
+    arrays = read_atoms(structure_path)
+    tmp_path = Path(tempfile.mkdtemp(prefix=f"{bundle_path.name}.", suffix=".tmp", dir=bundle_path.parent))
+    for name in ARRAYS:
+        np.save(tmp_path / f"{name}.npy", arrays[name])
+    (tmp_path / "meta.json").write_text(json.dumps({"chains": arrays["chains"]}))
+    if bundle_path.exists():
+        # a directory cannot be replaced while it has files, move the old one aside first
+        old_path = Path(tempfile.mkdtemp(prefix=f"{bundle_path.name}.", suffix=".tmp", dir=bundle_path.parent))
+        os.replace(bundle_path, old_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    os.replace(tmp_path, bundle_path)
+    return bundle_path
+
+
+class CoordinateBundle:
+    """Memory-mapped view of a coordinate bundle."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.chains: List[str] = json.loads((self.path / "meta.json").read_text())["chains"]
+        for name in ARRAYS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r"))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def chain_index(self, chain_id: str) -> int:
+        try:
+            return self.chains.index(chain_id)
+        except ValueError:
+            raise ValueError(f"Chain {chain_id!r} not found, available chains: {', '.join(self.chains)}")
+
+    def water_mask(self) -> np.ndarray:
+        return np.isin(self.residue_name, WATER)[self.atom_residue]
+
+    def residue(self, index: int) -> Dict[str, str]:
+        return {
+            "chain": self.chains[self.residue_chain[index]],
+            "residue": str(self.residue_name[index]),
+            "number": str(self.residue_number[index]),
+        }
+
+
+class CellGrid:
+    """Uniform grid over a set of points for fixed radius neighbour search.
+
+    Points are bucketed in cubic cells of side `cell` and sorted by cell key,
+    so all candidates of a query point are found with a few `searchsorted`
+    calls over its 27 surrounding cells.
+    """
+
+    def __init__(self, points: np.ndarray, cell: float):
+        self.points = np.asarray(points, dtype=np.float32)
+        self.cell = cell
+        self.origin = self.points.min(axis=0) if len(self.points) else np.zeros(3, dtype=np.float32)
+        cells = self._cells(self.points)
+        self.shape = cells.max(axis=0) + 1 if len(cells) else np.ones(3, dtype=np.int64)
+        keys = self._keys(cells)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        return np.floor((points - self.origin) / self.cell).astype(np.int64)
+
+    def _keys(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[:, 0] * self.shape[1] + cells[:, 1]) * self.shape[2] + cells[:, 2]
+
+    def pairs_within(self, queries: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Index pairs `(query, point)` closer than `radius`, with their distances."""
+        if radius > self.cell:
+            raise ValueError("radius must not exceed the grid cell size")
+        queries = np.asarray(queries, dtype=np.float32)
+        empty = np.empty(0, dtype=np.int64)
+        if not len(queries) or not len(self.points):
+            return empty, empty, np.empty(0, dtype=np.float32)
+
+        cells = self._cells(queries)
+        query_index, point_index = [], []
+        for offset in np.array(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1])).T.reshape(-1, 3):
+            neighbours = cells + offset
+            valid = np.all((neighbours >= 0) & (neighbours < self.shape), axis=1)
+            keys = self._keys(neighbours[valid])
+            start = np.searchsorted(self.keys, keys, side="left")
+            counts = np.searchsorted(self.keys, keys, side="right") - start
+            if not counts.any():
+                continue
+            # expand each [start, start + count) range without a Python loop
+            repeated = np.repeat(np.flatnonzero(valid), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            query_index.append(repeated)
+            point_index.append(self.order[np.repeat(start, counts) + offsets])
+
+        if not query_index:
+            return empty, empty, np.empty(0, dtype=np.float32)
+        query_index = np.concatenate(query_index)
+        point_index = np.concatenate(point_index)
+        distances = np.linalg.norm(queries[query_index] - self.points[point_index], axis=1)
+        close = distances <= radius
+        return query_index[close], point_index[close], distances[close]
+
+
+def _residue_pairs(
+    bundle: CoordinateBundle, atoms_a: np.ndarray, atoms_b: np.ndarray, cutoff: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Residue pairs between two atom selections closer than `cutoff`, with the minimum distance."""
+    grid = CellGrid(bundle.coords[atoms_b], cutoff)
+    i, j, distances = grid.pairs_within(bundle.coords[atoms_a], cutoff)
+    residues_a = bundle.atom_residue[atoms_a[i]].astype(np.int64)
+    residues_b = bundle.atom_residue[atoms_b[j]].astype(np.int64)
+    keys = residues_a * len(bundle.residue_chain) + residues_b
+    order = np.lexsort((distances, keys))
+    keys, distances = keys[order], distances[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    return residues_a[order][first], residues_b[order][first], distances[first]
+
+
+def chain_contacts(bundle: CoordinateBundle, chain_a: str, chain_b: str, cutoff: float = 4.0) -> List[dict]:
+    """Residue pairs between two chains with any atoms within `cutoff` Å, waters excluded."""
+    dry = ~bundle.water_mask()
+    atoms_a = np.flatnonzero((bundle.atom_chain == bundle.chain_index(chain_a)) & dry)
+    atoms_b = np.flatnonzero((bundle.atom_chain == bundle.chain_index(chain_b)) & dry)
+    residues_a, residues_b, distances = _residue_pairs(bundle, atoms_a, atoms_b, cutoff)
+    return [
+        {"a": bundle.residue(a), "b": bundle.residue(b), "distance": round(float(d), 2)}
+        for a, b, d in zip(residues_a, residues_b, distances)
+    ]
+
+
+def binding_site(
+    bundle: CoordinateBundle, ligand: str, cutoff: float = 5.0, chain_id: Optional[str] = None
+) -> List[dict]:
+    """Residues with any atom within `cutoff` Å of a ligand, by residue name, waters excluded.
+
+    Every copy of the ligand is considered unless `chain_id` restricts it to one chain.
+    """
+    is_ligand = (bundle.residue_name == ligand.upper()) & bundle.residue_hetero
+    if chain_id is not None:
+        is_ligand &= bundle.residue_chain == bundle.chain_index(chain_id)
+    ligand_atoms = is_ligand[bundle.atom_residue]
+    if not ligand_atoms.any():
+        raise ValueError(f"Ligand {ligand!r} not found")
+    site_atoms = np.flatnonzero(~ligand_atoms & ~bundle.water_mask())
+    ligands, residues, distances = _residue_pairs(bundle, np.flatnonzero(ligand_atoms), site_atoms, cutoff)
+
+    # one row per residue, closest ligand copy first
+    order = np.lexsort((distances, residues))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = residues[order][1:] != residues[order][:-1]
+    site = [
+        {**bundle.residue(r), "ligand": bundle.residue(lig), "distance": round(float(d), 2)}
+        for r, lig, d in zip(residues[order][first], ligands[order][first], distances[order][first])
+    ]
+    return sorted(site, key=lambda row: row["distance"])
+
+
+def chain_geometry(bundle: CoordinateBundle) -> Dict[str, dict]:
+    """Atom count, centroid and radius of gyration of every chain, waters excluded."""
+    dry = ~bundle.water_mask()
+    chains = bundle.atom_chain[dry]
+    coords = np.asarray(bundle.coords[dry], dtype=np.float64)
+    counts = np.bincount(chains, minlength=len(bundle.chains))
+    present = counts > 0
+    centroids = np.zeros((len(bundle.chains), 3))
+    for axis in range(3):
+        centroids[present, axis] = np.bincount(chains, coords[:, axis], len(bundle.chains))[present] / counts[present]
+    squared = np.sum((coords - centroids[chains]) ** 2, axis=1)
+    gyration = np.zeros(len(bundle.chains))
+    gyration[present] = np.sqrt(np.bincount(chains, squared, len(bundle.chains))[present] / counts[present])
+    return {
+        chain_id: {
+            "atoms": int(counts[i]),
+            "centroid": [round(float(v), 3) for v in centroids[i]],
+            "radius_of_gyration": round(float(gyration[i]), 3),
+        }
+        for i, chain_id in enumerate(bundle.chains)
+        if present[i]
+    }
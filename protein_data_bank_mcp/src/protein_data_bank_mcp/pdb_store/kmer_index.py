@@ -0,0 +1,178 @@
+"""
+Inverted k-mer index over the chain sequences of the structure store.
+
+Each distinct k-mer of a chain is one row of a SQLite table clustered by
+k-mer, so a query reads only the posting lists of its own k-mers. Entries
+are (re)indexed one at a time as their chains are extracted.
+"""
+import sqlite3
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Set
+
+from Bio.Align import PairwiseAligner, substitution_matrices
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+_CODES = {aa: i for i, aa in enumerate(AMINO_ACIDS)}
+
+
+def kmers(sequence: str, k: int) -> Set[int]:
+    """Distinct k-mers of a sequence packed as ints, skipping those with non standard residues."""
+    codes = [_CODES.get(aa, -1) for aa in sequence.upper()]
+    packed = set()
+    for start in range(len(codes) - k + 1):
+        window = codes[start:start + k]
+        if -1 in window:
+            continue
+        code = 0
+        for aa in window:
+            code = code * len(AMINO_ACIDS) + aa
+        packed.add(code)
+    return packed
+
+
+@lru_cache(maxsize=1)
+def _blosum62():
+    return substitution_matrices.load("BLOSUM62")
+
+
+def _aligner() -> PairwiseAligner:
+    aligner = PairwiseAligner(mode="local")
+    aligner.substitution_matrix = _blosum62()
+    aligner.open_gap_score = -11
+    aligner.extend_gap_score = -1
+    return aligner
+
+
+def _alignable(sequence: str) -> str:
+    return "".join(aa if aa in _CODES else "X" for aa in sequence.upper())
+
+
+class KmerIndex:
+    """Candidate chains sharing k-mers with a query, optionally refined by local alignment."""
+
+    def __init__(self, path: Path | str, k: int = 3):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS chains (
+                id INTEGER PRIMARY KEY, entry_id TEXT, chain_id TEXT, sequence TEXT, kmer_count INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS chains_entry ON chains (entry_id);
+            CREATE TABLE IF NOT EXISTS postings (
+                kmer INTEGER, chain INTEGER, PRIMARY KEY (kmer, chain)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_chain ON postings (chain);
+            """
+        )
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'k'").fetchone()
+        if row is not None and int(row[0]) != k:
+            logger.info(f"k-mer index at {path} was built with k={row[0]}, rebuilding with k={k}")
+            self._db.executescript("DELETE FROM postings; DELETE FROM chains;")
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('k', ?)", (str(k),))
+        self._db.commit()
+        self.k = k
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chains").fetchone()[0]
+
+    def entries(self) -> Set[str]:
+        with self._lock:
+            return {row[0] for row in self._db.execute("SELECT DISTINCT entry_id FROM chains")}
+
+    def add(self, entry_id: str, chains: Dict[str, str]):
+        """Index the chains of an entry, replacing whatever was indexed for it before."""
+        entry_id = entry_id.lower()
+        with self._lock, self._db:
+            self._remove(entry_id)
+            for chain_id, sequence in chains.items():
+                chain_kmers = kmers(sequence, self.k)
+                cursor = self._db.execute(
+                    "INSERT INTO chains (entry_id, chain_id, sequence, kmer_count) VALUES (?, ?, ?, ?)",
+                    (entry_id, chain_id, sequence, len(chain_kmers)),
+                )
+                self._db.executemany(
+                    "INSERT INTO postings VALUES (?, ?)", ((kmer, cursor.lastrowid) for kmer in chain_kmers)
+                )
+
+    def remove(self, entry_id: str):
+        with self._lock, self._db:
+            self._remove(entry_id.lower())
+
+    def _remove(self, entry_id: str):
+        ids = [row[0] for row in self._db.execute("SELECT id FROM chains WHERE entry_id = ?", (entry_id,))]
+        self._db.executemany("DELETE FROM postings WHERE chain = ?", ((chain,) for chain in ids))
+        self._db.execute("DELETE FROM chains WHERE entry_id = ?", (entry_id,))
+
+    def search(self, sequence: str, limit: int = 10, align: bool = False, min_shared: int = 1) -> List[dict]:
+        """Chains ranked by the number of k-mers shared with `sequence`.
+
+        With `align`, a wider set of candidates is re-ranked by BLOSUM62 local
+        alignment score, and hits report the identity over the aligned columns.
+        """
+        query_kmers = sorted(kmers(sequence, self.k))
+        if not query_kmers:
+            raise ValueError(f"Query needs at least {self.k} consecutive standard amino acids")
+
+        with self._lock:
+            self._db.execute("CREATE TEMP TABLE IF NOT EXISTS query (kmer INTEGER PRIMARY KEY)")
+            self._db.execute("DELETE FROM query")
+            self._db.executemany("INSERT INTO query VALUES (?)", ((kmer,) for kmer in query_kmers))
+            rows = self._db.execute(
+                """
+                SELECT c.entry_id, c.chain_id, c.sequence, c.kmer_count, hits.shared
+                FROM (
+                    SELECT p.chain, COUNT(*) AS shared
+                    FROM query q JOIN postings p ON p.kmer = q.kmer
+                    GROUP BY p.chain HAVING shared >= ?
+                    ORDER BY shared DESC LIMIT ?
+                ) hits JOIN chains c ON c.id = hits.chain
+                ORDER BY hits.shared DESC, c.entry_id, c.chain_id
+                """,
+                (min_shared, max(limit * 5, 50) if align else limit),
+            ).fetchall()
+
+        hits = [
+            {
+                "entry_id": entry_id.upper(),
+                "chain_id": chain_id,
+                "length": len(chain_sequence),
+                "shared_kmers": shared,
+                "query_coverage": round(shared / len(query_kmers), 3),
+                "target_coverage": round(shared / kmer_count, 3),
+            }
+            for entry_id, chain_id, chain_sequence, kmer_count, shared in rows
+        ]
+        if align:
+            aligner = _aligner()
+            for hit, row in zip(hits, rows):
+                hit.update(local_alignment(aligner, sequence, row[2]))
+            hits.sort(key=lambda hit: hit["alignment_score"], reverse=True)
+            hits = hits[:limit]
+        return hits
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def local_alignment(aligner: PairwiseAligner, query: str, target: str) -> dict:
+    """Score and identity of the best local alignment of two sequences."""
+    alignment = aligner.align(_alignable(query), _alignable(target))[0]
+    counts = alignment.counts()
+    aligned = counts.identities + counts.mismatches + counts.gaps
+    return {
+        "alignment_score": float(alignment.score),
+        "identity": round(counts.identities / aligned, 3) if aligned else 0.0,
+        "aligned_length": aligned,
+    }
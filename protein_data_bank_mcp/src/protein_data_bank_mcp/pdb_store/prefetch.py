@@ -0,0 +1,52 @@
+"""
+Warm the structure store ahead of time.
+
+    python -m protein_data_bank_mcp.pdb_store.prefetch 4HHB 1FAT --file ids.txt --concurrency 8
+
+`--file` takes one entry id per line, for example extracted from last week's
+query logs. Entries already in the store are not downloaded again.
+"""
+import sys
+import asyncio
+import argparse
+from typing import List, Optional
+
+from protein_data_bank_mcp.pdb_store.storage import parser
+from protein_data_bank_mcp.rest_api.utils import close_session
+
+
+def _read_ids(path: str) -> List[str]:
+    with open(path) as f:
+        return [line.split()[0] for line in f if line.strip() and not line.startswith("#")]
+
+
+async def _prefetch(entry_ids: List[str], concurrency: Optional[int]):
+    try:
+        return await parser.prefetch(entry_ids, concurrency)
+    finally:
+        await close_session()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Download PDB entries into the local structure store.")
+    arg_parser.add_argument("entry_ids", nargs="*", help="entry ids, e.g. 4HHB")
+    arg_parser.add_argument("--file", action="append", default=[], help="file with one entry id per line")
+    arg_parser.add_argument("--concurrency", type=int, default=None, help="parallel downloads")
+    args = arg_parser.parse_args(argv)
+
+    entry_ids = list(args.entry_ids)
+    for path in args.file:
+        entry_ids.extend(_read_ids(path))
+    if not entry_ids:
+        arg_parser.error("no entry ids given")
+
+    results = asyncio.run(_prefetch(entry_ids, args.concurrency))
+    failed = {entry_id: error for entry_id, error in results.items() if error != "ok"}
+    for entry_id, error in failed.items():
+        print(f"{entry_id}: {error}", file=sys.stderr)
+    print(f"Prefetched {len(results) - len(failed)} of {len(results)} entries into {parser.folder}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
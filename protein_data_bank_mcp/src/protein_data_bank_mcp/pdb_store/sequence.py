@@ -0,0 +1,184 @@
+"""
+Streaming chain sequence extraction from PDB and mmCIF files.
+
+Files are read line by line, plain or gzip compressed, without building a
+Bio.PDB structure, so memory stays flat even for ribosomes and viruses.
+"""
+import re
+import gzip
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from protein_data_bank_mcp.pdb_store.residues import PROTEIN_COMMON_THREE_TO_ONE
+
+ATOM = "atom"
+SEQRES = "seqres"
+
+_CIF_TOKEN = re.compile(r"""'(?:[^']|'(?=\S))*'|"(?:[^"]|"(?=\S))*"|\S+""")
+
+
+def open_text(path: Path | str):
+    path = Path(path)
+    with open(path, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    if compressed:
+        return gzip.open(path, "rt", errors="replace")
+    return open(path, "rt", errors="replace")
+
+
+def is_mmcif(path: Path | str) -> bool:
+    name = Path(path).name.lower()
+    return name.endswith((".cif", ".cif.gz", ".mmcif", ".mmcif.gz"))
+
+
+def _one_letter(resname: str) -> str:
+    return PROTEIN_COMMON_THREE_TO_ONE.get(resname, "X")
+
+
+def pdb_atom_chains(lines: Iterable[str]) -> Dict[str, str]:
+    """Residues per chain from the ATOM/HETATM records of the first model."""
+    chains: Dict[str, List[str]] = {}
+    seen: Set[Tuple[str, str, str, bool]] = set()
+    for line in lines:
+        record = line[:6]
+        if record == "ENDMDL":
+            break
+        if record != "ATOM  " and record != "HETATM":
+            continue
+        chain_id = line[21:22]
+        resname = line[17:20].strip()
+        key = (chain_id, line[22:26], line[26:27], resname == "HOH")
+        if key in seen:
+            continue
+        seen.add(key)
+        chains.setdefault(chain_id, []).append(_one_letter(resname))
+    return {chain_id: "".join(residues) for chain_id, residues in chains.items()}
+
+
+def pdb_seqres_chains(lines: Iterable[str]) -> Dict[str, str]:
+    """Deposited sequence per chain from SEQRES records."""
+    chains: Dict[str, List[str]] = {}
+    for line in lines:
+        record = line[:6]
+        if record == "SEQRES":
+            chains.setdefault(line[11:12], []).extend(_one_letter(name) for name in line[19:].split())
+        elif record in ("ATOM  ", "HETATM"):
+            # SEQRES records precede the coordinates
+            break
+    return {chain_id: "".join(residues) for chain_id, residues in chains.items()}
+
+
+def _cif_tokens(lines: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    """Yield `(value, is_tag)` tokens, joining `;` delimited text fields."""
+    text: Optional[List[str]] = None
+    for line in lines:
+        if text is not None:
+            if line.startswith(";"):
+                yield "".join(text), False
+                text = None
+            else:
+                text.append(line.rstrip("\r\n"))
+            continue
+        if line.startswith(";"):
+            text = [line[1:].rstrip("\r\n")]
+            continue
+        for match in _CIF_TOKEN.finditer(line):
+            token = match.group()
+            if token.startswith("#"):
+                break
+            if token[0] in "'\"":
+                yield token[1:-1], False
+            else:
+                yield token, token.startswith("_") or token == "loop_" or token.startswith("data_")
+
+
+def cif_rows(lines: Iterable[str], category: str) -> Iterator[Dict[str, str]]:
+    """Yield the rows of one mmCIF category, in loop or key-value form.
+
+    Reading stops as soon as the category has been read.
+    """
+    prefix = f"_{category}."
+    mode = None
+    tags: List[str] = []
+    values: List[str] = []
+    pairs: Dict[str, str] = {}
+    pending_tag: Optional[str] = None
+
+    for token, is_tag in _cif_tokens(lines):
+        if is_tag:
+            if mode == "loop_values" and tags[0].startswith(prefix):
+                return
+            if pairs and not token.startswith(prefix):
+                break
+            if token == "loop_":
+                mode, tags, values = "loop_tags", [], []
+            elif mode == "loop_tags":
+                tags.append(token)
+            elif token.startswith("_"):
+                mode, pending_tag = "pairs", token
+            else:
+                mode = None
+            continue
+
+        if mode == "loop_tags":
+            mode = "loop_values"
+        if mode == "loop_values":
+            if tags[0].startswith(prefix):
+                values.append(token)
+                if len(values) == len(tags):
+                    yield {tag[len(prefix):]: value for tag, value in zip(tags, values)}
+                    values = []
+        elif mode == "pairs" and pending_tag is not None:
+            if pending_tag.startswith(prefix):
+                pairs[pending_tag[len(prefix):]] = token
+            pending_tag = None
+
+    if pairs:
+        yield pairs
+
+
+def mmcif_atom_chains(lines: Iterable[str]) -> Dict[str, str]:
+    """Residues per author chain from `atom_site`, first model only."""
+    chains: Dict[str, List[str]] = {}
+    seen: Set[Tuple[str, str, str, bool]] = set()
+    first_model = None
+    for row in cif_rows(lines, "atom_site"):
+        model = row.get("pdbx_PDB_model_num")
+        if first_model is None:
+            first_model = model
+        elif model != first_model:
+            break
+        chain_id = row.get("auth_asym_id") or row.get("label_asym_id")
+        resname = row.get("auth_comp_id") or row.get("label_comp_id")
+        seq_id = row.get("auth_seq_id") or row.get("label_seq_id")
+        key = (chain_id, seq_id, row.get("pdbx_PDB_ins_code", "?"), resname == "HOH")
+        if key in seen:
+            continue
+        seen.add(key)
+        chains.setdefault(chain_id, []).append(_one_letter(resname))
+    return {chain_id: "".join(residues) for chain_id, residues in chains.items()}
+
+
+def mmcif_seqres_chains(lines: Iterable[str]) -> Dict[str, str]:
+    """Canonical sequence of each polymer entity, for every chain it appears in."""
+    chains = {}
+    for row in cif_rows(lines, "entity_poly"):
+        sequence = "".join(row.get("pdbx_seq_one_letter_code_can", "").split())
+        for chain_id in row.get("pdbx_strand_id", "").split(","):
+            if chain_id:
+                chains[chain_id] = sequence
+    return chains
+
+
+def extract_chains(path: Path | str, source: str = ATOM) -> Dict[str, str]:
+    """Sequence per chain from a PDB or mmCIF file, plain or gzip compressed.
+
+    `source` is `atom` for the modelled residues or `seqres` for the
+    deposited sequence.
+    """
+    if source not in (ATOM, SEQRES):
+        raise ValueError(f"source must be {ATOM!r} or {SEQRES!r}, got {source!r}")
+    with open_text(path) as lines:
+        if is_mmcif(path):
+            return mmcif_atom_chains(lines) if source == ATOM else mmcif_seqres_chains(lines)
+        return pdb_atom_chains(lines) if source == ATOM else pdb_seqres_chains(lines)
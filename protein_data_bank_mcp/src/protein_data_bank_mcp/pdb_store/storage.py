@@ -1,80 +1,499 @@
+import os
+import re
+import gzip
 import json
+import time
+import shutil
+import asyncio
 import logging
+import tempfile
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from mcp import types
-from typing import Dict
-from Bio.PDB import PDBList, PDBParser
+from typing import Dict, Iterable, List, Optional, Tuple
+from Bio.PDB import PDBList
 from pathlib import Path
 
+from protein_data_bank_mcp.pdb_store.residues import (  # noqa: F401
+    PROTEIN_COMMON_ONE_TO_THREE,
+    PROTEIN_COMMON_THREE_TO_ONE,
+)
+from protein_data_bank_mcp.pdb_store import coordinates
+from protein_data_bank_mcp.pdb_store.coordinates import CoordinateBundle, build_bundle
+from protein_data_bank_mcp.pdb_store.kmer_index import KmerIndex
+from protein_data_bank_mcp.pdb_store.sequence import ATOM, SEQRES, extract_chains
+from protein_data_bank_mcp.rest_api.constants import (
+    PDB_FILES_URL,
+    BATCH_CONCURRENCY,
+    STORE_MAX_BYTES,
+    KMER_SIZE,
+    KMER_BACKFILL,
+)
+from protein_data_bank_mcp.rest_api.rate_limit import UpstreamError
+from protein_data_bank_mcp.rest_api.single_flight import SingleFlight
+from protein_data_bank_mcp.rest_api.utils import on_shutdown, request
+
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-
-PROTEIN_COMMON_ONE_TO_THREE = {
-    "A": "ALA",
-    "R": "ARG",
-    "N": "ASN",
-    "D": "ASP",
-    "C": "CYS",
-    "Q": "GLN",
-    "E": "GLU",
-    "G": "GLY",
-    "H": "HIS",
-    "I": "ILE",
-    "L": "LEU",
-    "K": "LYS",
-    "M": "MET",
-    "F": "PHE",
-    "P": "PRO",
-    "S": "SER",
-    "T": "THR",
-    "W": "TRP",
-    "Y": "TYR",
-    "V": "VAL",
-}
-
-PROTEIN_COMMON_THREE_TO_ONE = {v: k for k, v in PROTEIN_COMMON_ONE_TO_THREE.items()}
+# pdb1abc.ent, pdb1abc.ent.gz, 1abc.cif.gz, pdb1abc.chains.json, 1abc.coords, ...
+_ENTRY_FILE = re.compile(r"^(?:pdb)?([0-9a-z]{4})\.")
 
 
 class PDBStore:
-    def __init__(self, folder: Path | str):
+    """Structure files and the indexes derived from them, kept under one folder.
+
+    Files are written through a temporary file and a rename, so readers never
+    see partial files. With `max_bytes` set, the least recently accessed
+    entries are evicted once the folder grows past it. With `kmer_size` set,
+    the modelled chains of every entry are added to a k-mer index for
+    similarity search.
+    """
+
+    def __init__(
+        self,
+        folder: Path | str,
+        cache_size: int = 128,
+        workers: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        kmer_size: Optional[int] = None,
+        kmer_backfill: int = KMER_BACKFILL,
+    ):
         self.folder = Path(folder)
         self.folder.mkdir(parents=True, exist_ok=True)
         self._pdb_list = PDBList()
-        self._parser = PDBParser()
+        self.cache_size = cache_size
+        self._chains: OrderedDict[Tuple[str, str], Dict[str, str]] = OrderedDict()
+        # evict runs in worker threads while the event loop reads and fills the cache
+        self._chains_lock = threading.Lock()
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = SingleFlight()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # bytes per entry, scanned from disk on first use and then kept up to date on write and evict
+        self._usage: Optional[Dict[str, int]] = None
+        self._usage_total = 0
+        self._usage_lock = threading.Lock()
+        self.kmer_index = KmerIndex(self.folder / "kmer_index.sqlite", kmer_size) if kmer_size else None
+        self.kmer_backfill = kmer_backfill
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _lock(self, entry_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(entry_id.lower(), threading.Lock())
+
+    def download_pdb(self, entry_id: str) -> Path:
+        """Download the PDB format file and store it gzipped."""
+        with tempfile.TemporaryDirectory(dir=self.folder, suffix=".tmp") as tmp_dir:
+            downloaded = self._pdb_list.retrieve_pdb_file(
+                entry_id, pdir=tmp_dir, overwrite=True, file_format="pdb"
+            )
+            if not downloaded or not os.path.exists(downloaded):
+                raise UpstreamError(f"Could not download {entry_id}")
+            path = self.compressed_pdb_path(entry_id)
+            self._write_atomic(path, gzip.compress(Path(downloaded).read_bytes()))
+        self.enforce_quota(keep=[entry_id])
+        return path
+
+    def pdb_path(self, entry_id: str) -> Path:
+        return self.folder / f"pdb{entry_id.lower()}.ent"
+
+    def compressed_pdb_path(self, entry_id: str) -> Path:
+        return self.folder / f"pdb{entry_id.lower()}.ent.gz"
+
+    def mmcif_path(self, entry_id: str) -> Path:
+        return self.folder / f"{entry_id.lower()}.cif.gz"
+
+    def find_structure(self, entry_id: str) -> Optional[Path]:
+        """Path of the stored structure file in any format, if any, marking it as accessed."""
+        for path in (self.pdb_path(entry_id), self.compressed_pdb_path(entry_id), self.mmcif_path(entry_id)):
+            if path.exists():
+                self._touch(path)
+                return path
+        return None
+
+    def get_pdb(self, entry_id: str) -> Path:
+        with self._lock(entry_id):
+            for path in (self.pdb_path(entry_id), self.compressed_pdb_path(entry_id)):
+                if path.exists():
+                    self._touch(path)
+                    return path
+            return self.download_pdb(entry_id)
+
+    async def download_mmcif_async(self, entry_id: str) -> Path:
+        """Download the gzipped mmCIF file, which exists for every entry unlike the PDB format."""
+        url = f"{PDB_FILES_URL}/{entry_id.upper()}.cif.gz"
+        status, body = await request("GET", url, binary=True)
+        if status != 200:
+            raise UpstreamError(f"Could not download {entry_id}, HTTP {status}")
+        path = self.mmcif_path(entry_id)
+        await asyncio.to_thread(self._write_atomic, path, body)
+        await asyncio.to_thread(self.enforce_quota, [entry_id])
+        return path
+
+    async def get_structure_async(self, entry_id: str) -> Path:
+        path = self.find_structure(entry_id)
+        if path is None:
+            path = await self._in_flight.do(
+                ("download", entry_id.lower()), lambda: self.download_mmcif_async(entry_id)
+            )
+        return path
 
-    def download_pdb(self, entry_id: str):
-        self._pdb_list.retrieve_pdb_file(
-            entry_id, pdir=self.folder, overwrite=True, file_format="pdb"
+    async def prefetch(self, entry_ids: Iterable[str], concurrency: Optional[int] = None) -> Dict[str, str]:
+        """Download many entries with bounded parallelism, reporting `ok` or the error per entry."""
+        semaphore = asyncio.Semaphore(
+            concurrency or int(os.environ.get("PDB_BATCH_CONCURRENCY", BATCH_CONCURRENCY))
         )
 
-    def get_pdb(self, entry_id: str):
-        pdb_path = self.folder / f"pdb{entry_id.lower()}.ent"
-        if not pdb_path.exists():
-            self.download_pdb(entry_id)
-        return pdb_path
-
-    def get_residue_chains(self, entry_id: str) -> Dict[str, str]:
-        path = self.get_pdb(entry_id)
-        structure = self._parser.get_structure(entry_id, path)
-
-        chains = {}
-        for chain in structure.get_chains():
-            residues = "".join(
-                [
-                    PROTEIN_COMMON_THREE_TO_ONE.get(x.resname, "X")
-                    for x in chain.get_residues()
-                ]
+        async def fetch_one(entry_id: str) -> str:
+            try:
+                async with semaphore:
+                    await self.get_structure_async(entry_id)
+                return "ok"
+            except Exception as e:
+                logger.warning(f"Failed to prefetch {entry_id}: {e}")
+                return str(e) or type(e).__name__
+
+        unique_ids = list(dict.fromkeys(entry_id.lower() for entry_id in entry_ids))
+        results = await asyncio.gather(*[fetch_one(entry_id) for entry_id in unique_ids])
+        return dict(zip(unique_ids, results))
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        fd, tmp_name = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    @staticmethod
+    def _touch(path: Path):
+        """Record an access, leaving the modification time used for index freshness alone."""
+        try:
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except OSError:
+            pass
+
+    def disk_usage(self) -> Dict[str, Tuple[int, float]]:
+        """Bytes used and last access time of every entry in the store."""
+        usage: Dict[str, Tuple[int, float]] = {}
+        for path in self.folder.iterdir():
+            match = _ENTRY_FILE.match(path.name)
+            if match is None or path.name.endswith(".tmp"):
+                continue
+            try:
+                files = [path] if path.is_file() else [child for child in path.iterdir() if child.is_file()]
+                stats = [child.stat() for child in files]
+            except OSError:
+                # removed concurrently
+                continue
+            size, accessed = usage.get(match.group(1), (0, 0.0))
+            usage[match.group(1)] = (
+                size + sum(stat.st_size for stat in stats),
+                max([accessed] + [stat.st_atime for stat in stats]),
             )
-            chains[chain.id] = residues
+        return usage
+
+    def _entry_size(self, entry_id: str) -> int:
+        """Bytes of the known files of one entry, without listing the store."""
+        coords = self.coordinates_path(entry_id)
+        paths = [
+            self.pdb_path(entry_id),
+            self.compressed_pdb_path(entry_id),
+            self.mmcif_path(entry_id),
+            self.sequence_index_path(entry_id, ATOM),
+            self.sequence_index_path(entry_id, SEQRES),
+        ]
+        size = 0
+        try:
+            if coords.is_dir():
+                paths.extend(coords.iterdir())
+        except OSError:
+            pass
+        for path in paths:
+            try:
+                size += path.stat().st_size
+            except OSError:
+                continue
+        return size
+
+    def _set_usage(self, entry_id: str, size: int):
+        with self._usage_lock:
+            if self._usage is None:
+                return
+            self._usage_total += size - self._usage.get(entry_id, 0)
+            if size:
+                self._usage[entry_id] = size
+            else:
+                self._usage.pop(entry_id, None)
+
+    def _rescan_usage(self) -> Dict[str, Tuple[int, float]]:
+        usage = self.disk_usage()
+        with self._usage_lock:
+            self._usage = {entry_id: size for entry_id, (size, _) in usage.items()}
+            self._usage_total = sum(self._usage.values())
+        return usage
+
+    def evict(self, entry_id: str):
+        """Remove every file of an entry and forget its cached sequences."""
+        entry_id = entry_id.lower()
+        for path in self.folder.iterdir():
+            match = _ENTRY_FILE.match(path.name)
+            if match is None or match.group(1) != entry_id or path.name.endswith(".tmp"):
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+        with self._chains_lock:
+            for key in [key for key in self._chains if key[0] == entry_id]:
+                del self._chains[key]
+        if self.kmer_index is not None:
+            self.kmer_index.remove(entry_id)
+        self._set_usage(entry_id, 0)
+
+    def enforce_quota(self, keep: Iterable[str] = ()) -> List[str]:
+        """Evict least recently accessed entries until the store fits in `max_bytes`.
+
+        `keep` are the entries just written: only their size is measured
+        again, the store is only listed on first use and when over quota.
+        """
+        if self.max_bytes is None:
+            return []
+        keep = [entry_id.lower() for entry_id in keep]
+        if self._usage is None:
+            self._rescan_usage()
+        else:
+            for entry_id in keep:
+                self._set_usage(entry_id, self._entry_size(entry_id))
+        if self._usage_total <= self.max_bytes:
+            return []
+
+        # access times are only needed to choose what to evict, and the total may have drifted
+        usage = self._rescan_usage()
+        total = self._usage_total
+        if total <= self.max_bytes:
+            return []
+
+        keep = set(keep)
+        evicted = []
+        for entry_id, (size, _) in sorted(usage.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if entry_id in keep:
+                continue
+            self.evict(entry_id)
+            evicted.append(entry_id)
+            total -= size
+        logger.info(f"Evicted {len(evicted)} entries to stay under {self.max_bytes} bytes")
+        return evicted
+
+    def sequence_index_path(self, entry_id: str, source: str = ATOM) -> Path:
+        suffix = "chains" if source == ATOM else source
+        return self.folder / f"pdb{entry_id.lower()}.{suffix}.json"
+
+    def _cached_chains(self, entry_id: str, source: str) -> Optional[Dict[str, str]]:
+        key = (entry_id.lower(), source)
+        with self._chains_lock:
+            if key in self._chains:
+                self._chains.move_to_end(key)
+                return self._chains[key]
+        return None
+
+    def _remember_chains(self, entry_id: str, source: str, chains: Dict[str, str]):
+        with self._chains_lock:
+            self._chains[(entry_id.lower(), source)] = chains
+            while len(self._chains) > self.cache_size:
+                self._chains.popitem(last=False)
+
+    def _read_sequence_index(self, entry_id: str, source: str, path: Path) -> Optional[Dict[str, str]]:
+        index_path = self.sequence_index_path(entry_id, source)
+        if index_path.exists() and index_path.stat().st_mtime >= path.stat().st_mtime:
+            return json.loads(index_path.read_text())
+        return None
 
+    def _write_sequence_index(self, entry_id: str, source: str, chains: Dict[str, str]):
+        self._write_atomic(self.sequence_index_path(entry_id, source), json.dumps(chains).encode())
+        if self._usage is not None:
+            self._set_usage(entry_id.lower(), self._entry_size(entry_id))
+
+    def get_residue_chains(self, entry_id: str, source: str = ATOM) -> Dict[str, str]:
+        """One letter sequence per chain, served from memory or the on-disk index when possible.
+
+        `source` is `atom` for the modelled residues or `seqres` for the
+        deposited sequence.
+        """
+        chains = self._cached_chains(entry_id, source)
+        if chains is not None:
+            return chains
+
+        path = self.find_structure(entry_id) or self.get_pdb(entry_id)
+        chains = self._read_sequence_index(entry_id, source, path)
+        if chains is None:
+            chains = extract_chains(path, source)
+            self._write_sequence_index(entry_id, source, chains)
+            self._index_kmers(entry_id, source, chains)
+
+        self._remember_chains(entry_id, source, chains)
         return chains
 
+    async def get_residue_chains_async(self, entry_id: str, source: str = ATOM) -> Dict[str, str]:
+        """Like `get_residue_chains`, without blocking the event loop.
+
+        Missing entries are downloaded asynchronously as mmCIF and extraction
+        runs in the process pool. Concurrent requests for the same entry share
+        one load.
+        """
+        chains = self._cached_chains(entry_id, source)
+        if chains is not None:
+            return chains
+        return await self._in_flight.do(
+            (entry_id.lower(), source), lambda: self._load_residue_chains(entry_id, source)
+        )
+
+    async def _load_residue_chains(self, entry_id: str, source: str) -> Dict[str, str]:
+        path = await self.get_structure_async(entry_id)
+        chains = await asyncio.to_thread(self._read_sequence_index, entry_id, source, path)
+        if chains is None:
+            loop = asyncio.get_running_loop()
+            chains = await loop.run_in_executor(self.pool, extract_chains, path, source)
+            await asyncio.to_thread(self._write_sequence_index, entry_id, source, chains)
+            await asyncio.to_thread(self._index_kmers, entry_id, source, chains)
+
+        self._remember_chains(entry_id, source, chains)
+        return chains
+
+    def _index_kmers(self, entry_id: str, source: str, chains: Dict[str, str]):
+        if self.kmer_index is not None and source == ATOM:
+            self.kmer_index.add(entry_id, chains)
+
+    def stored_entries(self) -> List[str]:
+        """Ids of the entries with a structure file in the store."""
+        entries = set()
+        for pattern in ("pdb????.ent", "pdb????.ent.gz", "????.cif.gz"):
+            entries.update(_ENTRY_FILE.match(path.name).group(1) for path in self.folder.glob(pattern))
+        return sorted(entries)
+
+    async def search_similar_chains(self, sequence: str, limit: int = 10, align: bool = False) -> List[dict]:
+        """Stored chains ranked by shared k-mers with `sequence`.
+
+        Entries stored before the index existed are indexed first, at most
+        `kmer_backfill` of them per search so one query never pays for the
+        whole store.
+        """
+        if self.kmer_index is None:
+            raise ValueError("The k-mer index is disabled")
+        indexed = await asyncio.to_thread(self.kmer_index.entries)
+        unindexed = [entry_id for entry_id in await asyncio.to_thread(self.stored_entries) if entry_id not in indexed]
+        for entry_id in unindexed[:self.kmer_backfill]:
+            chains = await self.get_residue_chains_async(entry_id)
+            await asyncio.to_thread(self.kmer_index.add, entry_id, chains)
+        if len(unindexed) > self.kmer_backfill:
+            logger.info(f"{len(unindexed) - self.kmer_backfill} stored entries are not in the k-mer index yet")
+        return await asyncio.to_thread(self.kmer_index.search, sequence, limit, align)
+
+    def coordinates_path(self, entry_id: str) -> Path:
+        return self.folder / f"{entry_id.lower()}.coords"
+
+    def _bundle_is_fresh(self, entry_id: str, path: Path) -> bool:
+        meta_path = self.coordinates_path(entry_id) / "meta.json"
+        return meta_path.exists() and meta_path.stat().st_mtime >= path.stat().st_mtime
+
+    def get_coordinates(self, entry_id: str) -> CoordinateBundle:
+        """Memory-mapped coordinate bundle of the entry, built on first use."""
+        path = self.find_structure(entry_id) or self.get_pdb(entry_id)
+        if not self._bundle_is_fresh(entry_id, path):
+            build_bundle(path, self.coordinates_path(entry_id))
+            self.enforce_quota(keep=[entry_id])
+        return CoordinateBundle(self.coordinates_path(entry_id))
+
+    async def get_coordinates_async(self, entry_id: str) -> CoordinateBundle:
+        """Like `get_coordinates`, building the bundle in the process pool."""
+        await self._in_flight.do(("coords", entry_id.lower()), lambda: self._build_coordinates(entry_id))
+        return await asyncio.to_thread(CoordinateBundle, self.coordinates_path(entry_id))
+
+    async def _build_coordinates(self, entry_id: str):
+        path = await self.get_structure_async(entry_id)
+        if not await asyncio.to_thread(self._bundle_is_fresh, entry_id, path):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.pool, build_bundle, path, self.coordinates_path(entry_id))
+            await asyncio.to_thread(self.enforce_quota, [entry_id])
+
+
+parser = PDBStore(
+    os.environ.get("PDB_STORE_PATH", "temp"),
+    workers=int(os.environ["PDB_PARSE_WORKERS"]) if os.environ.get("PDB_PARSE_WORKERS") else None,
+    max_bytes=int(os.environ.get("PDB_STORE_MAX_BYTES", STORE_MAX_BYTES)) or None,
+    kmer_size=int(os.environ.get("PDB_KMER_SIZE", KMER_SIZE)) or None,
+    kmer_backfill=int(os.environ.get("PDB_KMER_BACKFILL", KMER_BACKFILL)),
+)
+on_shutdown(parser.close)
+
+
+async def get_residue_chains(entry_id: str, source: str = ATOM) -> types.TextContent:
+    """One letter sequence per chain, from the modelled residues (`atom`) or the deposited sequence (`seqres`)."""
+    return json.dumps(await parser.get_residue_chains_async(entry_id, source), indent=2)
+
+
+async def prefetch_structures(entry_ids: List[str]) -> types.TextContent:
+    """Download structures ahead of use, e.g. to warm the store before peak hours."""
+    return json.dumps(await parser.prefetch(entry_ids), indent=2)
+
+
+async def search_similar_chains(sequence: str, limit: int = 10, align: bool = False) -> types.TextContent:
+    """Stored chains similar to a one letter protein sequence, ranked by shared k-mers.
+
+    With `align`, candidates are re-ranked by local alignment score and report
+    their identity to the query.
+    """
+    return json.dumps(await parser.search_similar_chains(sequence, limit, align), indent=2)
+
+
+def _check_cutoff(cutoff: float):
+    if not cutoff > 0:
+        raise ValueError(f"cutoff must be a positive distance in Å, got {cutoff}")
+
+
+async def chain_contacts(entry_id: str, chain_a: str, chain_b: str, cutoff: float = 4.0) -> types.TextContent:
+    """Residue pairs between two chains with atoms closer than `cutoff` Å, with their minimum distance."""
+    _check_cutoff(cutoff)
+    bundle = await parser.get_coordinates_async(entry_id)
+    contacts = await asyncio.to_thread(coordinates.chain_contacts, bundle, chain_a, chain_b, cutoff)
+    return json.dumps(contacts, indent=2)
+
+
+async def binding_site(
+    entry_id: str, ligand: str, cutoff: float = 5.0, chain_id: Optional[str] = None
+) -> types.TextContent:
+    """Residues within `cutoff` Å of a ligand given by its chemical component id, e.g. `HEM`.
 
-parser = PDBStore("temp")
+    `chain_id` restricts the search to the ligand copies on one chain.
+    """
+    _check_cutoff(cutoff)
+    bundle = await parser.get_coordinates_async(entry_id)
+    site = await asyncio.to_thread(coordinates.binding_site, bundle, ligand, cutoff, chain_id)
+    return json.dumps(site, indent=2)
 
 
-def get_residue_chains(entry_id: str) -> types.TextContent:
-    global parser
-    return json.dumps(parser.get_residue_chains(entry_id), indent=2)
+async def chain_geometry(entry_id: str) -> types.TextContent:
+    """Atom count, centroid and radius of gyration of every chain."""
+    bundle = await parser.get_coordinates_async(entry_id)
+    return json.dumps(await asyncio.to_thread(coordinates.chain_geometry, bundle), indent=2)
@@ -0,0 +1,54 @@
+from typing import List, Optional, Tuple
+from mcp import types
+from protein_data_bank_mcp.rest_api.utils import fetch_many
+
+
+def _split_id(identifier: str, separator: str) -> Tuple[str, str]:
+    entry_id, sep, sub_id = identifier.rpartition(separator)
+    if not sep or not entry_id or not sub_id:
+        raise ValueError(
+            f"Expected an identifier of the form <entry_id>{separator}<id>, got {identifier!r}"
+        )
+    return entry_id, sub_id
+
+
+def _entity_suffix(endpoint: str):
+    def to_suffix(entity_id: str) -> str:
+        entry_id, entity = _split_id(entity_id, "_")
+        return f"/core/{endpoint}/{entry_id}/{entity}"
+    return to_suffix
+
+
+def _instance_suffix(endpoint: str):
+    def to_suffix(instance_id: str) -> str:
+        entry_id, asym_id = _split_id(instance_id, ".")
+        return f"/core/{endpoint}/{entry_id}/{asym_id}"
+    return to_suffix
+
+
+async def batch_structure(
+    entry_ids: List[str], fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    """Structure details for several entries, keyed by entry id (e.g. 4HHB)."""
+    return await fetch_many(entry_ids, lambda entry_id: f"/core/entry/{entry_id}", fields, compact)
+
+
+async def batch_polymer_entity(
+    entity_ids: List[str], fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    """Polymer entities keyed by <entry_id>_<entity_id> (e.g. 4HHB_1)."""
+    return await fetch_many(entity_ids, _entity_suffix("polymer_entity"), fields, compact)
+
+
+async def batch_uniprot_annotations(
+    entity_ids: List[str], fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    """UniProt annotations keyed by <entry_id>_<entity_id> (e.g. 4HHB_1)."""
+    return await fetch_many(entity_ids, _entity_suffix("uniprot"), fields, compact)
+
+
+async def batch_polymer_entity_instance(
+    instance_ids: List[str], fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    """Polymer entity instances keyed by <entry_id>.<asym_id> (e.g. 4HHB.A)."""
+    return await fetch_many(instance_ids, _instance_suffix("polymer_entity_instance"), fields, compact)
@@ -0,0 +1,119 @@
+import json
+import time
+import sqlite3
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from protein_data_bank_mcp.rest_api.constants import CACHE_TTLS, CACHE_DEFAULT_TTL
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def ttl_for(api_suffix: str) -> float:
+    """Time to live in seconds for an endpoint, matched on the longest prefix."""
+    matches = [prefix for prefix in CACHE_TTLS if api_suffix.startswith(prefix)]
+    if not matches:
+        return CACHE_DEFAULT_TTL
+    return CACHE_TTLS[max(matches, key=len)]
+
+
+class ResponseCache:
+    """Two tier cache of upstream JSON responses keyed by `api_suffix`.
+
+    The first tier is an in-process LRU, the second a SQLite file that
+    survives restarts and is shared by workers on the same host.
+    """
+
+    def __init__(self, path: Path | str | None = None, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._db = None
+        if path is not None:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(api_suffix TEXT PRIMARY KEY, expires REAL, body TEXT)"
+            )
+            self._db.commit()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, api_suffix: str) -> Optional[Any]:
+        now = time.time()
+        entry = self._memory.get(api_suffix)
+        if entry is not None:
+            expires, value = entry
+            if expires > now:
+                self._memory.move_to_end(api_suffix)
+                self.hits += 1
+                return value
+            del self._memory[api_suffix]
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT expires, body FROM responses WHERE api_suffix = ?", (api_suffix,)
+            ).fetchone()
+            if row is not None:
+                expires, body = row
+                if expires > now:
+                    value = json.loads(body)
+                    self._remember(api_suffix, expires, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+                self._db.execute("DELETE FROM responses WHERE api_suffix = ?", (api_suffix,))
+                self._db.commit()
+
+        self.misses += 1
+        return None
+
+    def set(self, api_suffix: str, value: Any, ttl: Optional[float] = None):
+        if ttl is None:
+            ttl = ttl_for(api_suffix)
+        if ttl <= 0:
+            return
+        expires = time.time() + ttl
+        self._remember(api_suffix, expires, value)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (api_suffix, expires, json.dumps(value, separators=(",", ":"))),
+            )
+            self._db.commit()
+
+    def _remember(self, api_suffix: str, expires: float, value: Any):
+        self._memory[api_suffix] = (expires, value)
+        self._memory.move_to_end(api_suffix)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def purge_expired(self):
+        now = time.time()
+        for key in [k for k, (expires, _) in self._memory.items() if expires <= now]:
+            del self._memory[key]
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            self._db.commit()
+
+    def clear(self):
+        self._memory.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._memory),
+        }
@@ -1,15 +1,19 @@
-from typing import List
+from typing import List, Optional
 from mcp import types
 from protein_data_bank_mcp.rest_api.utils import fetch_data
 
 
-async def chemical_component(comp_id: str) -> List[types.TextContent]:
+async def chemical_component(
+    comp_id: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
     api_suffix = f"/core/chemcomp/{comp_id}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
 
 
-async def drugbank_annotations(comp_id: str) -> List[types.TextContent]:
+async def drugbank_annotations(
+    comp_id: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
     api_suffix = f"/core/drugbank/{comp_id}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
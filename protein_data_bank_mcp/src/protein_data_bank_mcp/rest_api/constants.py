@@ -1,2 +1,44 @@
 PDB_API_URL = "https://data.rcsb.org/rest/v1"
+PDB_GRAPHQL_URL = "https://data.rcsb.org/graphql"
+PDB_FILES_URL = "https://files.rcsb.org/download"
+PDB_WEEKLY_STATUS_URL = "https://files.wwpdb.org/pub/pdb/data/status/latest"
 MCP_SERVER_PORT = 8080
+
+HTTP_TOTAL_TIMEOUT = 30.0
+HTTP_CONNECT_TIMEOUT = 10.0
+HTTP_KEEPALIVE_TIMEOUT = 30.0
+HTTP_LIMIT = 100
+HTTP_LIMIT_PER_HOST = 20
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+CACHE_DEFAULT_TTL = DAY
+CACHE_MAX_ENTRIES = 1024
+CACHE_TTLS = {
+    "/schema/": 7 * DAY,
+    "/core/chemcomp/": 7 * DAY,
+    "/core/drugbank/": 7 * DAY,
+    "/holdings/": 10 * MINUTE,
+    "/holdings/removed/": HOUR,
+    "/holdings/unreleased": 5 * MINUTE,
+}
+
+BATCH_CONCURRENCY = 8
+
+STORE_MAX_BYTES = 20 * 1024 ** 3
+KMER_SIZE = 3
+KMER_BACKFILL = 16
+
+HOLDINGS_REFRESH_INTERVAL = HOUR
+HOLDINGS_FULL_SYNC_INTERVAL = 7 * DAY
+HOLDINGS_PAGE_SIZE = 1000
+
+RATE_LIMIT = 10.0
+RATE_BURST = 20
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 30.0
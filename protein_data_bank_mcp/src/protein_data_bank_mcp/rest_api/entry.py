@@ -1,15 +1,19 @@
-from typing import List
+from typing import List, Optional
 from mcp import types
 from protein_data_bank_mcp.rest_api.utils import fetch_data
 
 
-async def structure(entry_id: str) -> List[types.TextContent]:
+async def structure(
+    entry_id: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
     api_suffix = f"/core/entry/{entry_id}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
 
 
-async def pubmed_annotations(entry_id: str) -> List[types.TextContent]:
+async def pubmed_annotations(
+    entry_id: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
     api_suffix = f"/core/pubmed/{entry_id}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
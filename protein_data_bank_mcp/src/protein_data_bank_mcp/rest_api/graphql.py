@@ -0,0 +1,81 @@
+import os
+import re
+from typing import Dict, List, Optional
+from mcp import types
+from protein_data_bank_mcp.rest_api.constants import PDB_GRAPHQL_URL
+from protein_data_bank_mcp.rest_api.utils import post_json
+from protein_data_bank_mcp.rest_api.projection import serialize
+
+DEFAULT_ENTRY_FIELDS = [
+    "struct.title",
+    "exptl.method",
+    "rcsb_entry_info.resolution_combined",
+    "rcsb_accession_info.initial_release_date",
+    "assemblies.rcsb_id",
+    "assemblies.rcsb_assembly_info.polymer_entity_instance_count",
+    "assemblies.pdbx_struct_assembly.oligomeric_details",
+    "polymer_entities.rcsb_id",
+    "polymer_entities.rcsb_polymer_entity.pdbx_description",
+    "polymer_entities.entity_poly.rcsb_entity_polymer_type",
+    "polymer_entities.rcsb_polymer_entity_container_identifiers.asym_ids",
+    "polymer_entities.uniprots.rcsb_id",
+    "polymer_entities.uniprots.rcsb_uniprot_protein.name.value",
+    "nonpolymer_entities.nonpolymer_comp.chem_comp.id",
+    "nonpolymer_entities.nonpolymer_comp.chem_comp.name",
+]
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _selection_tree(fields: List[str]) -> Dict[str, dict]:
+    tree: Dict[str, dict] = {"rcsb_id": {}}
+    for field in fields:
+        node = tree
+        for name in field.split("."):
+            if not _FIELD_NAME.match(name):
+                raise ValueError(f"Invalid field {field!r}")
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _render(tree: Dict[str, dict]) -> str:
+    return " ".join(
+        f"{name} {{ {_render(children)} }}" if children else name
+        for name, children in tree.items()
+    )
+
+
+def build_entries_query(fields: List[str]) -> str:
+    """GraphQL query selecting dotted `fields` for a list of entries."""
+    selection = _render(_selection_tree(fields))
+    return f"query ($ids: [String!]!) {{ entries(entry_ids: $ids) {{ {selection} }} }}"
+
+
+async def entries_summary(
+    entry_ids: List[str], fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    """Describe several entries in one request to the RCSB GraphQL API.
+
+    `fields` are dotted paths in the GraphQL entry schema, for example
+    `polymer_entities.uniprots.rcsb_uniprot_protein.name.value`. By default the
+    title, method, resolution, assemblies, entities and UniProt names are returned.
+    With `compact` the JSON is written without whitespace and nulls.
+    """
+    ids = list(dict.fromkeys(entry_id.upper() for entry_id in entry_ids))
+    query = build_entries_query(fields or DEFAULT_ENTRY_FIELDS)
+    url = os.environ.get("PDB_GRAPHQL_URL", PDB_GRAPHQL_URL)
+    response_json = await post_json(url, {"query": query, "variables": {"ids": ids}})
+    if "data" not in response_json and "errors" not in response_json:
+        # not a GraphQL answer but the upstream {"status", "message"} error body
+        return types.TextContent(type="text", text=serialize(response_json, compact=compact))
+
+    entries = (response_json.get("data") or {}).get("entries") or []
+    merged = {"entries": {entry["rcsb_id"]: entry for entry in entries if entry}}
+    missing = [entry_id for entry_id in ids if entry_id not in merged["entries"]]
+    if missing:
+        merged["missing"] = missing
+    if response_json.get("errors"):
+        merged["errors"] = response_json["errors"]
+
+    result = types.TextContent(type="text", text=serialize(merged, compact=compact))
+    return result
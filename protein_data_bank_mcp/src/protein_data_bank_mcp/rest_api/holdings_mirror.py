@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from protein_data_bank_mcp.rest_api.constants import (
+    PDB_API_URL,
+    PDB_WEEKLY_STATUS_URL,
+    HOLDINGS_REFRESH_INTERVAL,
+    HOLDINGS_FULL_SYNC_INTERVAL,
+)
+from protein_data_bank_mcp.rest_api.rate_limit import UpstreamError
+from protein_data_bank_mcp.rest_api.utils import request
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+CURRENT = "CURRENT"
+REMOVED = "REMOVED"
+UNRELEASED = "UNRELEASED"
+STATUSES = (CURRENT, UNRELEASED, REMOVED)
+
+_ID_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def encode_id(entry_id: str) -> Optional[int]:
+    """Pack a four character PDB id into an int that sorts like the id."""
+    entry_id = entry_id.strip().upper()
+    if len(entry_id) != 4 or not entry_id.isalnum() or not entry_id.isascii():
+        return None
+    return int(entry_id, 36)
+
+
+def decode_id(code: int) -> str:
+    chars = []
+    for _ in range(4):
+        code, digit = divmod(code, 36)
+        chars.append(_ID_CHARS[digit])
+    return "".join(reversed(chars))
+
+
+def _sorted_codes(entry_ids: Iterable[str]) -> array:
+    codes = {encode_id(entry_id) for entry_id in entry_ids}
+    codes.discard(None)
+    return array("I", sorted(codes))
+
+
+class HoldingsMirror:
+    """Local copy of the PDB holdings as sorted arrays of packed ids.
+
+    Each status is stored as a sorted `uint32` array on disk, so membership,
+    status and prefix queries are binary searches. The mirror is brought up to
+    date from the wwPDB weekly added/obsolete lists, with a full download of
+    the id lists when it is empty or older than a week.
+    """
+
+    def __init__(self, folder: Path | str):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.ids: Dict[str, array] = {status: array("I") for status in STATUSES}
+        self.last_sync = 0.0
+        self.last_full_sync = 0.0
+        self._sync_task: Optional[asyncio.Task] = None
+        self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self.last_full_sync > 0
+
+    def load(self):
+        meta_path = self.folder / "meta.json"
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        for status in STATUSES:
+            codes = array("I")
+            path = self.folder / f"{status.lower()}.bin"
+            with open(path, "rb") as f:
+                codes.frombytes(f.read())
+            self.ids[status] = codes
+        self.last_sync = meta["last_sync"]
+        self.last_full_sync = meta["last_full_sync"]
+
+    def save(self):
+        for status in STATUSES:
+            path = self.folder / f"{status.lower()}.bin"
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                self.ids[status].tofile(f)
+            os.replace(tmp_path, path)
+        meta_path = self.folder / "meta.json"
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"last_sync": self.last_sync, "last_full_sync": self.last_full_sync}))
+        os.replace(tmp_path, meta_path)
+
+    def contains(self, status: str, entry_id: str) -> bool:
+        code = encode_id(entry_id)
+        codes = self.ids[status]
+        if code is None:
+            return False
+        i = bisect_left(codes, code)
+        return i < len(codes) and codes[i] == code
+
+    def status(self, entry_id: str) -> Optional[str]:
+        for status in STATUSES:
+            if self.contains(status, entry_id):
+                return status
+        return None
+
+    def count(self, status: str, prefix: str = "") -> int:
+        lo, hi = self._prefix_bounds(status, prefix)
+        return hi - lo
+
+    def page(self, status: str, prefix: str = "", offset: int = 0, limit: int = 1000) -> List[str]:
+        lo, hi = self._prefix_bounds(status, prefix)
+        start = min(lo + max(offset, 0), hi)
+        return [decode_id(code) for code in self.ids[status][start:min(start + max(limit, 0), hi)]]
+
+    def _prefix_bounds(self, status: str, prefix: str):
+        codes = self.ids[status]
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return 0, len(codes)
+        low, high = encode_id(prefix.ljust(4, "0")), encode_id(prefix.ljust(4, "Z"))
+        if low is None or high is None:
+            return 0, 0
+        return bisect_left(codes, low), bisect_right(codes, high)
+
+    def replace(self, status: str, entry_ids: Iterable[str]):
+        self.ids[status] = _sorted_codes(entry_ids)
+
+    def update(self, status: str, added: Iterable[str] = (), removed: Iterable[str] = ()):
+        codes = set(self.ids[status])
+        codes.update(code for code in map(encode_id, added) if code is not None)
+        codes.difference_update(code for code in map(encode_id, removed) if code is not None)
+        self.ids[status] = array("I", sorted(codes))
+
+    async def sync(self, full: bool = False):
+        full = full or time.time() - self.last_full_sync > HOLDINGS_FULL_SYNC_INTERVAL
+        if full:
+            logger.info("Full holdings sync")
+            for status in STATUSES:
+                entry_ids = await _get_json(f"{PDB_API_URL}/holdings/{status.lower()}/entry_ids")
+                # sorting some 200k ids takes a while, keep it off the event loop
+                await asyncio.to_thread(self.replace, status, entry_ids)
+            self.last_full_sync = time.time()
+        else:
+            logger.info("Incremental holdings sync")
+            weekly_url = os.environ.get("PDB_WEEKLY_STATUS_URL", PDB_WEEKLY_STATUS_URL)
+            added = await _get_lines(f"{weekly_url}/added.pdb")
+            obsolete = await _get_lines(f"{weekly_url}/obsolete.pdb")
+            await asyncio.to_thread(self.update, CURRENT, added=added, removed=obsolete)
+            await asyncio.to_thread(self.update, REMOVED, added=obsolete, removed=added)
+            unreleased = await _get_json(f"{PDB_API_URL}/holdings/unreleased/entry_ids")
+            await asyncio.to_thread(self.replace, UNRELEASED, unreleased)
+        self.last_sync = time.time()
+        await asyncio.to_thread(self.save)
+
+    async def ensure_fresh(self):
+        """Sync before answering when empty, refresh in the background when stale."""
+        interval = float(os.environ.get("PDB_HOLDINGS_REFRESH_INTERVAL", HOLDINGS_REFRESH_INTERVAL))
+        if self._sync_task is None or self._sync_task.done():
+            if not self.loaded or time.time() - self.last_sync > interval:
+                self._sync_task = asyncio.ensure_future(self.sync())
+                self._sync_task.add_done_callback(_log_failure)
+        if not self.loaded:
+            await asyncio.shield(self._sync_task)
+
+
+def _log_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Holdings sync failed: {task.exception()}")
+
+
+async def _get_text(url: str) -> str:
+    status, body = await request("GET", url)
+    if status != 200:
+        raise UpstreamError(f"GET {url} returned HTTP {status}")
+    return body
+
+
+async def _get_json(url: str):
+    return json.loads(await _get_text(url))
+
+
+async def _get_lines(url: str) -> List[str]:
+    text = await _get_text(url)
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+holdings = HoldingsMirror(os.environ.get("PDB_HOLDINGS_PATH", "cache/holdings"))
@@ -0,0 +1,82 @@
+import re
+import json
+from typing import Any, Dict, List, Optional
+
+_INDEX = re.compile(r"\[(\*|\d+)\]")
+
+
+def _split_path(field: str) -> List[str]:
+    field = _INDEX.sub("", field.strip())
+    if field.startswith("$"):
+        field = field[1:]
+    return [name for name in field.split(".") if name]
+
+
+def _path_tree(fields: List[str]) -> Dict[str, dict]:
+    """Turn dotted paths into a nested dict, an empty dict selects the whole value.
+
+    Paths may be written JSONPath style (`$.polymer_entities[*].rcsb_id`); list
+    indices are dropped because lists are traversed implicitly. `*` matches
+    every key of an object.
+    """
+    tree: Dict[str, dict] = {}
+    for field in fields:
+        node = tree
+        names = _split_path(field)
+        for i, name in enumerate(names):
+            if name in node and not node[name]:
+                # a shorter path already selects the whole value
+                break
+            node = node.setdefault(name, {})
+            if i == len(names) - 1:
+                node.clear()
+    return tree
+
+
+def _merge(a: Dict[str, dict], b: Dict[str, dict]) -> Dict[str, dict]:
+    if not a or not b:
+        return {}
+    merged = dict(a)
+    for name, sub in b.items():
+        merged[name] = _merge(merged[name], sub) if name in merged else sub
+    return merged
+
+
+def _pick(data: Any, tree: Dict[str, dict]) -> Any:
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [_pick(item, tree) for item in data]
+    if isinstance(data, dict):
+        picked = {}
+        for name, value in data.items():
+            subtrees = [tree[key] for key in (name, "*") if key in tree]
+            if subtrees:
+                picked[name] = _pick(value, _merge(*subtrees) if len(subtrees) == 2 else subtrees[0])
+        return picked
+    return data
+
+
+def project(data: Any, fields: Optional[List[str]] = None) -> Any:
+    """Keep only the dotted `fields` of `data`, preserving its nesting."""
+    if not fields:
+        return data
+    return _pick(data, _path_tree(fields))
+
+
+def drop_empty(data: Any) -> Any:
+    """Recursively remove nulls, empty strings and empty containers."""
+    if isinstance(data, dict):
+        data = {key: drop_empty(value) for key, value in data.items()}
+        return {key: value for key, value in data.items() if value not in (None, "", [], {})}
+    if isinstance(data, list):
+        data = [drop_empty(item) for item in data]
+        return [item for item in data if item not in (None, "", [], {})]
+    return data
+
+
+def serialize(data: Any, fields: Optional[List[str]] = None, compact: bool = False) -> str:
+    data = project(data, fields)
+    if compact:
+        return json.dumps(drop_empty(data), separators=(",", ":"))
+    return json.dumps(data, indent=2)
@@ -0,0 +1,174 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from protein_data_bank_mcp.rest_api.constants import (
+    RATE_LIMIT,
+    RATE_BURST,
+    MAX_RETRIES,
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    BREAKER_THRESHOLD,
+    BREAKER_RESET,
+)
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+class UpstreamError(Exception):
+    """The upstream kept failing after all retries."""
+
+
+class CircuitOpenError(UpstreamError):
+    """The upstream is marked unhealthy and requests fail fast."""
+
+
+class TokenBucket:
+    """Token bucket whose rate adapts to the upstream.
+
+    The rate is halved on a 429 and grows back additively on success, up to
+    the configured ceiling.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def throttle(self):
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """Open after `threshold` consecutive failures, allow a trial call after `reset_timeout`."""
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            # half open, calls go through again and one more failure reopens it
+            return False
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+class HostLimiter:
+    def __init__(self, host: str):
+        self.host = host
+        self.bucket = TokenBucket(
+            float(os.environ.get("PDB_RATE_LIMIT", RATE_LIMIT)),
+            int(os.environ.get("PDB_RATE_BURST", RATE_BURST)),
+        )
+        self.breaker = CircuitBreaker(
+            int(os.environ.get("PDB_BREAKER_THRESHOLD", BREAKER_THRESHOLD)),
+            float(os.environ.get("PDB_BREAKER_RESET", BREAKER_RESET)),
+        )
+        self.max_retries = int(os.environ.get("PDB_MAX_RETRIES", MAX_RETRIES))
+        self.backoff_base = float(os.environ.get("PDB_BACKOFF_BASE", BACKOFF_BASE))
+        self.backoff_max = float(os.environ.get("PDB_BACKOFF_MAX", BACKOFF_MAX))
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(self, send: Callable[[], Awaitable[Tuple[int, Mapping[str, str], Any]]]) -> Tuple[int, Any]:
+        """Run `send` under the rate limit, retrying throttled, failed and 5xx responses."""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if self.breaker.open:
+                raise CircuitOpenError(f"{self.host} is unavailable, not retrying until the circuit closes")
+            await self.bucket.acquire()
+            delay = self.backoff(attempt)
+            try:
+                status, headers, body = await send()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure()
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if not _is_retryable(status):
+                    self.breaker.record_success()
+                    self.bucket.recover()
+                    return status, body
+                if status == 429:
+                    self.bucket.throttle()
+                else:
+                    self.breaker.record_failure()
+                # the server knows when it will take requests again, backoff_max only bounds our own guess
+                wait = retry_after(headers)
+                delay = delay if wait is None else wait
+                error = f"HTTP {status}"
+
+            if attempt < self.max_retries:
+                logger.warning(f"{self.host} request failed ({error}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        raise UpstreamError(f"{self.host} request failed after {self.max_retries + 1} attempts: {error}")
+
+
+_limiters: Dict[str, HostLimiter] = {}
+
+
+def limiter_for(url: str) -> HostLimiter:
+    host = urlparse(url).netloc
+    if host not in _limiters:
+        _limiters[host] = HostLimiter(host)
+    return _limiters[host]
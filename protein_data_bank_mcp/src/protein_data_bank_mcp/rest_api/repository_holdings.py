@@ -1,51 +1,133 @@
-from typing import List
+import logging
+from typing import List, Optional
 from mcp import types
-from protein_data_bank_mcp.rest_api.utils import fetch_data
-
-
-async def current_entry_ids() -> List[types.TextContent]:
-    api_suffix = "/holdings/current/entry_ids"
-    result = await fetch_data(api_suffix)
-    return result
-
-
-async def structure_status(entry_id: str) -> List[types.TextContent]:
+from protein_data_bank_mcp.rest_api.constants import HOLDINGS_PAGE_SIZE
+from protein_data_bank_mcp.rest_api.holdings_mirror import (
+    holdings,
+    CURRENT,
+    REMOVED,
+    UNRELEASED,
+)
+from protein_data_bank_mcp.rest_api.projection import serialize
+from protein_data_bank_mcp.rest_api.utils import fetch_data, fetch_json
+
+logger = logging.getLogger(__name__)
+
+
+async def _mirror_ready() -> bool:
+    try:
+        await holdings.ensure_fresh()
+    except Exception as e:
+        logger.warning(f"Holdings mirror unavailable, using the API: {e}")
+    return holdings.loaded
+
+
+async def _entry_ids(status: str, prefix: str, offset: int, limit: int, compact: bool) -> List[types.TextContent]:
+    if offset < 0:
+        raise ValueError(f"offset must not be negative, got {offset}")
+    if await _mirror_ready():
+        total = holdings.count(status, prefix)
+        entry_ids = holdings.page(status, prefix, offset, limit)
+    else:
+        all_ids = await fetch_json(f"/holdings/{status.lower()}/entry_ids")
+        matching = sorted(entry_id for entry_id in all_ids if entry_id.upper().startswith(prefix.upper()))
+        total = len(matching)
+        entry_ids = matching[max(offset, 0):max(offset, 0) + max(limit, 0)]
+
+    next_offset = offset + len(entry_ids)
+    page = {
+        "status": status,
+        "prefix": prefix,
+        "total": total,
+        "offset": offset,
+        "entry_ids": entry_ids,
+        "next_offset": next_offset if next_offset < total else None,
+    }
+    return types.TextContent(type="text", text=serialize(page, compact=compact))
+
+
+def _local_status(entry_id: str) -> Optional[dict]:
+    """The `/holdings/status/{entry_id}` record of a current entry, None when the API has to answer.
+
+    Removed and unreleased entries carry replacement ids and processing codes the
+    mirror does not keep, so only current entries are answered locally.
+    """
+    if holdings.status(entry_id) != CURRENT:
+        return None
+    entry_id = entry_id.upper()
+    return {
+        "rcsb_id": entry_id,
+        "rcsb_repository_holdings_combined": {"status": CURRENT, "status_code": "REL"},
+        "rcsb_repository_holdings_combined_entry_container_identifiers": {"entry_id": entry_id},
+    }
+
+
+async def current_entry_ids(
+    prefix: str = "", offset: int = 0, limit: int = HOLDINGS_PAGE_SIZE, compact: bool = False
+) -> List[types.TextContent]:
+    """Page through current entry ids, optionally only those starting with `prefix`."""
+    return await _entry_ids(CURRENT, prefix, offset, limit, compact)
+
+
+async def structure_status(
+    entry_id: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    if await _mirror_ready() and (status := _local_status(entry_id)) is not None:
+        return types.TextContent(type="text", text=serialize(status, fields, compact))
     api_suffix = f"/holdings/status/{entry_id}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
 
 
-async def structure_list_status(entry_ids: List[str]) -> List[types.TextContent]:
-    api_suffix = f"/holdings/status?entry_ids={','.join(entry_ids)}"
-    result = await fetch_data(api_suffix)
+async def structure_list_status(
+    entry_ids: List[str], fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    statuses, unknown = [], list(entry_ids)
+    if await _mirror_ready():
+        local = {entry_id: _local_status(entry_id) for entry_id in entry_ids}
+        statuses = [status for status in local.values() if status is not None]
+        unknown = [entry_id for entry_id, status in local.items() if status is None]
+    if unknown:
+        api_suffix = f"/holdings/status?entry_ids={','.join(unknown)}"
+        upstream = await fetch_json(api_suffix)
+        statuses.extend(upstream if isinstance(upstream, list) else [upstream])
+    result = types.TextContent(type="text", text=serialize(statuses, fields, compact))
     return result
 
 
-async def removed_structure_description(entry_id: str) -> List[types.TextContent]:
+async def removed_structure_description(
+    entry_id: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
     api_suffix = f"/holdings/removed/{entry_id}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
 
 
-async def removed_entry_ids() -> List[types.TextContent]:
-    api_suffix = "/holdings/removed/entry_ids"
-    result = await fetch_data(api_suffix)
-    return result
+async def removed_entry_ids(
+    prefix: str = "", offset: int = 0, limit: int = HOLDINGS_PAGE_SIZE, compact: bool = False
+) -> List[types.TextContent]:
+    """Page through removed entry ids, optionally only those starting with `prefix`."""
+    return await _entry_ids(REMOVED, prefix, offset, limit, compact)
 
 
-async def unreleased_structures(ids: List[str]) -> List[types.TextContent]:
+async def unreleased_structures(
+    ids: List[str], fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
     api_suffix = f"/holdings/unreleased?ids={','.join(ids)}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
 
 
-async def unreleased_structure_processing(entry_id: str) -> List[types.TextContent]:
+async def unreleased_structure_processing(
+    entry_id: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
     api_suffix = f"/holdings/unreleased/{entry_id}"
-    result = await fetch_data(api_suffix)
+    result = await fetch_data(api_suffix, fields, compact)
     return result
 
 
-async def unreleased_entry_ids() -> List[types.TextContent]:
-    api_suffix = "/holdings/unreleased/entry_ids"
-    result = await fetch_data(api_suffix)
-    return result
+async def unreleased_entry_ids(
+    prefix: str = "", offset: int = 0, limit: int = HOLDINGS_PAGE_SIZE, compact: bool = False
+) -> List[types.TextContent]:
+    """Page through unreleased entry ids, optionally only those starting with `prefix`."""
+    return await _entry_ids(UNRELEASED, prefix, offset, limit, compact)
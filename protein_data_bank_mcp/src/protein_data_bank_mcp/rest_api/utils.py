@@ -1,20 +1,190 @@
+import os
 import json
+import asyncio
 import logging
 import aiohttp
-from typing import List
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional, Tuple
 from mcp import types
-from protein_data_bank_mcp.rest_api.constants import PDB_API_URL
+from protein_data_bank_mcp.rest_api.constants import (
+    PDB_API_URL,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_TOTAL_TIMEOUT,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+    CACHE_MAX_ENTRIES,
+    BATCH_CONCURRENCY,
+)
+from protein_data_bank_mcp.rest_api.cache import ResponseCache
+from protein_data_bank_mcp.rest_api.single_flight import SingleFlight
+from protein_data_bank_mcp.rest_api.projection import project, serialize
+from protein_data_bank_mcp.rest_api.rate_limit import limiter_for
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+_session: Optional[aiohttp.ClientSession] = None
+_session_users = 0
+# closed with the session, e.g. the structure store's parse pool
+_shutdown_hooks: List[Callable[[], None]] = []
 
-async def fetch_data(api_suffix: str) -> List[types.TextContent]:
+response_cache = ResponseCache(
+    os.environ.get("PDB_CACHE_PATH", "cache/responses.sqlite") or None,
+    max_entries=int(os.environ.get("PDB_CACHE_MAX_ENTRIES", CACHE_MAX_ENTRIES)),
+)
+in_flight = SingleFlight()
+
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=int(os.environ.get("PDB_HTTP_LIMIT", HTTP_LIMIT)),
+        limit_per_host=int(os.environ.get("PDB_HTTP_LIMIT_PER_HOST", HTTP_LIMIT_PER_HOST)),
+        keepalive_timeout=float(os.environ.get("PDB_HTTP_KEEPALIVE_TIMEOUT", HTTP_KEEPALIVE_TIMEOUT)),
+        ttl_dns_cache=300,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=float(os.environ.get("PDB_HTTP_TOTAL_TIMEOUT", HTTP_TOTAL_TIMEOUT)),
+        connect=float(os.environ.get("PDB_HTTP_CONNECT_TIMEOUT", HTTP_CONNECT_TIMEOUT)),
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared pooled session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def on_shutdown(hook: Callable[[], None]):
+    """Run `hook` when the last connection leaves, next to closing the HTTP session."""
+    _shutdown_hooks.append(hook)
+
+
+@asynccontextmanager
+async def http_lifespan(server):
+    """FastMCP lifespan owning the shared HTTP session.
+
+    With the SSE transport the lifespan is entered once per client
+    connection, so the session is reference counted and only closed when the
+    last connection goes away.
+    """
+    global _session_users
+    _session_users += 1
+    get_session()
+    try:
+        yield {}
+    finally:
+        _session_users -= 1
+        if _session_users == 0:
+            await close_session()
+            for hook in _shutdown_hooks:
+                await asyncio.to_thread(hook)
+
+
+async def request(method: str, url: str, binary: bool = False, **kwargs) -> Tuple[int, str | bytes]:
+    """Send a request through the per-host rate limiter, returning the status and body.
+
+    The body is text, or bytes with `binary`. Throttled, failed and 5xx
+    responses are retried, `UpstreamError` is raised once the retries are
+    exhausted or the host's circuit is open.
+    """
+    async def send():
+        async with get_session().request(method, url, **kwargs) as response:
+            body = await response.read() if binary else await response.text()
+            return response.status, response.headers, body
+
+    return await limiter_for(url).call(send)
+
+
+def _parse(status: int, body: str):
+    try:
+        return json.loads(body)
+    except ValueError:
+        return {"status": status, "message": body}
+
+
+async def _request(api_suffix: str):
     logger.info(f"Fetching data from {api_suffix}")
     url = f"{PDB_API_URL}{api_suffix}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            response_json = await response.json()
+    status, body = await request("GET", url)
+    response_json = _parse(status, body)
+    if status == 200:
+        response_cache.set(api_suffix, response_json)
+    return response_json
+
+
+async def _post(cache_key: str, url: str, payload: dict):
+    logger.info(f"Posting query to {url}")
+    status, body = await request("POST", url, json=payload)
+    response_json = _parse(status, body)
+    if status == 200 and not response_json.get("errors"):
+        response_cache.set(cache_key, response_json)
+    return response_json
+
+
+async def post_json(url: str, payload: dict):
+    """POST a JSON payload, sharing the response cache and in-flight calls with GET requests."""
+    cache_key = f"POST {url} {json.dumps(payload, sort_keys=True, separators=(',', ':'))}"
+    response_json = response_cache.get(cache_key)
+    if response_json is None:
+        response_json = await in_flight.do(cache_key, lambda: _post(cache_key, url, payload))
+    return response_json
+
+
+async def fetch_json(api_suffix: str):
+    response_json = response_cache.get(api_suffix)
+    if response_json is None:
+        response_json = await in_flight.do(api_suffix, lambda: _request(api_suffix))
+    return response_json
+
+
+async def fetch_data(
+    api_suffix: str, fields: Optional[List[str]] = None, compact: bool = False
+) -> List[types.TextContent]:
+    """Fetch an endpoint, keeping only the dotted `fields` if given.
+
+    With `compact` the JSON is written without whitespace and nulls.
+    """
+    response_json = await fetch_json(api_suffix)
+    result = types.TextContent(
+        type="text", text=serialize(response_json, fields, compact))
+    return result
+
+
+async def fetch_many(
+    ids: List[str],
+    to_suffix: Callable[[str], str],
+    fields: Optional[List[str]] = None,
+    compact: bool = False,
+) -> List[types.TextContent]:
+    """Fetch one endpoint for many ids concurrently, keyed by id.
+
+    A failing id is reported as an `error` entry instead of failing the batch.
+    `fields` are projected on each result.
+    """
+    semaphore = asyncio.Semaphore(int(os.environ.get("PDB_BATCH_CONCURRENCY", BATCH_CONCURRENCY)))
+
+    async def fetch_one(id_: str):
+        try:
+            api_suffix = to_suffix(id_)
+            async with semaphore:
+                return project(await fetch_json(api_suffix), fields)
+        except Exception as e:
+            logger.warning(f"Failed to fetch {id_}: {e}")
+            return {"error": str(e) or type(e).__name__}
+
+    unique_ids = list(dict.fromkeys(ids))
+    results = await asyncio.gather(*[fetch_one(id_) for id_ in unique_ids])
     result = types.TextContent(
-        type="text", text=json.dumps(response_json, indent=2))
+        type="text", text=serialize(dict(zip(unique_ids, results)), compact=compact))
     return result
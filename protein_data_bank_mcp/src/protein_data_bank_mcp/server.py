@@ -25,8 +25,33 @@ from protein_data_bank_mcp.rest_api.groups import (
     pdb_cluster_data_aggregation,
     pdb_cluster_data_aggregation_method,
 )
+from protein_data_bank_mcp.rest_api.batch import (
+    batch_structure,
+    batch_polymer_entity,
+    batch_polymer_entity_instance,
+    batch_uniprot_annotations,
+)
+from protein_data_bank_mcp.rest_api.graphql import entries_summary
+from protein_data_bank_mcp.rest_api.repository_holdings import (
+    current_entry_ids,
+    removed_entry_ids,
+    unreleased_entry_ids,
+    structure_status,
+    structure_list_status,
+    removed_structure_description,
+    unreleased_structures,
+    unreleased_structure_processing,
+)
 from protein_data_bank_mcp.rest_api.interface import pairwise_polymeric_interface_description
-from protein_data_bank_mcp.pdb_store.storage import get_residue_chains
+from protein_data_bank_mcp.rest_api.utils import http_lifespan
+from protein_data_bank_mcp.pdb_store.storage import (
+    get_residue_chains,
+    prefetch_structures,
+    search_similar_chains,
+    chain_contacts,
+    binding_site,
+    chain_geometry,
+)
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -34,7 +59,8 @@ logging.basicConfig(level=logging.INFO)
 load_dotenv(find_dotenv())
 
 mcp_server = FastMCP(os.environ["PDB_MCP_HOST"],
-                     port=os.environ["PDB_MCP_PORT"])
+                     port=os.environ["PDB_MCP_PORT"],
+                     lifespan=http_lifespan)
 
 tools = [
     structural_assembly_description,
@@ -53,7 +79,25 @@ tools = [
     pdb_cluster_data_aggregation,
     pdb_cluster_data_aggregation_method,
     pairwise_polymeric_interface_description,
+    batch_structure,
+    batch_polymer_entity,
+    batch_polymer_entity_instance,
+    batch_uniprot_annotations,
+    entries_summary,
+    current_entry_ids,
+    removed_entry_ids,
+    unreleased_entry_ids,
+    structure_status,
+    structure_list_status,
+    removed_structure_description,
+    unreleased_structures,
+    unreleased_structure_processing,
     get_residue_chains,
+    prefetch_structures,
+    search_similar_chains,
+    chain_contacts,
+    binding_site,
+    chain_geometry,
 ]
 
 for tool in tools:
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from protein_data_bank_mcp.pdb_store.coordinates import (
+    CellGrid,
+    CoordinateBundle,
+    binding_site,
+    build_bundle,
+    chain_contacts,
+    chain_geometry,
+)
+
+PDB_TEXT = """\
+ATOM      1  CA  MET A   1       0.000   0.000   0.000  1.00  0.00           C
+ATOM      2  CA  LYS A   2       3.800   0.000   0.000  1.00  0.00           C
+ATOM      3  CA  GLY B   1       0.000   3.000   0.000  1.00  0.00           C
+ATOM      4  CA  ALA B   2      20.000   0.000   0.000  1.00  0.00           C
+HETATM    5 FE   HEM A 101       3.800   4.000   0.000  1.00  0.00          FE
+HETATM    6  O   HOH A 201       3.800   1.000   0.000  1.00  0.00           O
+END
+"""
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    structure = tmp_path / "pdb0tny.ent"
+    structure.write_text(PDB_TEXT)
+    return CoordinateBundle(build_bundle(structure, tmp_path / "0tny.coords"))
+
+
+def test_bundle_is_memory_mapped(bundle: CoordinateBundle):
+    assert isinstance(bundle.coords, np.memmap)
+    assert bundle.coords.dtype == np.float32
+    assert bundle.chains == ["A", "B"]
+    assert len(bundle) == 6
+
+
+def test_chain_contacts(bundle: CoordinateBundle):
+    contacts = chain_contacts(bundle, "A", "B", cutoff=4.0)
+    assert [(c["a"]["residue"], c["b"]["residue"]) for c in contacts] == [("MET", "GLY"), ("HEM", "GLY")]
+    assert contacts[0]["distance"] == 3.0
+    with pytest.raises(ValueError):
+        chain_contacts(bundle, "A", "Z")
+
+
+def test_binding_site_skips_water(bundle: CoordinateBundle):
+    site = binding_site(bundle, "hem", cutoff=5.0)
+    assert [row["residue"] for row in site] == ["GLY", "LYS"]
+    assert site[0]["ligand"]["number"] == "101"
+
+
+def test_chain_geometry(bundle: CoordinateBundle):
+    geometry = chain_geometry(bundle)
+    assert geometry["B"]["atoms"] == 2
+    assert geometry["B"]["centroid"] == [10.0, 1.5, 0.0]
+    assert geometry["B"]["radius_of_gyration"] == pytest.approx(np.hypot(10, 1.5), abs=1e-3)
+
+
+def test_cell_grid_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 30, size=(300, 3)).astype(np.float32)
+    queries = rng.uniform(-5, 35, size=(50, 3)).astype(np.float32)
+    i, j, _ = CellGrid(points, 4.0).pairs_within(queries, 4.0)
+    distances = np.linalg.norm(queries[:, None] - points[None], axis=2)
+    expected = set(zip(*np.nonzero(distances <= 4.0)))
+    assert set(zip(i.tolist(), j.tolist())) == expected
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from protein_data_bank_mcp.pdb_store.kmer_index import KmerIndex, kmers
+from protein_data_bank_mcp.pdb_store.storage import PDBStore
+
+GLOBIN = "VLSPADKTNVKAAWGKVGAHAGEYGAEALERMFLSFPTTKTYFPHF"
+LYSOZYME = (
+    "KVFGRCELAAAMKRHGLDNYRGYSLGNWVCAAKFESNFNTQATNRNTDGSTDYGILQINSRWWCNDGRTPGSRNLCNIPCSALLSSDITASVNCAKKIVSDGNGMNAWVAWRN"
+    "RCKGTDVQAWIRGCRL"
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = KmerIndex(tmp_path / "kmers.sqlite")
+    index.add("1abc", {"A": GLOBIN, "B": LYSOZYME})
+    index.add("2xyz", {"A": GLOBIN[5:] + "XXXX"})
+    yield index
+    index.close()
+
+
+def test_kmers_skip_non_standard_residues():
+    assert len(kmers("MKXAC", 3)) == 0
+    assert len(kmers("MKAC", 3)) == 2
+
+
+def test_search_ranks_by_shared_kmers(index: KmerIndex):
+    hits = index.search(GLOBIN[:30])
+    assert [(hit["entry_id"], hit["chain_id"]) for hit in hits] == [("1ABC", "A"), ("2XYZ", "A")]
+    assert hits[0]["query_coverage"] == 1.0
+
+
+def test_search_with_alignment(index: KmerIndex):
+    mutated = GLOBIN[:10] + "W" + GLOBIN[11:]
+    hits = index.search(mutated, limit=1, align=True)
+    assert hits[0]["entry_id"] == "1ABC"
+    assert 0.9 < hits[0]["identity"] < 1.0
+
+
+def test_add_replaces_entry(index: KmerIndex, tmp_path):
+    index.add("1abc", {"A": LYSOZYME})
+    assert index.search(GLOBIN)[0]["entry_id"] == "2XYZ"
+    assert len(index) == 2
+    index.remove("2xyz")
+    assert index.search(GLOBIN) == []
+
+
+def test_store_indexes_entries_before_search(tmp_path):
+    atoms = "".join(
+        f"ATOM  {i + 1:5d}  CA  {name} A{i + 1:4d}       0.000   0.000   0.000  1.00  0.00           C\n"
+        for i, name in enumerate(["MET", "LYS", "THR", "ALA", "TYR"])
+    )
+    (tmp_path / "pdb1tst.ent").write_text(atoms + "END\n")
+    store = PDBStore(tmp_path, kmer_size=3)
+    try:
+        hits = asyncio.run(store.search_similar_chains("MKTAY"))
+    finally:
+        store.close()
+    assert hits[0]["entry_id"] == "1TST"
+    assert store.kmer_index.entries() == {"1tst"}
+
+
+def test_store_backfills_a_bounded_number_of_entries_per_search(tmp_path):
+    atoms = "".join(
+        f"ATOM  {i + 1:5d}  CA  {name} A{i + 1:4d}       0.000   0.000   0.000  1.00  0.00           C\n"
+        for i, name in enumerate(["MET", "LYS", "THR", "ALA", "TYR"])
+    )
+    for entry_id in ["1tst", "2tst", "3tst"]:
+        (tmp_path / f"pdb{entry_id}.ent").write_text(atoms + "END\n")
+    store = PDBStore(tmp_path, kmer_size=3, kmer_backfill=2)
+    try:
+        asyncio.run(store.search_similar_chains("MKTAY"))
+        assert store.kmer_index.entries() == {"1tst", "2tst"}
+        hits = asyncio.run(store.search_similar_chains("MKTAY"))
+    finally:
+        store.close()
+    assert store.kmer_index.entries() == {"1tst", "2tst", "3tst"}
+    assert len(hits) == 3
+
+
+def test_chain_removal_uses_an_index(index: KmerIndex):
+    plan = index._db.execute("EXPLAIN QUERY PLAN DELETE FROM postings WHERE chain = ?", (1,)).fetchall()
+    assert "postings_chain" in " ".join(str(row) for row in plan)
@@ -1,5 +1,11 @@
+import os
+import sys
+import asyncio
+import threading
+
 import pytest
 
+from src.protein_data_bank_mcp.pdb_store import storage
 from src.protein_data_bank_mcp.pdb_store.storage import PDBStore
 
 
@@ -18,3 +24,164 @@ def test_get_residues(pdb_store: PDBStore):
     entry_id = "1fat"
     residues = pdb_store.get_residue_chains(entry_id)
     assert len(residues) == 4
+
+
+TINY_PDB = """\
+ATOM      1  CA  MET A   1      11.104   6.134  -6.504  1.00  0.00           C
+ATOM      2  CA  LYS A   2      11.639   6.071  -5.147  1.00  0.00           C
+TER
+ATOM      3  CA  GLY B   1      12.104   7.134  -6.504  1.00  0.00           C
+END
+"""
+
+
+@pytest.fixture
+def tiny_store(tmp_path):
+    (tmp_path / "pdb0tny.ent").write_text(TINY_PDB)
+    return PDBStore(tmp_path, cache_size=1)
+
+
+def test_residue_chains_are_cached(tiny_store: PDBStore, monkeypatch):
+    assert tiny_store.get_residue_chains("0TNY") == {"A": "MK", "B": "G"}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("structure should not be parsed again")
+
+    monkeypatch.setattr(storage, "extract_chains", fail)
+    assert tiny_store.get_residue_chains("0tny") == {"A": "MK", "B": "G"}
+
+
+def test_sequence_index_survives_restart(tiny_store: PDBStore, tmp_path, monkeypatch):
+    tiny_store.get_residue_chains("0tny")
+    assert tiny_store.sequence_index_path("0tny").is_file()
+
+    restarted = PDBStore(tmp_path)
+    monkeypatch.setattr(storage, "extract_chains", None)
+    assert restarted.get_residue_chains("0tny") == {"A": "MK", "B": "G"}
+
+
+def test_async_residue_chains_share_one_load(tiny_store: PDBStore):
+    async def run():
+        return await asyncio.gather(*[tiny_store.get_residue_chains_async("0TNY") for _ in range(3)])
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        tiny_store.close()
+    assert results[0] == {"A": "MK", "B": "G"}
+    assert all(result is results[0] for result in results)
+
+
+def test_seqres_index_is_separate(tiny_store: PDBStore):
+    (tiny_store.folder / "pdb0tny.ent").write_text("SEQRES   1 A    3  MET LYS ALA\n" + TINY_PDB)
+    assert tiny_store.get_residue_chains("0tny", "seqres") == {"A": "MKA"}
+    assert tiny_store.get_residue_chains("0tny") == {"A": "MK", "B": "G"}
+    assert tiny_store.sequence_index_path("0tny", "seqres").is_file()
+
+
+def test_coordinates_are_built_once(tiny_store: PDBStore):
+    async def run():
+        return await tiny_store.get_coordinates_async("0tny")
+
+    try:
+        bundle = asyncio.run(run())
+    finally:
+        tiny_store.close()
+    assert bundle.chains == ["A", "B"]
+    built_at = (tiny_store.coordinates_path("0tny") / "meta.json").stat().st_mtime_ns
+    tiny_store.get_coordinates("0tny")
+    assert (tiny_store.coordinates_path("0tny") / "meta.json").stat().st_mtime_ns == built_at
+
+
+def test_quota_evicts_least_recently_accessed(tmp_path):
+    store = PDBStore(tmp_path)
+    for i, entry_id in enumerate(["1aaa", "2bbb", "3ccc"]):
+        path = store.mmcif_path(entry_id)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 + i, 1000))
+    (tmp_path / "pdb1aaa.chains.json").write_text("{}")
+    os.utime(tmp_path / "pdb1aaa.chains.json", (1000, 1000))
+    store.find_structure("1aaa")
+
+    store.max_bytes = 250
+    assert store.enforce_quota(keep=["3ccc"]) == ["2bbb"]
+    assert store.find_structure("2bbb") is None
+    assert store.find_structure("1aaa") is not None
+    assert store.find_structure("3ccc") is not None
+
+
+def test_quota_keeps_a_running_total(tmp_path, monkeypatch):
+    store = PDBStore(tmp_path, max_bytes=250)
+    store.mmcif_path("1aaa").write_bytes(b"x" * 100)
+    assert store.enforce_quota(keep=["1aaa"]) == []
+
+    scans = []
+    disk_usage = store.disk_usage
+    monkeypatch.setattr(store, "disk_usage", lambda: scans.append(1) or disk_usage())
+    store.mmcif_path("2bbb").write_bytes(b"x" * 100)
+    assert store.enforce_quota(keep=["2bbb"]) == []
+    assert scans == []
+
+    store.mmcif_path("3ccc").write_bytes(b"x" * 100)
+    assert store.enforce_quota(keep=["3ccc"]) == ["1aaa"]
+    assert scans == [1]
+    store.mmcif_path("4ddd").write_bytes(b"x" * 10)
+    assert store.enforce_quota(keep=["4ddd"]) == []
+    assert scans == [1]
+
+
+def test_evict_from_a_thread_while_caching(tmp_path):
+    store = PDBStore(tmp_path, cache_size=5000)
+    for i in range(5000):
+        store._remember_chains(f"{i:04d}", "atom", {"A": "GG"})
+    # switch threads often, so eviction scans the cache while it is being filled
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    errors = []
+
+    def evict():
+        try:
+            for _ in range(20):
+                store.evict("zzzz")
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=evict)
+    try:
+        thread.start()
+        i = 0
+        while thread.is_alive():
+            store._remember_chains(f"n{i:06d}", "atom", {"A": "GG"})
+            i += 1
+        thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_prefetch_downloads_each_entry_once(tmp_path, monkeypatch):
+    store = PDBStore(tmp_path)
+    calls = []
+
+    async def fake_request(method, url, binary=False, **kwargs):
+        calls.append(url)
+        await asyncio.sleep(0)
+        if "9XXX" in url:
+            return 404, b""
+        return 200, TINY_PDB.encode()
+
+    monkeypatch.setattr(storage, "request", fake_request)
+    results = asyncio.run(store.prefetch(["1abc", "1ABC", "9xxx"], concurrency=2))
+    assert results["1abc"] == "ok"
+    assert "404" in results["9xxx"]
+    assert len(calls) == 2
+    assert store.mmcif_path("1abc").read_bytes() == TINY_PDB.encode()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("cutoff", [0.0, -1.0])
+def test_contact_tools_reject_non_positive_cutoff(cutoff):
+    with pytest.raises(ValueError):
+        asyncio.run(storage.chain_contacts("0tny", "A", "B", cutoff))
+    with pytest.raises(ValueError):
+        asyncio.run(storage.binding_site("0tny", "HEM", cutoff))
@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+
+from protein_data_bank_mcp.pdb_store.sequence import cif_rows, extract_chains
+
+PDB_TEXT = """\
+SEQRES   1 A    3  MET LYS ALA
+SEQRES   1 B    1  GLY
+ATOM      1  CA  MET A   1      11.104   6.134  -6.504  1.00  0.00           C
+ATOM      2  CB  MET A   1      11.104   6.134  -6.504  1.00  0.00           C
+ATOM      3  CA  LYS A   2      11.639   6.071  -5.147  1.00  0.00           C
+HETATM    4  O   HOH A 101      12.104   7.134  -6.504  1.00  0.00           O
+ATOM      5  CA  GLY B   1      12.104   7.134  -6.504  1.00  0.00           C
+ENDMDL
+ATOM      6  CA  ALA C   1      12.104   7.134  -6.504  1.00  0.00           C
+END
+"""
+
+CIF_TEXT = """\
+data_0TNY
+#
+_entity_poly.entity_id                      1
+_entity_poly.pdbx_seq_one_letter_code_can
+;MKA
+GG
+;
+_entity_poly.pdbx_strand_id                 A,B
+#
+loop_
+_atom_site.group_PDB
+_atom_site.label_comp_id
+_atom_site.auth_asym_id
+_atom_site.auth_seq_id
+_atom_site.pdbx_PDB_ins_code
+_atom_site.pdbx_PDB_model_num
+ATOM MET A 1 ? 1
+ATOM MET A 1 ? 1
+ATOM LYS A 2 ? 1
+ATOM GLY B 1 ? 1
+ATOM ALA B 1 ? 2
+#
+"""
+
+
+def test_pdb_atom_and_seqres(tmp_path):
+    path = tmp_path / "pdb0tny.ent"
+    path.write_text(PDB_TEXT)
+    assert extract_chains(path) == {"A": "MKX", "B": "G"}
+    assert extract_chains(path, "seqres") == {"A": "MKA", "B": "G"}
+
+
+def test_mmcif_gzip(tmp_path):
+    path = tmp_path / "0tny.cif.gz"
+    path.write_bytes(gzip.compress(CIF_TEXT.encode()))
+    assert extract_chains(path) == {"A": "MK", "B": "G"}
+    assert extract_chains(path, "seqres") == {"A": "MKAGG", "B": "MKAGG"}
+
+
+def test_cif_loop_rows():
+    rows = list(cif_rows(CIF_TEXT.splitlines(keepends=True), "atom_site"))
+    assert len(rows) == 5
+    assert rows[2]["label_comp_id"] == "LYS"
+
+
+def test_unknown_source(tmp_path):
+    path = tmp_path / "pdb0tny.ent"
+    path.write_text(PDB_TEXT)
+    with pytest.raises(ValueError):
+        extract_chains(path, "fasta")
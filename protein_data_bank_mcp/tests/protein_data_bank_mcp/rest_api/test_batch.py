@@ -0,0 +1,26 @@
+import pytest
+
+from protein_data_bank_mcp.rest_api import batch
+
+
+@pytest.mark.parametrize(
+    "identifier, separator, expected",
+    [
+        ("4HHB_1", "_", ("4HHB", "1")),
+        ("pdb_00004hhb_1", "_", ("pdb_00004hhb", "1")),
+        ("4HHB.A", ".", ("4HHB", "A")),
+        ("pdb_00004hhb.A", ".", ("pdb_00004hhb", "A")),
+    ],
+)
+def test_split_id(identifier, separator, expected):
+    assert batch._split_id(identifier, separator) == expected
+
+
+@pytest.mark.parametrize("identifier", ["4HHB", "4HHB_", "_1"])
+def test_split_id_rejects_incomplete_ids(identifier):
+    with pytest.raises(ValueError):
+        batch._split_id(identifier, "_")
+
+
+def test_entity_suffix_keeps_extended_entry_ids():
+    assert batch._entity_suffix("polymer_entity")("pdb_00004hhb_1") == "/core/polymer_entity/pdb_00004hhb/1"
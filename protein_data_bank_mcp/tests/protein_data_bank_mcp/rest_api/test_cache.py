@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from protein_data_bank_mcp.rest_api.cache import ResponseCache, ttl_for
+from protein_data_bank_mcp.rest_api.constants import CACHE_TTLS
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / "responses.sqlite", max_entries=2)
+
+
+def test_ttl_uses_longest_prefix():
+    assert ttl_for("/schema/entry") == CACHE_TTLS["/schema/"]
+    assert ttl_for("/holdings/removed/1abc") == CACHE_TTLS["/holdings/removed/"]
+    assert ttl_for("/holdings/status/1abc") == CACHE_TTLS["/holdings/"]
+
+
+def test_memory_hit_and_miss(cache: ResponseCache):
+    assert cache.get("/core/entry/4hhb") is None
+    cache.set("/core/entry/4hhb", {"id": "4HHB"})
+    assert cache.get("/core/entry/4hhb") == {"id": "4HHB"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_falls_back_to_disk(cache: ResponseCache):
+    for entry_id in ["1abc", "2abc", "3abc"]:
+        cache.set(f"/core/entry/{entry_id}", {"id": entry_id})
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("/core/entry/1abc") == {"id": "1abc"}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_persists_across_instances(tmp_path):
+    ResponseCache(tmp_path / "responses.sqlite").set("/schema/entry", {"a": 1})
+    assert ResponseCache(tmp_path / "responses.sqlite").get("/schema/entry") == {"a": 1}
+
+
+def test_expired_entries_are_dropped(cache: ResponseCache):
+    cache.set("/holdings/status/1abc", {"status": "CURRENT"}, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("/holdings/status/1abc") is None
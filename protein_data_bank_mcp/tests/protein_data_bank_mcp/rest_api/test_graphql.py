@@ -0,0 +1,66 @@
+import json
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from protein_data_bank_mcp.rest_api import graphql, utils
+
+
+def test_build_entries_query_nests_fields():
+    query = graphql.build_entries_query(["struct.title", "polymer_entities.rcsb_id", "struct.pdbx_descriptor"])
+    assert query == (
+        "query ($ids: [String!]!) { entries(entry_ids: $ids) { "
+        "rcsb_id struct { title pdbx_descriptor } polymer_entities { rcsb_id } } }"
+    )
+
+
+def test_build_entries_query_rejects_invalid_fields():
+    with pytest.raises(ValueError):
+        graphql.build_entries_query(["struct { title }"])
+
+
+def test_entries_summary_against_local_server(monkeypatch):
+    received = []
+
+    async def handler(request):
+        payload = await request.json()
+        received.append(payload)
+        return web.json_response(
+            {"data": {"entries": [{"rcsb_id": "4HHB", "struct": {"title": "HEMOGLOBIN"}}, None]}}
+        )
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/graphql", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        host, port = runner.addresses[0]
+        monkeypatch.setenv("PDB_GRAPHQL_URL", f"http://{host}:{port}/graphql")
+        try:
+            first = await graphql.entries_summary(["4hhb", "0XXX"], ["struct.title"])
+            second = await graphql.entries_summary(["4hhb", "0XXX"], ["struct.title"])
+        finally:
+            await utils.close_session()
+            await runner.cleanup()
+        return first, second
+
+    monkeypatch.setattr(utils, "response_cache", utils.ResponseCache())
+    first, second = asyncio.run(run())
+
+    assert len(received) == 1
+    assert received[0]["variables"] == {"ids": ["4HHB", "0XXX"]}
+    result = json.loads(first.text)
+    assert result["entries"]["4HHB"]["struct"]["title"] == "HEMOGLOBIN"
+    assert result["missing"] == ["0XXX"]
+    assert second.text == first.text
+
+
+def test_entries_summary_returns_upstream_errors(monkeypatch):
+    async def post_json(url, payload):
+        return {"status": 400, "message": "Invalid entry ids"}
+
+    monkeypatch.setattr(graphql, "post_json", post_json)
+    result = json.loads(asyncio.run(graphql.entries_summary(["4hhb"])).text)
+    assert result == {"status": 400, "message": "Invalid entry ids"}
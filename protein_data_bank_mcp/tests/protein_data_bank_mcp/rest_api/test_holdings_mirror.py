@@ -0,0 +1,112 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+from protein_data_bank_mcp.rest_api import holdings_mirror, repository_holdings
+from protein_data_bank_mcp.rest_api.holdings_mirror import (
+    CURRENT,
+    REMOVED,
+    UNRELEASED,
+    HoldingsMirror,
+    decode_id,
+    encode_id,
+)
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = HoldingsMirror(tmp_path)
+    mirror.replace(CURRENT, ["4hhb", "1ABC", "1A00", "1AZZ", "9XYZ"])
+    mirror.replace(REMOVED, ["1OLD"])
+    return mirror
+
+
+def test_encode_round_trip_and_order():
+    assert decode_id(encode_id("4hhb")) == "4HHB"
+    assert encode_id("1A00") < encode_id("1AZZ") < encode_id("1B00")
+    assert encode_id("pdb_00004hhb") is None
+
+
+def test_status_and_membership(mirror: HoldingsMirror):
+    assert mirror.status("4HHB") == CURRENT
+    assert mirror.status("1old") == REMOVED
+    assert mirror.status("0000") is None
+    assert not mirror.contains(UNRELEASED, "4HHB")
+
+
+def test_prefix_pages(mirror: HoldingsMirror):
+    assert mirror.count(CURRENT, "1A") == 3
+    assert mirror.page(CURRENT, "1a", offset=1, limit=5) == ["1ABC", "1AZZ"]
+    assert mirror.page(CURRENT, limit=2) == ["1A00", "1ABC"]
+
+
+def test_save_and_load(mirror: HoldingsMirror, tmp_path):
+    mirror.last_full_sync = mirror.last_sync = 1.0
+    mirror.save()
+    loaded = HoldingsMirror(tmp_path)
+    assert loaded.loaded
+    assert loaded.page(CURRENT) == mirror.page(CURRENT)
+    assert loaded.status("1OLD") == REMOVED
+
+
+def test_incremental_sync_applies_weekly_lists(mirror: HoldingsMirror, monkeypatch):
+    async def get_lines(url):
+        return ["8new"] if url.endswith("added.pdb") else ["4hhb"]
+
+    async def get_json(url):
+        return ["9UNR"]
+
+    monkeypatch.setattr(holdings_mirror, "_get_lines", get_lines)
+    monkeypatch.setattr(holdings_mirror, "_get_json", get_json)
+    mirror.last_full_sync = holdings_mirror.time.time()
+    asyncio.run(mirror.sync())
+
+    assert mirror.status("8NEW") == CURRENT
+    assert mirror.status("4HHB") == REMOVED
+    assert mirror.status("9UNR") == UNRELEASED
+
+
+def test_full_sync_sorts_off_the_event_loop(mirror: HoldingsMirror, monkeypatch):
+    threads = []
+    replace = mirror.replace
+
+    def record(status, entry_ids):
+        threads.append(threading.current_thread())
+        replace(status, entry_ids)
+
+    async def get_json(url):
+        return ["2bbb", "1aaa"]
+
+    monkeypatch.setattr(mirror, "replace", record)
+    monkeypatch.setattr(holdings_mirror, "_get_json", get_json)
+    asyncio.run(mirror.sync(full=True))
+
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+    assert mirror.page(REMOVED) == ["1AAA", "2BBB"]
+
+
+def test_local_status_has_the_upstream_shape(mirror: HoldingsMirror, monkeypatch):
+    monkeypatch.setattr(repository_holdings, "holdings", mirror)
+    assert repository_holdings._local_status("4hhb") == {
+        "rcsb_id": "4HHB",
+        "rcsb_repository_holdings_combined": {"status": "CURRENT", "status_code": "REL"},
+        "rcsb_repository_holdings_combined_entry_container_identifiers": {"entry_id": "4HHB"},
+    }
+    assert repository_holdings._local_status("1old") is None
+    assert repository_holdings._local_status("0000") is None
+
+
+def test_entry_id_pages(mirror: HoldingsMirror, monkeypatch):
+    async def ready():
+        return True
+
+    monkeypatch.setattr(repository_holdings, "holdings", mirror)
+    monkeypatch.setattr(repository_holdings, "_mirror_ready", ready)
+    page = json.loads(asyncio.run(repository_holdings.current_entry_ids("1A", offset=1, limit=1)).text)
+    assert page["entry_ids"] == ["1ABC"]
+    assert page["next_offset"] == 2
+    with pytest.raises(ValueError):
+        asyncio.run(repository_holdings.current_entry_ids("1A", offset=-2, limit=1))
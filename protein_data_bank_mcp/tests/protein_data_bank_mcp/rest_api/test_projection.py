@@ -0,0 +1,38 @@
+import json
+
+from protein_data_bank_mcp.rest_api.projection import drop_empty, project, serialize
+
+ENTRY = {
+    "rcsb_id": "4HHB",
+    "struct": {"title": "HEMOGLOBIN", "pdbx_descriptor": None},
+    "polymer_entities": [
+        {"rcsb_id": "4HHB_1", "uniprots": [{"rcsb_id": "P69905", "name": "Hemoglobin subunit alpha"}]},
+        {"rcsb_id": "4HHB_2", "uniprots": []},
+    ],
+}
+
+
+def test_project_keeps_nesting_and_traverses_lists():
+    assert project(ENTRY, ["struct.title", "polymer_entities.uniprots.rcsb_id"]) == {
+        "struct": {"title": "HEMOGLOBIN"},
+        "polymer_entities": [{"uniprots": [{"rcsb_id": "P69905"}]}, {"uniprots": []}],
+    }
+
+
+def test_project_accepts_jsonpath_and_wildcards():
+    assert project(ENTRY, ["$.polymer_entities[*].rcsb_id"]) == {
+        "polymer_entities": [{"rcsb_id": "4HHB_1"}, {"rcsb_id": "4HHB_2"}]
+    }
+    assert project({"4HHB": ENTRY}, ["*.rcsb_id"]) == {"4HHB": {"rcsb_id": "4HHB"}}
+
+
+def test_shorter_path_selects_whole_value():
+    assert project(ENTRY, ["struct.title", "struct"]) == {"struct": ENTRY["struct"]}
+    assert project(ENTRY, ["struct", "struct.title"]) == {"struct": ENTRY["struct"]}
+
+
+def test_compact_drops_empty_values():
+    assert drop_empty({"a": None, "b": [], "c": {"d": ""}, "e": 0}) == {"e": 0}
+    text = serialize(ENTRY, ["polymer_entities.uniprots.rcsb_id"], compact=True)
+    assert text == '{"polymer_entities":[{"uniprots":[{"rcsb_id":"P69905"}]}]}'
+    assert json.loads(serialize(ENTRY)) == ENTRY
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from protein_data_bank_mcp.rest_api.rate_limit import (
+    CircuitOpenError,
+    HostLimiter,
+    UpstreamError,
+    retry_after,
+)
+
+
+@pytest.fixture
+def limiter():
+    limiter = HostLimiter("data.rcsb.org")
+    limiter.backoff_base = 0.001
+    limiter.max_retries = 2
+    return limiter
+
+
+def responses(*statuses, headers=None):
+    remaining = list(statuses)
+
+    async def send():
+        return remaining.pop(0), headers or {}, "{}"
+
+    return send
+
+
+def test_retries_until_success(limiter: HostLimiter):
+    status, body = asyncio.run(limiter.call(responses(503, 429, 200)))
+    assert status == 200
+    assert limiter.bucket.rate < limiter.bucket.max_rate
+
+
+def test_client_errors_are_not_retried(limiter: HostLimiter):
+    status, _ = asyncio.run(limiter.call(responses(404, 200)))
+    assert status == 404
+
+
+def test_gives_up_after_max_retries(limiter: HostLimiter):
+    with pytest.raises(UpstreamError):
+        asyncio.run(limiter.call(responses(500, 500, 500)))
+
+
+def test_circuit_opens_after_repeated_failures(limiter: HostLimiter):
+    limiter.breaker.threshold = 2
+    limiter.max_retries = 0
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            asyncio.run(limiter.call(responses(502)))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(limiter.call(responses(200)))
+
+
+def test_retry_after_header():
+    assert retry_after({"Retry-After": "3"}) == 3.0
+    assert retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert retry_after({}) is None
+
+
+def test_retry_after_is_followed_beyond_backoff_max(limiter: HostLimiter, monkeypatch):
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    limiter.backoff_max = 1.0
+    limiter.backoff_base = 10.0
+    status, _ = asyncio.run(limiter.call(responses(429, 200, headers={"Retry-After": "5"})))
+    assert status == 200
+    assert sleeps == [5.0]
+
+    sleeps.clear()
+    asyncio.run(limiter.call(responses(503, 200)))
+    assert len(sleeps) == 1 and sleeps[0] <= 1.0
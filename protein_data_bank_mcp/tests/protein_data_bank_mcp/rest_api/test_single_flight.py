@@ -0,0 +1,38 @@
+import asyncio
+
+from protein_data_bank_mcp.rest_api.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_request():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": "4HHB"}
+
+    async def run():
+        group = SingleFlight()
+        results = await asyncio.gather(*[group.do("/core/entry/4hhb", request) for _ in range(5)])
+        return results, len(group)
+
+    results, in_flight = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"id": "4HHB"} for result in results)
+    assert in_flight == 0
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def request():
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def run():
+        group = SingleFlight()
+        first = asyncio.ensure_future(group.do("key", request))
+        second = asyncio.ensure_future(group.do("key", request))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == 1
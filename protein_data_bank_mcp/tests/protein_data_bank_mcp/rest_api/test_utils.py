@@ -0,0 +1,61 @@
+import json
+import asyncio
+
+from protein_data_bank_mcp.rest_api import utils
+
+
+def test_session_is_shared():
+    async def run():
+        first = utils.get_session()
+        second = utils.get_session()
+        await utils.close_session()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert first.closed
+
+
+def test_lifespan_closes_session_after_last_connection():
+    async def run():
+        async with utils.http_lifespan(None):
+            session = utils.get_session()
+            async with utils.http_lifespan(None):
+                pass
+            still_open = not session.closed
+        return session, still_open
+
+    session, still_open = asyncio.run(run())
+    assert still_open
+    assert session.closed
+
+
+def test_lifespan_runs_shutdown_hooks_after_last_connection(monkeypatch):
+    closed = []
+    monkeypatch.setattr(utils, "_shutdown_hooks", [lambda: closed.append(True)])
+
+    async def run():
+        async with utils.http_lifespan(None):
+            async with utils.http_lifespan(None):
+                pass
+            assert closed == []
+
+    asyncio.run(run())
+    assert closed == [True]
+
+
+def test_fetch_many_reports_errors_per_item(monkeypatch):
+    async def fetch_json(api_suffix):
+        if api_suffix.endswith("missing"):
+            raise RuntimeError("not found")
+        return {"suffix": api_suffix}
+
+    monkeypatch.setattr(utils, "fetch_json", fetch_json)
+    result = asyncio.run(
+        utils.fetch_many(["4hhb", "missing", "4hhb"], lambda id_: f"/core/entry/{id_}")
+    )
+    data = json.loads(result.text)
+    assert data == {
+        "4hhb": {"suffix": "/core/entry/4hhb"},
+        "missing": {"error": "not found"},
+    }